@@ -0,0 +1,6 @@
+import os
+
+# pygame prints a banner to stdout when it is first imported, which would end up
+# mixed in with the output of the subcommands meant to be read by other programs
+# (such as batch). Set here so it is in place before any module imports pygame
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
@@ -1,62 +1,126 @@
-from queue import LifoQueue, PriorityQueue, Queue
-import pygame
+from pathfind_visualiser import (
+    array_search,
+    bitboard,
+    board,
+    components,
+    corridors,
+    flow_field,
+    hierarchical,
+    incremental,
+    landmarks,
+    search,
+    wavefront,
+)
+from pathfind_visualiser.array_grid import ArrayGrid
 
 
 # Algorithm Helper Functions #####################################################
-def reconstruct_final_path(path, current, draw, start, end):
+def open_node(end, neighbour):
+    """Sets a node to open if it is not the end node."""
+
+    if neighbour != end:
+        neighbour.make_open()
+
+
+def close_node(start, current):
+    """Sets a node to closed if it is not the start node."""
+
+    if current != start:
+        current.make_closed()
+
+
+def visualise(draw, steps, start, end):
     """
-    Goes through each node in the path calculated by an algorithm function, and
-    draws out the path on the display.
+    Runs one of the headless searches from search.py, colouring in the nodes as
+    its events come in and calling draw() after every node which is closed or
+    added to the final path (see animation.py for how often that actually
+    updates the display).
+
+    Returns the SearchResult of the search.
     """
 
-    while current in path:
-        # Necessary as a new loop has been opened
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                quit()
+    try:
+        while True:
+            event, node = next(steps)
 
-        # Path contains nodes as current node: previous node,
-        # so this goes through the nodes backwards from the end
-        # node to the start node
-        current = path[current]
-        current.make_path()
-        draw()
-        if current == start:
-            break
+            if event == search.OPEN:
+                open_node(end, node)
+                continue
 
-    # Make start and end nodes change colour back to their original, and
-    # not the path colour
+            if event == search.CLOSE:
+                # Closes the node after it has been looped through, but note it
+                # can be added back in and opened if another path to it is found
+                close_node(start, node)
+            elif event == search.RING:
+                # A whole ring of nodes at once, which is drawn as one frame
+                for ring_node in node:
+                    close_node(start, ring_node)
+            else:
+                node.make_path()
+
+            # Update the display
+            draw()
+    except StopIteration as finished:
+        result = finished.value
+
+    # Make start and end nodes change colour back to their original, in case the
+    # search coloured them in
     end.make_end()
     start.make_start()
 
+    return result
 
-def heur(p1, p2):
-    """
-    Heuristic function, gets a prediction for the distance from the
-    given node to the end node, which is used to guide the a*
-    algorithm on which node to search next.
 
-    Uses Manhattan distance, which simply draws an L to the end node.
+def on_board(steps, grid, model):
+    """
+    Turns the cell indices in the events and result of a search on an ArrayGrid
+    (the model of the board) into the matching nodes on the board, so it can be
+    visualised in the same way as the searches in search.py.
     """
 
-    x1, y1 = p1
-    x2, y2 = p2
+    def node(index):
+        row, col = model.position(index)
+        return grid[row][col]
 
-    return abs(x1 - x2) + abs(y1 - y2)
+    try:
+        while True:
+            event, index = next(steps)
+            if event == search.RING:
+                yield event, [node(ring_index) for ring_index in index]
+            else:
+                yield event, node(index)
+    except StopIteration as finished:
+        result = finished.value
 
+    result.path = [node(index) for index in result.path]
+    return result
 
-def open_node(end, neighbour):
-    """Sets a node to open if it is not the end node."""
 
-    if neighbour != end:
-        neighbour.make_open()
+def reject_unreachable(draw, grid, model, start, end):
+    """
+    Checks whether the end node can be reached from the start node at all, using
+    the connected components of the model of the board (see components.py).
 
+    If it can't, the nodes which can be reached from the start node are coloured
+    in as closed (which is as far as any search would have got) and a SearchResult
+    with no path is returned, without running a search. Otherwise returns None.
+    """
 
-def close_node(start, current):
-    """Sets a node to closed if it is not the start node."""
+    index = components.get_components(model)
+    start_index = model.index(*start.get_position())
+    end_index = model.index(*end.get_position())
 
-    if current != start:
-        current.make_closed()
+    if index.connected(start_index, end_index):
+        return None
+
+    board.clear_search(grid)
+    reachable = index.component(start_index)
+    for cell in reachable:
+        row, col = model.position(cell)
+        close_node(start, grid[row][col])
+    draw()
+
+    return search.SearchResult(False, component_size=len(reachable))
 
 
 def a_star_algorithm(draw, grid, start, end):
@@ -71,79 +135,7 @@ def a_star_algorithm(draw, grid, start, end):
     This ensures the shortest path.
     """
 
-    # Keeps track of when node is inserted to the queue
-    count = 0
-    # Will be used to ge the minimum element from the queue,
-    # based on the f_score
-    open_set = PriorityQueue()
-    # add start node to open set, count to keep track of
-    # when item was inserted to queue
-    open_set.put((0, count, start))
-    # keeps track of node prior in the path to a certain
-    # node, updated if a new node with lower g_score is found
-    path = {}
-
-    # Current shortest distance to get from the start node to
-    # this node. Initialised at infinity and updated as the
-    # node is reached, so any number is lower than it
-    g_score = {node: float("inf") for row in grid for node in row}
-    g_score[start] = 0
-
-    # G score + predicted distance to the end node, defined by
-    # the heuristic function. Will be used to determine which
-    # node should come next in the priority queue
-    f_score = {node: float("inf") for row in grid for node in row}
-    f_score[start] = heur(start.get_position(), end.get_position())
-
-    # To keep track of which items are in the priority queue
-    open_set_hash = {start}
-
-    while not open_set.empty():
-        # Necessary as a new loop has been opened
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                quit()
-
-        # Node with the lowest f score gets chosen first
-        # thanks to the priority queue
-        current = open_set.get()[2]
-        # To sync list with priority queue
-        open_set_hash.remove(current)
-
-        # As soon as the end node is reached, the path is built
-        # and the loop ends
-        if current == end:
-            reconstruct_final_path(path, end, draw, start, end)
-            return True
-
-        for neighbour in current.neighbours:
-            # all edges have weight 1, so g_score for the node is
-            # g_score for previous node + 1
-            temp_g_score = g_score[current] + 1
-
-            # Update g_score and f_score if a new shorter path is
-            # found
-            if temp_g_score < g_score[neighbour]:
-                path[neighbour] = current
-                g_score[neighbour] = temp_g_score
-                f_score[neighbour] = temp_g_score + heur(
-                    neighbour.get_position(), end.get_position()
-                )
-
-                # Add neighbour node to open_set_hash and open_set
-                if neighbour not in open_set_hash:
-                    count += 1
-                    open_set.put((f_score[neighbour], count, neighbour))
-                    open_set_hash.add(neighbour)
-                    open_node(end, neighbour)
-        # Update the display
-        draw()
-
-        # Closes the node after it has been looped through, but note it
-        # can be added back in and opened if another path to it is found
-        close_node(start, current)
-
-    return False
+    return visualise(draw, search.a_star(grid, start, end), start, end)
 
 
 def breadth_first_search(draw, grid, start, end):
@@ -154,49 +146,43 @@ def breadth_first_search(draw, grid, start, end):
     This ensures the shortest path.
     """
 
-    # Queue allows nodes to be searched in a certain order
-    # Operates on a FIFO basis
-    open_set = Queue()
-    open_set.put(start)
+    return visualise(draw, search.breadth_first(grid, start, end), start, end)
 
-    # Keeps track of node prior in the path to a certain node
-    # (also tracks if node has been visited). All nodes are
-    # added to path so they can be used in if statements without
-    # throwing a key error
-    path = {node: None for row in grid for node in row}
 
-    while not open_set.empty():
-        # Necessary as a new loop has been opened
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                quit()
+def bitboard_breadth_first_search(draw, grid, start, end):
+    """
+    The same search as breadth first search, but with the whole board packed
+    into a single Python int (one bit per node), so a whole ring of nodes the
+    same distance from the start node is searched at once with a few bit shifts.
+    It is drawn a ring at a time too.
 
-        # Gets first item in the queue which will always be
-        # the item added before all the others
-        current = open_set.get()
+    This ensures the shortest path.
+    """
 
-        if current == end:
-            reconstruct_final_path(path, current, draw, start, end)
-            return True
+    model = ArrayGrid.from_nodes(grid)
+    steps = bitboard.breadth_first(
+        model, model.index(*start.get_position()), model.index(*end.get_position())
+    )
+    return visualise(draw, on_board(steps, grid, model), start, end)
 
-        for neighbour in current.neighbours:
-            # Neighbour is only added to queue if it has not
-            # yet been visited
-            if path[neighbour]:
-                continue
-            # If statement so start node's colour does not
-            # get altered
-            if not neighbour == start:
-                open_set.put(neighbour)
-                open_node(end, neighbour)
-                path[neighbour] = current
 
-        # Update the display
-        draw()
+def wavefront_breadth_first_search(draw, grid, model, start, end):
+    """
+    The same search as breadth first search, but done with numpy a whole ring of
+    nodes at a time (every node the same distance from the start node), and
+    drawn a ring at a time too.
+
+    Needs numpy, so falls back to the bitboard search (which works the same way
+    without it) if numpy is not installed.
 
-        close_node(start, current)
+    This ensures the shortest path.
+    """
 
-    return False
+    engine = bitboard if wavefront.np is None else wavefront
+    steps = engine.breadth_first(
+        model, model.index(*start.get_position()), model.index(*end.get_position())
+    )
+    return visualise(draw, on_board(steps, grid, model), start, end)
 
 
 def depth_first_search(draw, grid, start, end):
@@ -214,51 +200,7 @@ def depth_first_search(draw, grid, start, end):
     This does not ensure the shortest path.
     """
 
-    # Queue allows nodes to be searched in a certain order
-    # Operates on a FIFO basis
-    open_set = LifoQueue()
-    open_set.put(start)
-
-    # Keeps track of node prior in the path to a certain
-    # node (also tracks if node has been visited). All nodes
-    # are added to path so they can be used in if statements
-    # without throwing a key error
-    path = {node: None for row in grid for node in row}
-
-    # While loop runs until the end point is found or
-    # there are no nodes left to search
-    while not open_set.empty():
-        # Necessary as a new loop has been opened
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                quit()
-
-        # Gets first item in the queue which will always
-        # be the last node added
-        current = open_set.get()
-
-        if current == end:
-            reconstruct_final_path(path, current, draw, start, end)
-            return True
-
-        for neighbour in current.neighbours:
-            # Neighbour is only added to queue if it has
-            # not yet been visited
-            if path[neighbour]:
-                continue
-            # If statement so start node's colour does
-            # not get altered
-            if not neighbour == start:
-                open_set.put(neighbour)
-                open_node(end, neighbour)
-                path[neighbour] = current
-
-        # Update the display
-        draw()
-
-        close_node(start, current)
-
-    return False
+    return visualise(draw, search.depth_first(grid, start, end), start, end)
 
 
 def dijkstras(draw, grid, start, end):
@@ -271,82 +213,7 @@ def dijkstras(draw, grid, start, end):
     This ensures the shortest path.
     """
 
-    # Will allow the algorithm to prioritise nodes with
-    # lower distance scores but since all edges have weight
-    # 1, visually this won't make a difference
-    open_set = PriorityQueue()
-
-    # Position of item added to the queue, required for
-    # the priority queue
-    count = 0
-
-    # Minimum distance to get to each node
-    # Give all nodes an infinite distance score so that
-    # any path that reaches them is shorter
-    distance_score = {node: float("inf") for row in grid for node in row}
-
-    # Keeps track of node prior in the path to a certain
-    # node (also tracks if node has been visited). All
-    # nodes are added to path so they can be used in if
-    # statements without throwing a key error
-    path = {node: None for row in grid for node in row}
-
-    # Set distance score of start node to 0 and add it
-    # to the open set
-    distance_score[start] = 0
-    open_set.put((distance_score[start], count, start))
-
-    # Loop will end when the end node is reached or when
-    # there are no nodes left to search
-    while not open_set.empty():
-        # Necessary as a new loop has been opened
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                quit()
-
-        # Gets node with lowest distance score
-        current = open_set.get()[2]
-
-        # Path is constructed as soon as the end node
-        # is reached. If the distance score was to be
-        # used, the distance to the end node would also
-        # have to be added
-        if current == end:
-            reconstruct_final_path(path, current, draw, start, end)
-            return True
-
-        # Loops through neighbours of the current node,
-        # which will always be valid neighbours (because
-        # of class function update_neighbours)
-        for neighbour in current.neighbours:
-            # If neighbour has been visited, skip
-            if path[neighbour]:
-                continue
-
-            # +1 because in this graph, the distance
-            # between all nodes is equivalent to 1 i.e.
-            # all edges have the same weight. If the
-            # edges had different weights, this is where
-            # the weight to that specific node would be
-            # taken into account.
-            if distance_score[current] + 1 < distance_score[neighbour]:
-                # Update shortest path to that node
-                distance_score[neighbour] = distance_score[current] + 1
-                # Update count, again only for the
-                # priority queue functionality
-                count += 1
-                # Add neighbour to queue
-                open_set.put((distance_score[neighbour], count, neighbour))
-                # Update path for neighbour
-                path[neighbour] = current
-                open_node(end, neighbour)
-
-        # Update the display
-        draw()
-
-        close_node(start, current)
-
-    return False
+    return visualise(draw, search.dijkstras(grid, start, end), start, end)
 
 
 def best_first(draw, grid, start, end):
@@ -360,73 +227,171 @@ def best_first(draw, grid, start, end):
     the start node.
     """
 
-    # Will allow the algorithm to prioritise nodes
-    # with lower distance scores but since all edges
-    # have weight 1, visually this won't make much
-    # of a difference
-    open_set = PriorityQueue()
-    # Position of item added to the queue, required
-    # for the priority queue
-    count = 0
-
-    # All nodes are given a distance score calculated
-    # with the heuristic function
-    distance_score = {
-        node: heur(node.get_position(), end.get_position())
-        for row in grid
-        for node in row
-    }
-
-    # Keeps track of node prior in the path to a certain
-    # node (also tracks if node has been visited). All
-    # nodes are added to path so they can be used in if
-    # statements without throwing a key error
-    path = {node: None for row in grid for node in row}
-
-    # Add start node to the open set
-    open_set.put((distance_score[start], count, start))
-
-    # Loop will end when the end node is reached
-    # or when there are no nodes left to search
-    while not open_set.empty():
-        # Necessary as a new loop has been opened
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                quit()
-
-        # Gets node with lowest distance score
-        current = open_set.get()[2]
-
-        # Path is constructed as soon as the end node
-        # is reached
-        if current == end:
-            reconstruct_final_path(path, current, draw, start, end)
-            return True
-
-        # Loops through neighbours of the current node,
-        # which will always be valid neighbours (because
-        # of class function update_neighbours)
-        for neighbour in current.neighbours:
-            # If neighbour has been visited, skip
-            if path[neighbour]:
-                continue
+    return visualise(draw, search.best_first(grid, start, end), start, end)
+
+
+def jump_point_search(draw, grid, start, end):
+    """
+    A version of the a* algorithm for grids where every move costs the same.
+    Rather than adding every neighbour to the open set, it jumps in straight
+    lines over nodes which could be reached just as easily another way, and only
+    stops at nodes where the path might need to turn.
+
+    Far fewer nodes get expanded than with a*, so the number a* would have
+    expanded on the same grid is also kept in the result to compare. If any
+    terrain has been painted, the moves no longer all cost the same, so a* is
+    run instead (and noted in the window caption).
+
+    This ensures the shortest path.
+    """
+
+    result = visualise(draw, search.jump_point(grid, start, end), start, end)
+    if "fell_back_to" not in result.stats:
+        result.stats["a*_expanded"] = search.run(
+            search.a_star(grid, start, end)
+        ).expanded
+    return result
+
+
+def bidirectional_breadth_first_search(draw, grid, start, end):
+    """
+    Runs a breadth first search outwards from both the start node and the end
+    node at the same time, a whole layer at a time, and stops as soon as the two
+    meet.
+
+    As each search only needs to get about half way, far fewer nodes are
+    searched than with a normal breadth first search. If any terrain has been
+    painted, layers no longer line up with the cost of getting to a node, so
+    bidirectional a* is run instead (and noted in the window caption).
+
+    This ensures the shortest path.
+    """
+
+    steps = search.bidirectional_breadth_first(grid, start, end)
+    return visualise(draw, steps, start, end)
+
+
+def bidirectional_a_star(draw, grid, start, end):
+    """
+    Runs the a* algorithm from the start node towards the end node and from the
+    end node towards the start node, taking turns to search a node. Once they
+    meet, the search continues only until it is certain no shorter path could be
+    found through where they meet. Moving into a node costs its weight, so
+    costly terrain is gone around when that is cheaper.
+
+    This ensures the shortest path.
+    """
+
+    steps = search.bidirectional_a_star(grid, start, end)
+    return visualise(draw, steps, start, end)
+
+
+def flow_field_search(draw, grid, model, start, end):
+    """
+    Works out the distance from every node to the end node with a single
+    Dijkstra's search outwards from the end node (a flow field), then finds the
+    path by always stepping to the neighbour closest to the end node.
+
+    The flow field is kept until the board is changed, so after moving the start
+    node the path is found straight away without searching again.
+
+    This ensures the shortest path.
+    """
+
+    steps = flow_field.search(
+        model, model.index(*start.get_position()), model.index(*end.get_position())
+    )
+    return visualise(draw, on_board(steps, grid, model), start, end)
+
+
+def lifelong_planning_a_star(draw, grid, model, start, end):
+    """
+    An incremental version of the a* algorithm (LPA*). The first search is much
+    like a*, but the distances it works out are kept, and after nodes are
+    changed only the nodes whose distance from the start node changed because of
+    it are searched again.
+
+    The board is cleared of the previous search first, so only the nodes
+    searched again are coloured in. The number of nodes a full a* search would
+    have expanded is also kept in the result to compare.
+
+    This ensures the shortest path.
+    """
+
+    start_index = model.index(*start.get_position())
+    end_index = model.index(*end.get_position())
+    planner = incremental.get_planner(model, start_index, end_index)
+
+    board.clear_search(grid)
+    result = visualise(draw, on_board(planner.search(), grid, model), start, end)
+
+    full_search = array_search.a_star(model, start_index, end_index)
+    result.stats["full_a*_expanded"] = search.run(full_search).expanded
+    return result
+
+
+def hierarchical_a_star(draw, grid, model, start, end):
+    """
+    Splits the board into square clusters of nodes, and works out the distances
+    between the entrances of each cluster (the nodes where it can be crossed into
+    the clusters next to it). The a* algorithm then only searches through the
+    entrances, and the path between them is filled in one cluster at a time.
+
+    Clusters are kept between runs, and only the ones around a changed node are
+    worked out again. Only the entrances searched are coloured in.
+
+    This does not ensure the shortest path, as the path has to go through the
+    entrances, but it is usually very close.
+    """
+
+    start_index = model.index(*start.get_position())
+    end_index = model.index(*end.get_position())
+    hierarchy = hierarchical.get_hierarchy(model)
+
+    steps = hierarchy.search(start_index, end_index)
+    return visualise(draw, on_board(steps, grid, model), start, end)
+
+
+def landmark_a_star(draw, grid, model, start, end):
+    """
+    The a* algorithm with a heuristic which takes walls into account. A few
+    nodes spread out over the board are chosen as landmarks, and the distances
+    from and to each of them are worked out once per maze. The distance from a
+    node to the end node can't be less than the difference between their
+    distances from a landmark, which is usually a far better guess than the
+    Manhattan distance in mazes.
+
+    The number of nodes a* with the Manhattan distance expands is also worked
+    out afterwards and kept in the result to compare.
+
+    This ensures the shortest path.
+    """
+
+    start_index = model.index(*start.get_position())
+    end_index = model.index(*end.get_position())
+
+    steps = landmarks.a_star(model, start_index, end_index)
+    result = visualise(draw, on_board(steps, grid, model), start, end)
+
+    manhattan = search.run(array_search.a_star(model, start_index, end_index))
+    result.stats["manhattan_expanded"] = manhattan.expanded
+    return result
+
+
+def junction_graph_search(draw, grid, model, start, end):
+    """
+    Trims every dead end off the maze and turns each corridor between two
+    junctions into a single step, then runs Dijkstra's algorithm from junction
+    to junction. Only the junctions are coloured in as they are searched, and
+    the corridors used are turned back into nodes for the path.
+
+    The junctions are kept until the board is changed, so running it again on
+    the same maze does not need to work them out again.
+
+    This ensures the shortest path.
+    """
 
-            # If statement so start node's colour does
-            # not get altered and it does not get added
-            # to the open set
-            if not neighbour == start:
-                # Update path to neighbour
-                path[neighbour] = current
-                # Update count, again only for the
-                # priority queue functionality
-                count += 1
-                # Add neighbour to queue
-                open_set.put((distance_score[neighbour], count, neighbour))
-                open_node(end, neighbour)
-
-        # Update the display
-        draw()
-
-        close_node(start, current)
-
-    return False
+    steps = corridors.search(
+        model, model.index(*start.get_position()), model.index(*end.get_position())
+    )
+    return visualise(draw, on_board(steps, grid, model), start, end)
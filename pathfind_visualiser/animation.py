@@ -0,0 +1,121 @@
+"""
+Controls how often a search being visualised is drawn.
+
+The visualised algorithms call draw() after every step of a search (a node
+closed, a ring of nodes closed or a node added to the path). Drawing a frame for
+every one of them makes large searches take far longer to watch than to run, so
+an Animation is called in place of draw() and decides which steps are drawn:
+
+- STEPS: a frame is drawn every so many steps
+- FPS: steps run as fast as they can, and a frame is drawn whenever enough time
+  has passed for the target frame rate, showing every step since the last one
+- INSTANT: nothing is drawn until the search has finished
+
+Either way, frames are never drawn more often than the display refreshes.
+"""
+
+import time
+
+import pygame
+
+# MODES
+STEPS = "steps"
+FPS = "fps"
+INSTANT = "instant"
+MODES = [STEPS, FPS, INSTANT]
+
+# Used if pygame can't tell what the refresh rate of the display is
+DEFAULT_REFRESH_RATE = 60
+# Longest time without checking for the window being closed, in seconds, when
+# no frames are being drawn
+EVENT_INTERVAL = 0.1
+
+# Limits of the speed settings
+MAX_STEPS_PER_FRAME = 2**16
+MIN_FPS = 1
+
+
+def refresh_rate():
+    """Returns the refresh rate of the display, in frames per second."""
+
+    # Only some versions of pygame can find it out
+    get_rate = getattr(pygame.display, "get_current_refresh_rate", None)
+    rate = get_rate() if get_rate is not None else 0
+    return rate or DEFAULT_REFRESH_RATE
+
+
+class Animation:
+    """
+    Called after every step of a search, drawing a frame with draw_frame() when
+    one is due for the current mode. The speed of each mode is kept between
+    searches, and can be changed with faster() and slower().
+    """
+
+    def __init__(self, draw_frame, mode=STEPS, steps_per_frame=1, fps=None):
+        self.draw_frame = draw_frame
+        self.mode = mode
+        self.refresh_rate = refresh_rate()
+        self.steps_per_frame = steps_per_frame
+        self.fps = min(fps or self.refresh_rate, self.refresh_rate)
+
+        # Waits between frames, so they don't come faster than the display
+        self.clock = pygame.time.Clock()
+        # Steps since the last frame, and when it was drawn
+        self.steps = 0
+        self.last_frame = time.perf_counter()
+
+    def __call__(self):
+        self.steps += 1
+        now = time.perf_counter()
+
+        if self.mode == STEPS:
+            if self.steps >= self.steps_per_frame:
+                self.frame()
+        elif self.mode == FPS:
+            if now - self.last_frame >= 1 / self.fps:
+                self.frame()
+        elif now - self.last_frame >= EVENT_INTERVAL:
+            # Nothing is drawn, but the window still has to respond
+            handle_events()
+            self.last_frame = now
+
+    def frame(self):
+        handle_events()
+        self.clock.tick(self.refresh_rate)
+        self.draw_frame()
+
+        self.steps = 0
+        self.last_frame = time.perf_counter()
+
+    def next_mode(self):
+        self.mode = MODES[(MODES.index(self.mode) + 1) % len(MODES)]
+
+    def faster(self):
+        if self.mode == STEPS:
+            self.steps_per_frame = min(self.steps_per_frame * 2, MAX_STEPS_PER_FRAME)
+        elif self.mode == FPS:
+            self.fps = min(self.fps * 2, self.refresh_rate)
+
+    def slower(self):
+        if self.mode == STEPS:
+            self.steps_per_frame = max(self.steps_per_frame // 2, 1)
+        elif self.mode == FPS:
+            self.fps = max(self.fps // 2, MIN_FPS)
+
+    def describe(self):
+        """Returns a description of the mode and its speed, for the caption."""
+
+        if self.mode == STEPS:
+            plural = "s" if self.steps_per_frame > 1 else ""
+            return f"{self.steps_per_frame} step{plural} per frame"
+        if self.mode == FPS:
+            return f"{self.fps} frames per second"
+        return "instant"
+
+
+def handle_events():
+    """Deals with window events during a search (only closing the window)."""
+
+    for pygame_event in pygame.event.get():
+        if pygame_event.type == pygame.QUIT:
+            quit()
@@ -0,0 +1,179 @@
+"""
+Compact grid model used by the headless searches in array_search.py.
+
+Instead of a 2d list of Node objects, the grid is kept as flat arrays indexed by
+row * cols + col, so memory use is a few bytes per cell rather than a Python
+object (and several dictionary entries) per cell.
+"""
+
+from array import array
+
+# Cost of a cell which can not be traversed
+BARRIER = 0
+# Cost of moving into an empty cell
+DEFAULT_COST = 1
+
+# Used as the starting distance of every cell, so any path that reaches it is
+# shorter (largest value a signed 32 bit array item can hold)
+INFINITY = 2**31 - 1
+
+
+class ArrayGrid:
+    """
+    A grid of rows x cols cells, stored as one byte per cell.
+
+    Each byte is the cost of moving into that cell (its weight, from 1 to 255),
+    with 0 meaning the cell is a barrier. Cells are referred to by their index,
+    row * cols + col.
+
+    The version goes up every time a cell's cost changes, and anything worked out
+    from the grid which stays valid until then (such as a flow field) can be kept
+    with cached(). Anything which is instead updated as cells change (such as an
+    incremental planner) can be kept with attach(), and has its cell_changed()
+    method called with the index of every cell whose cost changes.
+    """
+
+    def __init__(self, rows, cols=None, costs=None):
+        self.rows = rows
+        self.cols = cols or rows
+        self.size = self.rows * self.cols
+
+        if costs is None:
+            costs = bytearray([DEFAULT_COST]) * self.size
+        self.costs = costs
+
+        self.version = 0
+        # Values worked out from the grid, only valid for cache_version
+        self.cache = {}
+        self.cache_version = 0
+        # Values kept up to date as cells change, by name
+        self.attached = {}
+
+    @staticmethod
+    def node_cost(node):
+        """Cost of moving into a board.Node."""
+
+        return BARRIER if node.is_barrier() else node.weight
+
+    @classmethod
+    def from_nodes(cls, grid):
+        """Builds an ArrayGrid from a 2d list of board.Node objects."""
+
+        costs = bytearray(cls.node_cost(node) for row in grid for node in row)
+        return cls(len(grid), len(grid[0]), costs)
+
+    def index(self, row, col):
+        return row * self.cols + col
+
+    def position(self, index):
+        """Returns the (row, col) of the cell at the given index."""
+
+        return divmod(index, self.cols)
+
+    def is_barrier(self, index):
+        return self.costs[index] == BARRIER
+
+    def set_barrier(self, index, barrier=True):
+        self.set_cost(index, BARRIER if barrier else DEFAULT_COST)
+
+    def set_cost(self, index, cost):
+        """Sets the cost of moving into a cell (0 makes it a barrier)."""
+
+        if self.costs[index] != cost:
+            self.costs[index] = cost
+            self.version += 1
+
+            for attached in self.attached.values():
+                attached.cell_changed(index)
+
+    def update_node(self, node):
+        """Copies the cost of a board.Node into its cell, after it was edited."""
+
+        self.set_cost(self.index(node.row, node.col), self.node_cost(node))
+
+    def attach(self, name, value):
+        """
+        Keeps a value under the given name, calling its cell_changed(index)
+        method whenever a cell's cost changes.
+        """
+
+        self.attached[name] = value
+
+    def clear_stale_cache(self):
+        """Empties the cache if the grid has changed since it was filled."""
+
+        if self.cache_version != self.version:
+            self.cache = {}
+            self.cache_version = self.version
+
+    def get_cached(self, key):
+        """
+        Returns the value cached under the given key, or None if there is none for
+        the current version of the grid.
+        """
+
+        self.clear_stale_cache()
+        return self.cache.get(key)
+
+    def set_cached(self, key, value):
+        """Caches a value worked out from the current version of the grid."""
+
+        self.clear_stale_cache()
+        self.cache[key] = value
+
+    def cached(self, key, build):
+        """
+        Returns the value cached under the given key, calling build() to work it
+        out (and caching it) if there is none for the current version of the grid.
+        """
+
+        value = self.get_cached(key)
+        if value is None:
+            value = build()
+            self.set_cached(key, value)
+        return value
+
+    def neighbours(self, index):
+        """
+        Returns the indices of the cells adjacent to the given cell which are not
+        barriers.
+
+        Same order as Node.neighbours (left, below, right, above), which is
+        important for depth first search.
+        """
+
+        cols = self.cols
+        costs = self.costs
+        col = index % cols
+        neighbours = []
+
+        # Checks cell to the left
+        if col > 0 and costs[index - 1]:
+            neighbours.append(index - 1)
+
+        # Checks cell below
+        if index + cols < self.size and costs[index + cols]:
+            neighbours.append(index + cols)
+
+        # Checks cell to the right
+        if col < cols - 1 and costs[index + 1]:
+            neighbours.append(index + 1)
+
+        # Checks cell above
+        if index >= cols and costs[index - cols]:
+            neighbours.append(index - cols)
+
+        return neighbours
+
+    def new_parents(self):
+        """
+        Returns an array to hold the previous cell in the path to each cell, with
+        -1 meaning the cell has not been reached yet.
+        """
+
+        return array("i", [-1]) * self.size
+
+    def new_distances(self, value=INFINITY):
+        """Returns an array holding a distance score for each cell."""
+
+        return array("i", [value]) * self.size
@@ -0,0 +1,209 @@
+"""
+Versions of the headless searches in search.py which run on an ArrayGrid.
+
+Nodes are plain integer cell indices, and all of the per search state (path,
+distance scores, open set membership) is kept in flat arrays rather than
+dictionaries keyed by Node objects. Events and results are the same as in
+search.py, but with cell indices in place of nodes, and each one can be given
+the name of a frontier to use in the same way.
+"""
+
+from pathfind_visualiser.frontier import make_frontier
+from pathfind_visualiser.search import CLOSE, OPEN, SearchResult, found_path
+
+
+def heur(grid, index, end_row, end_col):
+    """Manhattan distance from the given cell to the end cell."""
+
+    row, col = divmod(index, grid.cols)
+    return abs(row - end_row) + abs(col - end_col)
+
+
+def a_star(grid, start, end, frontier="bucket", heuristic=None):
+    """
+    A* search on an ArrayGrid. See search.a_star.
+
+    The heuristic is a function giving a lower bound on the cost from a cell to
+    the end cell, Manhattan distance by default (see landmarks.py for another).
+    """
+
+    if heuristic is None:
+        end_row, end_col = grid.position(end)
+
+        def heuristic(index):
+            return heur(grid, index, end_row, end_col)
+
+    open_set = make_frontier(frontier)
+    open_set.push(start, 0)
+
+    # Previous cell in the path to each cell
+    path = grid.new_parents()
+
+    # Current shortest distance to get from the start cell to each cell
+    g_score = grid.new_distances()
+    g_score[start] = 0
+
+    # Cells which have already been searched
+    closed = bytearray(grid.size)
+
+    costs = grid.costs
+    expanded = 0
+
+    while open_set:
+        current = open_set.pop()
+        if closed[current]:
+            continue
+        closed[current] = 1
+
+        if current == end:
+            return (yield from found_path(path, end, start, expanded))
+
+        for neighbour in grid.neighbours(current):
+            temp_g_score = g_score[current] + costs[neighbour]
+
+            if temp_g_score < g_score[neighbour]:
+                path[neighbour] = current
+                g_score[neighbour] = temp_g_score
+                f_score = temp_g_score + heuristic(neighbour)
+                open_set.push(neighbour, f_score)
+                yield OPEN, neighbour
+
+        expanded += 1
+        yield CLOSE, current
+
+    return SearchResult(False, expanded=expanded)
+
+
+def breadth_first(grid, start, end, frontier="fifo"):
+    """Breadth first search on an ArrayGrid. See search.breadth_first."""
+
+    open_set = make_frontier(frontier)
+    open_set.push(start)
+
+    # Previous cell in the path to each cell (also tracks if it has been visited)
+    path = grid.new_parents()
+
+    expanded = 0
+
+    while open_set:
+        current = open_set.pop()
+
+        if current == end:
+            return (yield from found_path(path, end, start, expanded))
+
+        for neighbour in grid.neighbours(current):
+            if path[neighbour] != -1 or neighbour == start:
+                continue
+            open_set.push(neighbour)
+            path[neighbour] = current
+            yield OPEN, neighbour
+
+        expanded += 1
+        yield CLOSE, current
+
+    return SearchResult(False, expanded=expanded)
+
+
+def depth_first(grid, start, end, frontier="lifo"):
+    """Depth first search on an ArrayGrid. See search.depth_first."""
+
+    open_set = make_frontier(frontier)
+    open_set.push(start)
+
+    # Previous cell in the path to each cell (also tracks if it has been visited)
+    path = grid.new_parents()
+
+    expanded = 0
+
+    while open_set:
+        current = open_set.pop()
+
+        if current == end:
+            return (yield from found_path(path, end, start, expanded))
+
+        for neighbour in grid.neighbours(current):
+            if path[neighbour] != -1 or neighbour == start:
+                continue
+            open_set.push(neighbour)
+            path[neighbour] = current
+            yield OPEN, neighbour
+
+        expanded += 1
+        yield CLOSE, current
+
+    return SearchResult(False, expanded=expanded)
+
+
+def dijkstras(grid, start, end, frontier="bucket"):
+    """Dijkstra's algorithm on an ArrayGrid. See search.dijkstras."""
+
+    open_set = make_frontier(frontier)
+
+    # Minimum distance to get to each cell
+    distance_score = grid.new_distances()
+    # Previous cell in the path to each cell
+    path = grid.new_parents()
+    # Cells which have already been searched
+    closed = bytearray(grid.size)
+
+    costs = grid.costs
+
+    distance_score[start] = 0
+    open_set.push(start, 0)
+
+    expanded = 0
+
+    while open_set:
+        current = open_set.pop()
+        if closed[current]:
+            continue
+        closed[current] = 1
+
+        if current == end:
+            return (yield from found_path(path, end, start, expanded))
+
+        for neighbour in grid.neighbours(current):
+            distance = distance_score[current] + costs[neighbour]
+            if distance < distance_score[neighbour]:
+                distance_score[neighbour] = distance
+                open_set.push(neighbour, distance)
+                path[neighbour] = current
+                yield OPEN, neighbour
+
+        expanded += 1
+        yield CLOSE, current
+
+    return SearchResult(False, expanded=expanded)
+
+
+def best_first(grid, start, end, frontier="heap"):
+    """Greedy best-first search on an ArrayGrid. See search.best_first."""
+
+    end_row, end_col = grid.position(end)
+
+    open_set = make_frontier(frontier)
+
+    # Previous cell in the path to each cell (also tracks if it has been visited)
+    path = grid.new_parents()
+
+    open_set.push(start, heur(grid, start, end_row, end_col))
+
+    expanded = 0
+
+    while open_set:
+        current = open_set.pop()
+
+        if current == end:
+            return (yield from found_path(path, end, start, expanded))
+
+        for neighbour in grid.neighbours(current):
+            if path[neighbour] != -1 or neighbour == start:
+                continue
+            path[neighbour] = current
+            open_set.push(neighbour, heur(grid, neighbour, end_row, end_col))
+            yield OPEN, neighbour
+
+        expanded += 1
+        yield CLOSE, current
+
+    return SearchResult(False, expanded=expanded)
@@ -0,0 +1,272 @@
+"""
+Solves many start/end queries on one grid at once, with a pool of processes.
+
+The grid's costs are copied into shared memory once, and every worker process
+builds a read only ArrayGrid over that memory when it starts, so the grid is
+never pickled and sent with each task. Tasks are just chunks of queries and the
+name of the algorithm, and the results of each chunk are yielded as soon as it
+is done, in whatever order the chunks finish.
+
+Anything an algorithm caches on the grid (landmarks, junction graphs, flow
+fields) is worked out once in each worker and reused for the rest of its
+queries.
+
+Run from the command line with:
+
+    pathfind-visualiser batch --maze Random --rows 250 --random 1000
+    pathfind-visualiser batch --map board.txt --queries queries.txt
+"""
+
+import os
+import random
+import sys
+import time
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+
+from pathfind_visualiser import (
+    array_search,
+    bitboard,
+    board,
+    corridors,
+    flow_field,
+    landmarks,
+    maze,
+)
+from pathfind_visualiser.array_grid import BARRIER, DEFAULT_COST, ArrayGrid
+from pathfind_visualiser.search import run
+
+# Characters of a map file: barriers, empty cells, and digits for weights
+MAP_BARRIER = "#"
+MAP_EMPTY = "."
+
+
+# Names of the algorithms which can be run in a batch, mapped to searches taking
+# (grid, start, end) on an ArrayGrid
+SOLVERS = {
+    "a*": array_search.a_star,
+    "breadth first": array_search.breadth_first,
+    "depth first": array_search.depth_first,
+    "dijkstra's": array_search.dijkstras,
+    "best-first": array_search.best_first,
+    "bitboard breadth first": bitboard.breadth_first,
+    "flow field": flow_field.search,
+    "alt": landmarks.a_star,
+    "junction graph": corridors.search,
+}
+
+# Set in each worker process by _attach: (shared memory, grid over it)
+_worker = None
+
+
+def _attach(name, rows, cols):
+    """Pool initializer, building the worker's grid over the shared memory."""
+
+    global _worker
+
+    memory = SharedMemory(name=name)
+    costs = memory.buf[: rows * cols].toreadonly()
+    # The memory is kept too, as it is unmapped once nothing refers to it
+    _worker = (memory, ArrayGrid(rows, cols, costs))
+
+
+def _solve_chunk(task):
+    """Runs the named algorithm for each query of a chunk, in a worker process."""
+
+    algorithm, chunk = task
+    grid = _worker[1]
+    solver = SOLVERS[algorithm]
+
+    return [(start, end, run(solver(grid, start, end))) for start, end in chunk]
+
+
+def solve(grid, queries, algorithm="a*", processes=None, chunk_size=None):
+    """
+    Finds a path for each (start, end) pair of cell indices on an ArrayGrid,
+    spread over a pool of processes (as many as there are CPUs by default).
+
+    Yields (start, end, SearchResult) for every query as the chunks of queries
+    are finished, so not in the order they were given.
+    """
+
+    if algorithm not in SOLVERS:
+        raise ValueError(f"Unknown algorithm: {algorithm}")
+
+    queries = list(queries)
+    if not queries:
+        return
+
+    if processes is None:
+        processes = min(len(queries), len(os_cpus()))
+    if chunk_size is None:
+        # Several chunks for each process, so they all finish at about the same
+        # time even if some queries take much longer than others
+        chunk_size = max(1, len(queries) // (processes * 8))
+
+    tasks = [
+        (algorithm, queries[position : position + chunk_size])
+        for position in range(0, len(queries), chunk_size)
+    ]
+
+    memory = SharedMemory(create=True, size=grid.size)
+    try:
+        memory.buf[: grid.size] = bytes(grid.costs)
+
+        with Pool(
+            processes, initializer=_attach, initargs=(memory.name, grid.rows, grid.cols)
+        ) as pool:
+            for results in pool.imap_unordered(_solve_chunk, tasks):
+                yield from results
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def os_cpus():
+    """Returns the CPUs this process may run on."""
+
+    if hasattr(os, "sched_getaffinity"):
+        return os.sched_getaffinity(0)
+    return range(os.cpu_count() or 1)
+
+
+def path_cost(grid, path):
+    """Returns the total cost of moving along a path (0 for no path)."""
+
+    return sum(grid.costs[index] for index in path[1:])
+
+
+def load_map(path):
+    """
+    Reads an ArrayGrid from a text file with a line for each row: MAP_BARRIER
+    for barriers, MAP_EMPTY for empty cells and the digits 1 to 9 for weights.
+    """
+
+    with open(path) as file:
+        lines = [line.rstrip("\n") for line in file if line.strip()]
+
+    if len({len(line) for line in lines}) != 1:
+        raise ValueError(f"Every row of {path} must be the same length")
+
+    costs = bytearray()
+    for line in lines:
+        for char in line:
+            if char == MAP_BARRIER:
+                costs.append(BARRIER)
+            elif char == MAP_EMPTY:
+                costs.append(DEFAULT_COST)
+            elif char in "123456789":
+                costs.append(int(char))
+            else:
+                raise ValueError(f"Unknown character in {path}: {char!r}")
+
+    return ArrayGrid(len(lines), len(lines[0]), costs)
+
+
+def generate_map(maze_type, rows, seed=0, cols=None):
+    """
+    Returns an ArrayGrid of a board with the given type of maze on it, with as
+    many columns as rows unless given.
+    """
+
+    random.seed(seed)
+    grid = board.make_grid(rows, cols)
+    if maze_type in maze.MAZES:
+        grid = maze.MAZES[maze_type](grid)
+    return ArrayGrid.from_nodes(grid)
+
+
+def load_queries(grid, path):
+    """
+    Reads queries from a text file with a line for each one: the row and column
+    of the start cell, then of the end cell.
+    """
+
+    queries = []
+    with open(path) as file:
+        for line in file:
+            if line.strip() and not line.startswith("#"):
+                start_row, start_col, end_row, end_col = map(int, line.split())
+                queries.append(
+                    (grid.index(start_row, start_col), grid.index(end_row, end_col))
+                )
+    return queries
+
+
+def random_queries(grid, count, seed=0):
+    """Returns the given number of queries between random free cells."""
+
+    random.seed(seed)
+    free = [index for index in range(grid.size) if not grid.is_barrier(index)]
+    return [tuple(random.sample(free, 2)) for _ in range(count)]
+
+
+def add_parser(subparsers):
+    """Adds the batch subcommand to the subparsers of the command line."""
+
+    parser = subparsers.add_parser(
+        "batch",
+        help="Solve many queries on one grid with a pool of processes",
+        description=__doc__,
+    )
+
+    grid_group = parser.add_mutually_exclusive_group()
+    grid_group.add_argument("--map", help="Text file with the grid to search")
+    grid_group.add_argument(
+        "--maze",
+        choices=["None", *maze.MAZES],
+        default="Random",
+        help="Type of maze to generate, if no map is given",
+    )
+    parser.add_argument("--rows", type=int, default=75)
+    parser.add_argument("--cols", type=int, help="Defaults to the number of rows")
+    parser.add_argument("--seed", type=int, default=0)
+
+    query_group = parser.add_mutually_exclusive_group()
+    query_group.add_argument(
+        "--queries", help="Text file of start_row start_col end_row end_col lines"
+    )
+    query_group.add_argument(
+        "--random", type=int, default=1000, help="Number of random queries"
+    )
+
+    parser.add_argument("--algorithm", choices=SOLVERS, default="a*")
+    parser.add_argument("--processes", type=int)
+    parser.add_argument("--chunk-size", type=int)
+
+
+def run_command(args):
+    """
+    Runs the batch subcommand, printing a line for each query as it is solved:
+    the start and end positions, whether a path was found, its cost, its length
+    and the number of cells expanded.
+    """
+
+    if args.map:
+        grid = load_map(args.map)
+    else:
+        grid = generate_map(args.maze, args.rows, args.seed, args.cols)
+
+    if args.queries:
+        queries = load_queries(grid, args.queries)
+    else:
+        queries = random_queries(grid, args.random, args.seed)
+
+    started = time.perf_counter()
+    for start, end, result in solve(
+        grid, queries, args.algorithm, args.processes, args.chunk_size
+    ):
+        print(
+            *grid.position(start),
+            *grid.position(end),
+            int(result.found),
+            path_cost(grid, result.path),
+            len(result.path),
+            result.expanded,
+            flush=True,
+        )
+
+    print(
+        f"Solved {len(queries)} queries in {time.perf_counter() - started:.3f}s",
+        file=sys.stderr,
+    )
@@ -0,0 +1,651 @@
+"""
+Benchmarks for the headless parts of the visualiser.
+
+Run with:
+
+    python -m pathfind_visualiser.benchmark frontiers
+    python -m pathfind_visualiser.benchmark bitboard
+    python -m pathfind_visualiser.benchmark landmarks
+    python -m pathfind_visualiser.benchmark batch
+    python -m pathfind_visualiser.benchmark frames
+    python -m pathfind_visualiser.benchmark nodes
+    python -m pathfind_visualiser.benchmark hierarchical
+"""
+
+import argparse
+import gc
+import os
+import random
+import time
+import tracemalloc
+from queue import PriorityQueue
+
+import pygame
+
+from pathfind_visualiser import (
+    array_search,
+    batch,
+    bitboard,
+    board,
+    hierarchical,
+    landmarks,
+    maze,
+    search,
+)
+from pathfind_visualiser.array_grid import ArrayGrid
+from pathfind_visualiser.frontier import FRONTIERS, make_frontier
+
+
+class _LockedPriorityQueue:
+    """
+    queue.PriorityQueue behind the frontier interface, which is what the searches
+    used before frontier.py. Only used as a point of comparison.
+    """
+
+    def __init__(self):
+        self.queue = PriorityQueue()
+        self.count = 0
+
+    def push(self, item, priority=0):
+        self.queue.put((priority, self.count, item))
+        self.count += 1
+
+    def pop(self):
+        return self.queue.get()[2]
+
+    def __len__(self):
+        return self.queue.qsize()
+
+
+def time_frontier(frontier, steps, start=100):
+    """
+    Uses the frontier the way a search does, starting with a number of items of
+    priority 0: each step pops the item with the lowest priority, then pushes
+    items with priorities the given offsets above it (like the neighbours of a
+    node). Items are their own priorities. Returns the time taken, in seconds,
+    and the number of pushes and pops.
+    """
+
+    push = frontier.push
+    pop = frontier.pop
+    operations = start
+
+    started = time.perf_counter()
+    for _ in range(start):
+        push(0, 0)
+    for offsets in steps:
+        if not len(frontier):
+            break
+        priority = pop()
+        for offset in offsets:
+            push(priority + offset, priority + offset)
+        operations += 1 + len(offsets)
+    finished = time.perf_counter()
+
+    return finished - started, operations
+
+
+def benchmark_frontiers(items=200_000, seed=0):
+    """
+    Prints pushes and pops per second for each frontier, used the way a search
+    uses it (see time_frontier) for the given number of pops.
+
+    Priorities are small integers which go up by a little from the item popped,
+    like the f scores of an A* search on a grid, and each item popped has up to
+    3 pushed after it.
+    """
+
+    random.seed(seed)
+    steps = [
+        [random.randint(0, 4) for _ in range(random.choice((0, 1, 1, 2, 2, 3)))]
+        for _ in range(items)
+    ]
+
+    frontiers = {"queue.PriorityQueue": _LockedPriorityQueue}
+    frontiers.update(
+        (name, lambda name=name: make_frontier(name)) for name in FRONTIERS
+    )
+
+    print(f"{'frontier':<20}{'operations/s':>14}")
+    for name, frontier in frontiers.items():
+        frontier_time, operations = time_frontier(frontier(), steps)
+        print(f"{name:<20}{operations / frontier_time:>14,.0f}")
+
+
+def benchmark_search_frontiers(rows=501, queries=6, seed=0):
+    """
+    Prints the time taken by a* and Dijkstra's on ArrayGrids with the heap and
+    bucket frontiers, between the same random pairs of cells on the "Random" and
+    "Swirl" mazes, with and without terrain weights painted over a third of the
+    free cells. The bucket frontier is the default for both searches, so it
+    should be at least close to the heap on all of them.
+    """
+
+    searches = {"a*": array_search.a_star, "dijkstra's": array_search.dijkstras}
+
+    print(f"{'maze':<8}{'weights':>8}{'search':>12}{'heap':>10}{'bucket':>10}")
+    for maze_type in ("Random", "Swirl"):
+        for weighted in (False, True):
+            grid = batch.generate_map(maze_type, rows, seed)
+            if weighted:
+                for index in range(grid.size):
+                    if not grid.is_barrier(index) and random.random() < 1 / 3:
+                        grid.set_cost(
+                            index, random.randint(board.MIN_WEIGHT, board.MAX_WEIGHT)
+                        )
+            pairs = batch.random_queries(grid, queries, seed)
+
+            for name, solver in searches.items():
+                times = []
+                for frontier in ("heap", "bucket"):
+                    started = time.perf_counter()
+                    for start, end in pairs:
+                        search.run(solver(grid, start, end, frontier=frontier))
+                    times.append(time.perf_counter() - started)
+
+                print(
+                    f"{maze_type:<8}{'yes' if weighted else 'no':>8}{name:>12}"
+                    f"{times[0]:>9.3f}s{times[1]:>9.3f}s"
+                )
+
+
+def random_board(rows, seed=0):
+    """
+    Returns a board with the "Random" maze on it, and start and end nodes in
+    opposite corners (inside the hard barriers around the edge).
+    """
+
+    random.seed(seed)
+    grid = maze.completely_random(board.make_grid(rows))
+
+    start = grid[1][1]
+    end = grid[-2][-2]
+    start.reset()
+    end.reset()
+
+    return grid, start, end
+
+
+def swirl_board(rows):
+    """
+    Returns a board with the "Swirl" maze on it, with the start node in the top
+    left corner and the end node in the middle, so the path goes all the way
+    round the swirl and the search has a ring for every node on it.
+    """
+
+    grid = maze.basic_swirl(board.make_grid(rows))
+    middle = rows // 2
+    end = next(
+        grid[middle + d_row][middle + d_col]
+        for d_row in (0, 1, -1)
+        for d_col in (0, 1, -1)
+        if not grid[middle + d_row][middle + d_col].is_barrier()
+    )
+
+    return grid, grid[1][1], end
+
+
+def benchmark_bitboard(sizes=(75, 250, 1000), swirl_sizes=(1000,), seed=0):
+    """
+    Prints the time taken by breadth first search on Node objects and by the
+    bitboard search (including packing the board) on boards of each size with
+    the "Random" maze, then with the "Swirl" maze. The swirl has hundreds of
+    thousands of rings on large boards, each of which is kept for finding the
+    path.
+    """
+
+    boards = [("Random", rows, lambda rows: random_board(rows, seed)) for rows in sizes]
+    boards += [("Swirl", rows, swirl_board) for rows in swirl_sizes]
+
+    print(f"{'maze':<8}{'rows':>6}{'nodes':>14}{'bitboard':>14}{'speed up':>10}")
+    for name, rows, make_board in boards:
+        grid, start, end = make_board(rows)
+
+        started = time.perf_counter()
+        expected = search.run(search.breadth_first(grid, start, end))
+        nodes_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        model = ArrayGrid.from_nodes(grid)
+        result = search.run(
+            bitboard.breadth_first(
+                model,
+                model.index(*start.get_position()),
+                model.index(*end.get_position()),
+            )
+        )
+        bitboard_time = time.perf_counter() - started
+
+        assert len(result.path) == len(expected.path)
+        print(
+            f"{name:<8}{rows:>6}{nodes_time:>13.3f}s{bitboard_time:>13.3f}s"
+            f"{nodes_time / bitboard_time:>9.1f}x"
+        )
+
+
+def benchmark_landmarks(sizes=(25, 75, 151), queries=20, seed=0):
+    """
+    Prints the number of cells expanded by a* with the Manhattan distance and
+    with landmarks, between random pairs of cells on the Swirl and Imperfect
+    mazes of each size.
+    """
+
+    mazes = {"Swirl": maze.basic_swirl, "Imperfect": maze.imperfect}
+
+    print(f"{'maze':<12}{'rows':>6}{'manhattan':>12}{'landmarks':>12}{'fewer':>8}")
+    for name, generate in mazes.items():
+        for rows in sizes:
+            random.seed(seed)
+            model = ArrayGrid.from_nodes(generate(board.make_grid(rows)))
+            free = [index for index in range(model.size) if not model.is_barrier(index)]
+
+            manhattan = expanded = 0
+            for _ in range(queries):
+                start, end = random.sample(free, 2)
+                manhattan += search.run(array_search.a_star(model, start, end)).expanded
+                expanded += search.run(landmarks.a_star(model, start, end)).expanded
+
+            print(
+                f"{name:<12}{rows:>6}{manhattan:>12,}{expanded:>12,}"
+                f"{1 - expanded / manhattan:>8.0%}"
+            )
+
+
+def benchmark_batch(rows=250, queries=400, processes=None, seed=0):
+    """
+    Prints the time taken to solve the same random queries with a* on the
+    "Random" maze, one after another in this process and then with batch.solve
+    and each number of processes (1, 2, 4 and so on up to the number of CPUs by
+    default).
+    """
+
+    grid = batch.generate_map("Random", rows, seed)
+    pairs = batch.random_queries(grid, queries, seed)
+    if processes is None:
+        cpus = len(batch.os_cpus())
+        processes = [1 << power for power in range(cpus.bit_length())]
+        if processes[-1] != cpus:
+            processes.append(cpus)
+
+    started = time.perf_counter()
+    for start, end in pairs:
+        search.run(batch.SOLVERS["a*"](grid, start, end))
+    serial_time = time.perf_counter() - started
+
+    print(f"{'processes':>10}{'time':>10}{'queries/s':>12}{'speed up':>10}")
+    print(f"{'serial':>10}{serial_time:>9.3f}s{queries / serial_time:>12,.0f}")
+    for count in processes:
+        started = time.perf_counter()
+        for _ in batch.solve(grid, pairs, "a*", count):
+            pass
+        pool_time = time.perf_counter() - started
+        print(
+            f"{count:>10}{pool_time:>9.3f}s{queries / pool_time:>12,.0f}"
+            f"{serial_time / pool_time:>9.1f}x"
+        )
+
+
+def _draw_gridlines_per_line(window, rows, size):
+    """
+    How board.draw_gridlines drew the gridlines before they were cached on a
+    surface, a line at a time (with every vertical line drawn once for each row).
+    Only used as a point of comparison.
+    """
+
+    gap = size // rows
+    for i in range(rows):
+        pygame.draw.line(window, board.GRIDLINES, (0, i * gap), (size, i * gap))
+
+        for j in range(rows):
+            pygame.draw.line(window, board.GRIDLINES, (j * gap, 0), (j * gap, size))
+
+
+def time_frames(window, grid, rows, size, draw_gridlines, frames):
+    """Returns the average time taken to draw the whole board, in seconds."""
+
+    view = board.Viewport(rows, rows, size)
+    started = time.perf_counter()
+    for _ in range(frames):
+        window.fill(board.DEFAULT)
+        for row in grid:
+            for node in row:
+                node.draw(window, view.node_rect(node))
+        draw_gridlines(window, rows, size)
+        pygame.display.update()
+
+    return (time.perf_counter() - started) / frames
+
+
+def benchmark_frames(sizes=(25, 75, 250), frames=20, size=825, seed=0):
+    """
+    Prints the time taken to draw a whole frame of the "Random" maze at each
+    size, with the gridlines drawn a line at a time and from the cached layer.
+    Uses SDL's dummy video driver if no other one is chosen, so no display is
+    needed.
+    """
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    window = pygame.display.set_mode((size, size))
+
+    print(f"{'rows':>6}{'lines':>12}{'layer':>12}{'speed up':>10}")
+    for rows in sizes:
+        grid, _, _ = random_board(rows, seed)
+        lines_time = time_frames(
+            window, grid, rows, size, _draw_gridlines_per_line, frames
+        )
+        layer_time = time_frames(window, grid, rows, size, board.draw_gridlines, frames)
+        print(
+            f"{rows:>6}{lines_time * 1000:>10.2f}ms{layer_time * 1000:>10.2f}ms"
+            f"{lines_time / layer_time:>9.1f}x"
+        )
+
+    pygame.display.quit()
+
+
+# Every _ColourNode whose colour or weight changed, noted the way board.Node
+# noted them back then, and emptied after each grid is timed
+_changed_nodes = set()
+
+
+class _ColourNode:
+    """
+    board.Node as it was before it had __slots__ and state codes: a __dict__ for
+    each node, its state kept as its colour, and its position on the window and
+    the size of the grid kept by every node. Only used as a point of comparison.
+    """
+
+    def __init__(self, row, col, size, total_rows):
+        self.row = row
+        self.col = col
+        self.size = size
+        self.x = row * size
+        self.y = col * size
+
+        self.colour = board.DEFAULT
+        self.neighbours = []
+        self.total_rows = total_rows
+        self.is_hard_barrier = False
+        self.weight = board.MIN_WEIGHT
+
+    def set_colour(self, colour):
+        if colour != self.colour:
+            self.colour = colour
+            _changed_nodes.add(self)
+
+    def set_weight(self, weight):
+        if weight != self.weight:
+            self.weight = weight
+            _changed_nodes.add(self)
+
+    def is_barrier(self):
+        return self.colour == board.BARRIER
+
+    def make_barrier(self):
+        self.set_colour(board.BARRIER)
+
+    def make_hard_barrier(self):
+        self.set_colour(board.BARRIER)
+        self.is_hard_barrier = True
+
+    def reset(self):
+        self.set_colour(board.DEFAULT)
+        self.set_weight(board.MIN_WEIGHT)
+
+    def get_position(self):
+        return self.row, self.col
+
+    def update_neighbours(self, grid):
+        self.neighbours = []
+
+        if self.col > 0 and not grid[self.row][self.col - 1].is_barrier():
+            self.neighbours.append(grid[self.row][self.col - 1])
+        if (
+            self.row < self.total_rows - 1
+            and not grid[self.row + 1][self.col].is_barrier()
+        ):
+            self.neighbours.append(grid[self.row + 1][self.col])
+        if (
+            self.col < self.total_rows - 1
+            and not grid[self.row][self.col + 1].is_barrier()
+        ):
+            self.neighbours.append(grid[self.row][self.col + 1])
+        if self.row > 0 and not grid[self.row - 1][self.col].is_barrier():
+            self.neighbours.append(grid[self.row - 1][self.col])
+
+
+def _make_colour_grid(rows, size=825):
+    """How board.make_grid made a grid of _ColourNode objects."""
+
+    grid = []
+    gap = size // rows
+    _changed_nodes.clear()
+
+    for i in range(rows):
+        grid.append([])
+        for j in range(rows):
+            grid[i].append(_ColourNode(i, j, gap, rows))
+
+    board.set_hard_barriers(grid)
+    return grid
+
+
+def _update_neighbours(grid):
+    """
+    Finds the neighbours of every _ColourNode, which had to be done before every
+    search before nodes kept track of them as barriers changed.
+    """
+
+    for row in grid:
+        for node in row:
+            node.update_neighbours(grid)
+
+
+def time_nodes(make_grid, update_neighbours, rows, seed):
+    """
+    Makes a grid with make_grid, puts the "Random" maze on it and runs a* across
+    it, calling update_neighbours (if given) on the grid first. Returns the time
+    taken to make the grid and to run the search, and the number of nodes
+    expanded.
+    """
+
+    # Nothing is left over from the last grid for the garbage collector to go
+    # through while this one is made
+    gc.collect()
+    random.seed(seed)
+    started = time.perf_counter()
+    grid = make_grid(rows)
+    made = time.perf_counter()
+
+    maze.completely_random(grid)
+    start = grid[1][1]
+    end = grid[-2][-2]
+    start.reset()
+    end.reset()
+
+    searched = time.perf_counter()
+    if update_neighbours is not None:
+        update_neighbours(grid)
+    result = search.run(search.a_star(grid, start, end))
+    finished = time.perf_counter()
+
+    _changed_nodes.clear()
+    return made - started, finished - searched, result.expanded
+
+
+def grid_memory(make_grid, update_neighbours, rows):
+    """
+    Returns the memory taken up by a grid made with make_grid, ready to be
+    searched, in bytes.
+    """
+
+    gc.collect()
+    tracemalloc.start()
+    grid = make_grid(rows)
+    if update_neighbours is not None:
+        update_neighbours(grid)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    _changed_nodes.clear()
+    return memory
+
+
+def benchmark_nodes(sizes=(75, 500), seed=0):
+    """
+    Prints the memory taken up by grids of each size, and the time taken to make
+    them and to run a* across the "Random" maze on them (including finding the
+    neighbours of every node first, where that is needed), with the nodes from
+    before they had __slots__, state codes and masks of their neighbours and
+    with board.Node.
+    """
+
+    nodes = {
+        "colours": (_make_colour_grid, _update_neighbours),
+        "states": (board.make_grid, None),
+    }
+
+    print(f"{'rows':>6}{'nodes':>10}{'memory':>12}{'make_grid':>12}{'search':>12}")
+    for rows in sizes:
+        expanded = set()
+        for name, (make_grid, update_neighbours) in nodes.items():
+            make_time, search_time, count = time_nodes(
+                make_grid, update_neighbours, rows, seed
+            )
+            expanded.add(count)
+            memory = grid_memory(make_grid, update_neighbours, rows)
+            print(
+                f"{rows:>6}{name:>10}{memory / 2**20:>10.1f}MB"
+                f"{make_time * 1000:>10.1f}ms{search_time * 1000:>10.1f}ms"
+            )
+        # Both searched the same maze
+        assert len(expanded) == 1
+
+
+def benchmark_hierarchical(
+    sizes=((251, 251), (1001, 9), (9, 1001)), queries=50, seed=0
+):
+    """
+    Prints the number of cells expanded by a* and by HPA* (which only counts the
+    entrances it searches), and how much longer the paths found by HPA* are,
+    between random pairs of cells on the "Random" maze on grids of each size
+    (rows, cols). This is kept out of the visualiser, as the a* search alone can
+    take many times longer than HPA* on a large board.
+
+    Narrow grids, only one cluster across, are included as the clusters next to
+    each other then have to be told apart from those above and below.
+    """
+
+    print(
+        f"{'rows':>6}{'cols':>6}{'found':>8}{'a* expanded':>13}{'hpa* expanded':>15}"
+        f"{'a* cost':>10}{'hpa* cost':>11}{'longer':>8}"
+    )
+    for rows, cols in sizes:
+        grid = batch.generate_map("Random", rows, seed, cols)
+        hierarchy = hierarchical.Hierarchy(grid)
+
+        found = a_star_expanded = hierarchical_expanded = 0
+        a_star_cost = hierarchical_cost = 0
+        for start, end in batch.random_queries(grid, queries, seed):
+            expected = search.run(array_search.a_star(grid, start, end))
+            result = search.run(hierarchy.search(start, end))
+            a_star_expanded += expected.expanded
+            hierarchical_expanded += result.expanded
+
+            # HPA* finds a path whenever there is one, and never a shorter one
+            assert result.found == expected.found
+            if not expected.found:
+                continue
+
+            found += 1
+            cost = batch.path_cost(grid, result.path)
+            expected_cost = batch.path_cost(grid, expected.path)
+            assert cost >= expected_cost
+            a_star_cost += expected_cost
+            hierarchical_cost += cost
+
+        longer = hierarchical_cost / a_star_cost - 1 if a_star_cost else 0
+        print(
+            f"{rows:>6}{cols:>6}{found:>8}{a_star_expanded:>13,}"
+            f"{hierarchical_expanded:>15,}{a_star_cost:>10,}{hierarchical_cost:>11,}"
+            f"{longer:>8.1%}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m pathfind_visualiser.benchmark", description=__doc__
+    )
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    frontiers = subparsers.add_parser(
+        "frontiers", help="Frontier push and pop rates, used as by a search"
+    )
+    frontiers.add_argument("--items", type=int, default=200_000)
+    frontiers.add_argument("--rows", type=int, default=501)
+
+    bitboard_parser = subparsers.add_parser(
+        "bitboard", help="Bitboard against node breadth first search"
+    )
+    bitboard_parser.add_argument("--rows", type=int, nargs="+", default=[75, 250, 1000])
+    bitboard_parser.add_argument("--swirl-rows", type=int, nargs="*", default=[1000])
+
+    landmarks_parser = subparsers.add_parser(
+        "landmarks", help="Cells expanded by a* with and without landmarks"
+    )
+    landmarks_parser.add_argument("--rows", type=int, nargs="+", default=[25, 75, 151])
+    landmarks_parser.add_argument("--queries", type=int, default=20)
+
+    batch_parser = subparsers.add_parser(
+        "batch", help="Batch solving with different numbers of processes"
+    )
+    batch_parser.add_argument("--rows", type=int, default=250)
+    batch_parser.add_argument("--queries", type=int, default=400)
+    batch_parser.add_argument("--processes", type=int, nargs="+")
+
+    frames_parser = subparsers.add_parser(
+        "frames", help="Time taken to draw a frame, with and without cached gridlines"
+    )
+    frames_parser.add_argument("--rows", type=int, nargs="+", default=[25, 75, 250])
+    frames_parser.add_argument("--frames", type=int, default=20)
+
+    nodes_parser = subparsers.add_parser(
+        "nodes", help="Memory and time taken by grids of nodes, before and after slots"
+    )
+    nodes_parser.add_argument("--rows", type=int, nargs="+", default=[75, 500])
+
+    hierarchical_parser = subparsers.add_parser(
+        "hierarchical",
+        help="Cells expanded by HPA* and a*, and the length of their paths",
+    )
+    hierarchical_parser.add_argument(
+        "--sizes",
+        type=lambda size: tuple(map(int, size.split("x"))),
+        nargs="+",
+        default=[(251, 251), (1001, 9), (9, 1001)],
+        metavar="ROWSxCOLS",
+    )
+    hierarchical_parser.add_argument("--queries", type=int, default=50)
+
+    args = parser.parse_args(argv)
+
+    if args.benchmark == "frontiers":
+        benchmark_frontiers(args.items)
+        print()
+        benchmark_search_frontiers(args.rows)
+    elif args.benchmark == "bitboard":
+        benchmark_bitboard(args.rows, args.swirl_rows)
+    elif args.benchmark == "landmarks":
+        benchmark_landmarks(args.rows, args.queries)
+    elif args.benchmark == "batch":
+        benchmark_batch(args.rows, args.queries, args.processes)
+    elif args.benchmark == "frames":
+        benchmark_frames(args.rows, args.frames)
+    elif args.benchmark == "nodes":
+        benchmark_nodes(args.rows)
+    elif args.benchmark == "hierarchical":
+        benchmark_hierarchical(args.sizes, args.queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Breadth first search on bitboards: the whole grid packed into one Python int.
+
+Each cell is one bit of the int, row by row, so a whole ring of cells the same
+distance from the start cell can be moved one cell in every direction with four
+shifts, and the next ring is what that reaches which is free and not yet
+reached. Python ints can have any number of bits, so this works for any size of
+grid with nothing beyond the standard library.
+
+Each row has an extra guard bit after its last cell, which is never free, so
+shifting a cell off the end of one row can't land it on the start of the next.
+"""
+
+import re
+
+from pathfind_visualiser.search import PATH, RING, SearchResult
+
+# Maps each cost byte to the digit of its bit: barriers (0) to "0", others to "1"
+FREE_DIGITS = bytes([ord("0")] + [ord("1")] * 255)
+
+# Any byte with a bit set, for finding the cells of a ring
+SET_BYTE = re.compile(b"[^\x00]")
+# Positions of the bits set in each byte
+BYTE_BITS = [[bit for bit in range(8) if byte >> bit & 1] for byte in range(256)]
+
+
+def pack(grid):
+    """
+    Returns an int with a bit set for every free cell of an ArrayGrid, and the
+    width of each row in bits (cols, plus the guard bit).
+    """
+
+    cols = grid.cols
+    width = cols + 1
+    costs = bytes(grid.costs)
+
+    # Written out as binary digits, so the last row (and in each row, the guard
+    # bit then the last cell) comes first, as the most significant bits
+    rows = [
+        b"0" + costs[row * cols : (row + 1) * cols].translate(FREE_DIGITS)[::-1]
+        for row in reversed(range(grid.rows))
+    ]
+    return int(b"".join(rows), 2), width
+
+
+def count(bits):
+    """Returns the number of bits set (int.bit_count needs Python 3.10)."""
+
+    return bin(bits).count("1")
+
+
+def spread(ring, width):
+    """Returns the bits one cell left, right, above and below the ring's bits."""
+
+    return (ring >> 1) | (ring << 1) | (ring >> width) | (ring << width)
+
+
+def rings(free, width, source, target=None):
+    """
+    Breadth first search over a packed grid from the source bit, yielding each
+    ring as an int (the first ring is just the source bit). Stops after the ring
+    with the target bit in it, if one is given.
+    """
+
+    ring = 1 << source
+    if not ring & free:
+        return
+    # Free cells which have not been reached yet
+    unreached = free ^ ring
+    target = 1 << target if target is not None else 0
+
+    while ring:
+        yield ring
+        if ring & target:
+            return
+
+        ring = spread(ring, width) & unreached
+        unreached ^= ring
+
+
+class RingCells:
+    """
+    The indices of the cells in a ring, in order. They are only worked out from
+    the ring's bits if they are looked at, so searches which don't use them
+    (such as one run with search.run()) don't pay for it.
+    """
+
+    def __init__(self, ring, grid):
+        self.ring = ring
+        self.grid = grid
+
+    def __iter__(self):
+        width = self.grid.cols + 1
+        cols = self.grid.cols
+        data = self.ring.to_bytes((self.ring.bit_length() + 7) // 8, "little")
+
+        # Only the bytes with bits set are looked at one bit at a time
+        for match in SET_BYTE.finditer(data):
+            position = match.start() * 8
+            for bit in BYTE_BITS[data[match.start()]]:
+                row, col = divmod(position + bit, width)
+                yield row * cols + col
+
+    def __len__(self):
+        return count(self.ring)
+
+
+def trim(ring):
+    """
+    Returns the ring shifted down to its lowest set bit, and the position of
+    that bit. Rings are kept like this for finding the path, so each one only
+    takes up as many bits as the cells it spans, rather than the whole grid.
+    """
+
+    low = (ring & -ring).bit_length() - 1
+    return ring >> low, low
+
+
+def path_back(saved, width, end):
+    """
+    Returns the bits of a shortest path to the end bit, given every ring of the
+    search up to the one with the end bit in it (trimmed, see trim), by going
+    backwards through the rings to a neighbour in each one.
+    """
+
+    current = end
+    path = [end]
+
+    for ring, low in reversed(saved[:-1]):
+        # Any neighbour of the current cell in the ring before it will do
+        current = next(
+            neighbour
+            for neighbour in (
+                current - 1,
+                current + width,
+                current + 1,
+                current - width,
+            )
+            if neighbour >= low and ring >> (neighbour - low) & 1
+        )
+        path.append(current)
+
+    path.reverse()
+    return path
+
+
+def breadth_first(grid, start, end):
+    """
+    Breadth first search on an ArrayGrid from the start cell to the end cell,
+    yielding a RING event (with a list of the cells) for each ring, then the
+    usual PATH events. Returns a SearchResult, with the number of rings searched.
+    """
+
+    free, width = pack(grid)
+    cols = grid.cols
+
+    def bit(index):
+        row, col = divmod(index, cols)
+        return row * width + col
+
+    saved = []
+    expanded = 0
+    ring = 0
+    for ring in rings(free, width, bit(start), bit(end)):
+        saved.append(trim(ring))
+        expanded += count(saved[-1][0])
+        yield RING, RingCells(ring, grid)
+
+    if not ring >> bit(end) & 1:
+        return SearchResult(False, expanded=expanded, rings=len(saved))
+
+    path = []
+    for position in path_back(saved, width, bit(end)):
+        row, col = divmod(position, width)
+        path.append(row * cols + col)
+
+    for index in reversed(path[1:-1]):
+        yield PATH, index
+
+    # The ring with the end cell in it is not searched
+    expanded -= count(saved[-1][0])
+    return SearchResult(True, path, expanded, rings=len(saved))
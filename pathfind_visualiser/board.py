@@ -10,6 +10,67 @@ PATH = (255, 255, 0)  # yellow
 CLOSED = (128, 0, 128)  # purple
 START = (0, 0, 255)  # (255, 165, 0)  # orange
 GRIDLINES = (0, 0, 0)  # black
+TERRAIN = (110, 70, 30)  # brown, mixed with DEFAULT depending on the weight
+OUTSIDE = (0, 0, 0)  # black, any part of the window past the edge of the grid
+
+# Range of weights (cost of moving into a node) which can be painted on
+MIN_WEIGHT = 1
+MAX_WEIGHT = 9
+
+# Smallest gap between gridlines for them to be drawn, so they don't cover up
+# the nodes when zoomed out on very large grids
+MIN_GRIDLINE_GAP = 3
+
+# Gridlines drawn onto transparent surfaces, by (gap, size), so they are only
+# drawn once for each size of node (see gridline_layer)
+gridline_layers = {}
+
+# STATES
+# Each node keeps its state as one of these small ints, and is drawn in the
+# colour at that index of STATE_COLOURS
+DEFAULT_STATE = 0
+BARRIER_STATE = 1
+OPEN_STATE = 2
+CLOSED_STATE = 3
+PATH_STATE = 4
+START_STATE = 5
+END_STATE = 6
+STATE_COLOURS = [DEFAULT, BARRIER, OPEN, CLOSED, PATH, START, END]
+
+# DIRECTIONS
+# Bits of the mask each node keeps of which nodes next to it can be moved into.
+# Rows go across the window, so the node "below" is in the next row
+LEFT = 1
+BELOW = 2
+RIGHT = 4
+ABOVE = 8
+ALL_DIRECTIONS = LEFT | BELOW | RIGHT | ABOVE
+# (bit, bit of the opposite direction, row offset, col offset), in the order the
+# neighbours are given, which is important for depth first search
+DIRECTIONS = [
+    (LEFT, RIGHT, 0, -1),
+    (BELOW, ABOVE, 1, 0),
+    (RIGHT, LEFT, 0, 1),
+    (ABOVE, BELOW, -1, 0),
+]
+# Offsets of the neighbours given by each mask
+NEIGHBOUR_OFFSETS = [
+    [(row, col) for bit, _, row, col in DIRECTIONS if mask & bit]
+    for mask in range(ALL_DIRECTIONS + 1)
+]
+
+
+def terrain_colour(weight):
+    """
+    Colour of an empty node with the given weight, going from the default colour
+    for a weight of 1 to the terrain colour for the maximum weight.
+    """
+
+    mix = (weight - MIN_WEIGHT) / (MAX_WEIGHT - MIN_WEIGHT)
+    return tuple(
+        round(default + (terrain - default) * mix)
+        for default, terrain in zip(DEFAULT, TERRAIN)
+    )
 
 
 class Node:
@@ -17,99 +78,164 @@ class Node:
     Defines each square that will appear on the gui.
 
     Contains many helper functions to make the node objects very easy to use.
-    State of the node defined by it's colour
+    State of the node defined by one of the state codes above. Where it is drawn
+    is up to the Viewport, so it only knows its row and column.
     """
 
-    def __init__(self, row, col, size, total_rows):
+    # Large grids have millions of nodes, so they don't each get a __dict__
+    __slots__ = ("row", "col", "grid", "state", "mask", "is_hard_barrier", "weight")
+
+    def __init__(self, row, col, grid, mask=ALL_DIRECTIONS):
         self.row = row
         self.col = col
-        # Squares, so height = width
-        self.size = size
-        # (x, y) is position of top left of square
-        self.x = row * size
-        self.y = col * size
-
-        self.colour = DEFAULT
-        # Will contain nodes which are adjacent and not barriers
-        self.neighbours = []
-        # Required in the update_neighbours function, to avoid index out of range errors
-        self.total_rows = total_rows
+        # Grid the node is in, to find its neighbours in
+        self.grid = grid
+
+        self.state = DEFAULT_STATE
+        # Which nodes next to this one are in the grid and not barriers (see
+        # DIRECTIONS), kept up to date as they change
+        self.mask = mask
         # Hard barriers cannot be changed
         self.is_hard_barrier = False
+        # Cost of moving into this node, used by the weighted algorithms
+        self.weight = MIN_WEIGHT
+
+    # State setting and getting functions
+    def set_state(self, state):
+        """Changes the state, noting the node needs to be drawn again if it did."""
+
+        if state != self.state:
+            # Only barriers change which nodes can be moved between
+            if (state == BARRIER_STATE) != (self.state == BARRIER_STATE):
+                self.update_masks(state != BARRIER_STATE)
+            self.state = state
+            self.note_changed()
 
-    # Colour setting and getting functions
     def is_start(self):
-        return self.colour == START
+        return self.state == START_STATE
 
     def make_start(self):
-        self.colour = START
+        self.set_state(START_STATE)
 
     def is_closed(self):
-        return self.colour == CLOSED
+        return self.state == CLOSED_STATE
 
     def make_closed(self):
-        self.colour = CLOSED
+        self.set_state(CLOSED_STATE)
 
     def is_open(self):
-        return self.colour == OPEN
+        return self.state == OPEN_STATE
 
     def make_open(self):
-        self.colour = OPEN
+        self.set_state(OPEN_STATE)
 
     def is_barrier(self):
-        return self.colour == BARRIER
+        return self.state == BARRIER_STATE
 
     def make_barrier(self):
-        self.colour = BARRIER
+        self.set_state(BARRIER_STATE)
 
     def make_hard_barrier(self):
-        self.colour = BARRIER
+        self.set_state(BARRIER_STATE)
         self.is_hard_barrier = True
 
     def is_end(self):
-        return self.colour == END
+        return self.state == END_STATE
 
     def make_end(self):
-        self.colour = END
+        self.set_state(END_STATE)
 
     def reset(self):
-        self.colour = DEFAULT
+        self.set_state(DEFAULT_STATE)
+        self.set_weight(MIN_WEIGHT)
+
+    def set_weight(self, weight):
+        if weight != self.weight:
+            self.weight = weight
+            self.note_changed()
+
+    def note_changed(self):
+        """Notes the node needs to be drawn again, if its grid is being drawn."""
+
+        changed = self.grid.changed
+        if changed is not None:
+            changed.add(self)
+
+    def is_path(self):
+        return self.state == PATH_STATE
 
     def make_path(self):
-        self.colour = PATH
+        self.set_state(PATH_STATE)
 
     # Other class functions
     def get_position(self):
         return self.row, self.col
 
-    def draw(self, window):
-        pygame.draw.rect(window, self.colour, (self.x, self.y, self.size, self.size))
-
-    def update_neighbours(self, grid):
-        self.neighbours = []
+    def get_colour(self):
+        """Returns the colour the node is drawn in."""
+
+        # Empty nodes show how costly they are to move into
+        if self.state == DEFAULT_STATE and self.weight > MIN_WEIGHT:
+            return terrain_colour(self.weight)
+        return STATE_COLOURS[self.state]
+
+    def draw(self, window, rect):
+        """Draws the node filling the rect (see Viewport.node_rect)."""
+
+        pygame.draw.rect(window, self.get_colour(), rect)
+
+    @property
+    def neighbours(self):
+        """
+        Nodes which are adjacent and not barriers, worked out from the mask each
+        time they are asked for.
+        """
+
+        grid = self.grid
+        row = self.row
+        col = self.col
+        return [
+            grid[row + rows][col + cols] for rows, cols in NEIGHBOUR_OFFSETS[self.mask]
+        ]
+
+    def update_masks(self, passable):
+        """
+        Tells the nodes next to this one whether it can be moved into, when it
+        becomes or stops being a barrier.
+        """
+
+        grid = self.grid
+        for bit, opposite, rows, cols in DIRECTIONS:
+            row = self.row + rows
+            col = self.col + cols
+            if 0 <= row < len(grid) and 0 <= col < len(grid[row]):
+                if passable:
+                    grid[row][col].mask |= opposite
+                else:
+                    grid[row][col].mask &= ~opposite
+
+
+class Grid(list):
+    """
+    Rows of the nodes of the board (see make_grid). Once it has been drawn, it
+    also keeps the nodes whose state or weight has changed since it was last
+    drawn, so only they need to be drawn again (see draw_changes).
+    """
 
-        # Order is important for depth first search algorithm
-        # Checks node to the left
-        if self.col > 0 and not grid[self.row][self.col - 1].is_barrier():
-            self.neighbours.append(grid[self.row][self.col - 1])
+    __slots__ = ("changed",)
 
-        # Checks node below
-        if (
-            self.row < self.total_rows - 1
-            and not grid[self.row + 1][self.col].is_barrier()
-        ):
-            self.neighbours.append(grid[self.row + 1][self.col])
+    def __init__(self, rows=()):
+        super().__init__(rows)
+        # None until the grid is drawn, so grids which never are (in batch runs
+        # or exports) don't keep every node which has ever changed
+        self.changed = None
 
-        # Checks node to the right
-        if (
-            self.col < self.total_rows - 1
-            and not grid[self.row][self.col + 1].is_barrier()
-        ):
-            self.neighbours.append(grid[self.row][self.col + 1])
+    def track_changes(self):
+        """Starts noting the nodes which change, returning the set they are in."""
 
-        # Checks node above
-        if self.row > 0 and not grid[self.row - 1][self.col].is_barrier():
-            self.neighbours.append(grid[self.row - 1][self.col])
+        if self.changed is None:
+            self.changed = set()
+        return self.changed
 
 
 # Board Functions #####################################################
@@ -129,61 +255,291 @@ def set_hard_barriers(grid):
         column[-1].make_hard_barrier()
 
 
-def make_grid(rows, size):
-    """Instantiates all the nodes and stores them in a 2d array."""
+def clear_search(grid):
+    """
+    Turns nodes coloured in by a previous search (open, closed or on the path)
+    back to empty nodes, keeping their weights.
+    """
 
-    grid = []
-    gap = size // rows
+    for row in grid:
+        for node in row:
+            if node.is_open() or node.is_closed() or node.is_path():
+                node.set_state(DEFAULT_STATE)
+
+
+def make_grid(rows, cols=None):
+    """
+    Instantiates all the nodes and stores them in a 2d array, with as many
+    columns as rows unless given.
+    """
 
+    cols = cols or rows
+
+    grid = Grid()
     for i in range(rows):
-        grid.append([])
-        # Same number of columns as rows so rows can be used again
-        for j in range(rows):
-            node = Node(i, j, gap, rows)
-            grid[i].append(node)
+        # Nodes on the edges have nothing past them
+        mask = ALL_DIRECTIONS
+        if i == 0:
+            mask &= ~ABOVE
+        if i == rows - 1:
+            mask &= ~BELOW
+
+        row = [Node(i, j, grid, mask) for j in range(cols)]
+        row[0].mask &= ~LEFT
+        row[-1].mask &= ~RIGHT
+        grid.append(row)
 
     set_hard_barriers(grid)
 
     return grid
 
 
-def draw_gridlines(window, rows, size):
+def gridline_layer(gap, size):
+    """
+    Returns a surface the size of the window with nothing on it but gridlines the
+    gap apart, drawing them the first time it is asked for with this gap and size.
+    """
+
+    key = (gap, size)
+    if key not in gridline_layers:
+        layer = pygame.Surface((size, size))
+        # Everything but the gridlines is the colour key, so it is transparent
+        transparent = (255, 0, 255)
+        layer.fill(transparent)
+        layer.set_colorkey(transparent)
+
+        for i in range(size // gap + 1):
+            pygame.draw.line(layer, GRIDLINES, (0, i * gap), (size, i * gap))
+            pygame.draw.line(layer, GRIDLINES, (i * gap, 0), (i * gap, size))
+
+        gridline_layers[key] = layer
+
+    return gridline_layers[key]
+
+
+def draw_gridlines(window, rows, size, area=None):
     """
     Draws gridlines which allows each node to be distinguishable from those around it.
+    Only draws them inside the area (a rect) if one is given.
     """
 
-    gap = size // rows
-    for i in range(rows):
-        pygame.draw.line(window, GRIDLINES, (0, i * gap), (size, i * gap))
+    layer = gridline_layer(size // rows, size)
+    if area is None:
+        window.blit(layer, (0, 0))
+    else:
+        window.blit(layer, area, area)
+
+
+class Viewport:
+    """
+    The part of a grid of rows x cols nodes shown in the window, which can be
+    zoomed in and out and moved around. Only the nodes inside it are drawn or can
+    be clicked on, so the time taken to draw the board depends on the size of the
+    window rather than the size of the grid.
 
-        for j in range(rows):
-            pygame.draw.line(window, GRIDLINES, (j * gap, 0), (j * gap, size))
+    As with the nodes, rows go across the window and columns go down it.
+    """
 
+    def __init__(self, rows, cols, size):
+        self.rows = rows
+        self.cols = cols
+        self.size = size
 
-def draw_board(window, grid, rows, size):
-    """Updates the display, putting the gridlines on top of all the nodes."""
+        # Gap between gridlines (the width of a node) when zoomed out as far as
+        # possible, showing the whole grid if it fits
+        self.min_gap = max(1, size // max(rows, cols))
+        # Zoomed in as far as possible, there are still a few nodes across
+        self.max_gap = max(self.min_gap, size // 8)
+        self.gap = self.min_gap
+
+        # Row and column of the node in the top left corner
+        self.row = 0
+        self.col = 0
+        # Pixels the mouse has been dragged which haven't yet moved the view a
+        # whole node
+        self.drag_x = 0
+        self.drag_y = 0
+
+    def visible(self):
+        """Returns the ranges of the rows and columns of the nodes in view."""
+
+        # Nodes only partly in view at the edges of the window are included
+        across = -(-self.size // self.gap)
+        return (
+            range(self.row, min(self.rows, self.row + across)),
+            range(self.col, min(self.cols, self.col + across)),
+        )
+
+    def shows(self, node):
+        """Returns whether any of the node is in view."""
+
+        across = -(-self.size // self.gap)
+        return (
+            self.row <= node.row < self.row + across
+            and self.col <= node.col < self.col + across
+        )
+
+    def node_rect(self, node):
+        """Returns the rect of the window the node is drawn in."""
+
+        return pygame.Rect(
+            (node.row - self.row) * self.gap,
+            (node.col - self.col) * self.gap,
+            self.gap,
+            self.gap,
+        )
+
+    def board_rect(self):
+        """Returns the rect of the window covered by nodes."""
+
+        rows, cols = self.visible()
+        return pygame.Rect(0, 0, len(rows) * self.gap, len(cols) * self.gap).clip(
+            (0, 0, self.size, self.size)
+        )
+
+    def draw_gridlines(self, window, area=None):
+        """
+        Draws the gridlines over the nodes in view, or only those inside the area
+        (a rect) if given. None are drawn if the nodes are too small for them.
+        """
+
+        if self.gap < MIN_GRIDLINE_GAP:
+            return
+
+        area = self.board_rect() if area is None else self.board_rect().clip(area)
+        window.blit(gridline_layer(self.gap, self.size), area, area)
+
+    def move_to(self, row, col):
+        """
+        Moves the top left corner of the view to the given node, as far as it can
+        go without leaving the grid. Returns whether the view moved.
+        """
+
+        across = self.size // self.gap
+        row = max(0, min(row, self.rows - across))
+        col = max(0, min(col, self.cols - across))
+
+        moved = (row, col) != (self.row, self.col)
+        self.row = row
+        self.col = col
+        return moved
 
-    window.fill(DEFAULT)
+    def move(self, rows, cols):
+        """Moves the view by a number of rows and columns."""
 
-    for row in grid:
-        for node in row:
-            node.draw(window)
+        return self.move_to(self.row + rows, self.col + cols)
+
+    def drag(self, x, y):
+        """Moves the view along with the mouse, which moved by (x, y) pixels."""
+
+        self.drag_x += x
+        self.drag_y += y
+        rows = int(self.drag_x / self.gap)
+        cols = int(self.drag_y / self.gap)
+        self.drag_x -= rows * self.gap
+        self.drag_y -= cols * self.gap
+
+        return self.move(-rows, -cols)
+
+    def zoom(self, steps, pos):
+        """
+        Zooms in for a positive number of steps or out for a negative one,
+        doubling or halving the width of the nodes with each step, keeping the
+        node at the position (in pixels) where it is. Returns whether the view
+        changed.
+        """
+
+        if steps > 0:
+            gap = min(self.gap << steps, self.max_gap)
+        else:
+            gap = max(self.gap >> -steps, self.min_gap)
+
+        x, y = pos
+        row = self.row + x // self.gap
+        col = self.col + y // self.gap
+
+        zoomed = gap != self.gap
+        self.gap = gap
+        moved = self.move_to(row - x // gap, col - y // gap)
+        return zoomed or moved
+
+
+def draw_board(window, grid, view):
+    """
+    Updates the display, drawing the nodes in view (a Viewport) with the gridlines
+    on top of them.
+    """
 
-    draw_gridlines(window, rows, size)
+    window.fill(OUTSIDE)
+
+    rows, cols = view.visible()
+    for row in grid[rows.start : rows.stop]:
+        for node in row[cols.start : cols.stop]:
+            node.draw(window, view.node_rect(node))
+
+    view.draw_gridlines(window)
+    grid.track_changes().clear()
 
     pygame.display.update()
 
 
-def get_clicked_position(pos, rows, size):
+def draw_changes(window, grid, view):
+    """
+    Updates only the parts of the display with nodes which have changed since the
+    board was last drawn, so the time taken depends on how many nodes changed
+    rather than on the size of the grid. The whole board must have been drawn
+    once first, with draw_board.
+    """
+
+    changed = grid.changed
+    if not changed:
+        return
+
+    rects = []
+    for node in changed:
+        # Nodes out of view are drawn whenever the view is moved onto them
+        if not view.shows(node):
+            continue
+
+        rect = view.node_rect(node)
+        node.draw(window, rect)
+        # The node covers the gridlines along its edges
+        view.draw_gridlines(window, rect)
+        rects.append(rect)
+    changed.clear()
+
+    pygame.display.update(rects)
+
+
+class NodeRenderer:
+    """
+    Draws the nodes of a grid in view onto the window node by node, redrawing
+    only the nodes which have changed after the first frame. See
+    palette.PaletteRenderer for another way of drawing it, with the same methods.
+    """
+
+    def __init__(self, grid, view):
+        self.grid = grid
+        self.view = view
+
+    def draw_board(self, window):
+        draw_board(window, self.grid, self.view)
+
+    def draw_changes(self, window):
+        draw_changes(window, self.grid, self.view)
+
+
+def get_clicked_position(pos, view):
     """
-    Returns the location of the node which the position is hovering over (top left
-    of the square).
+    Returns the location of the node which the position is hovering over, in the
+    Viewport, or None if it is past the edge of the grid.
     """
 
-    gap = size // rows
-    y, x = pos
+    x, y = pos
 
-    row = y // gap
-    col = x // gap
+    row = view.row + x // view.gap
+    col = view.col + y // view.gap
 
-    return row, col
+    if row < view.rows and col < view.cols:
+        return row, col
+    return None
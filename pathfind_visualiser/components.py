@@ -0,0 +1,252 @@
+"""
+Connected components of the free cells of an ArrayGrid.
+
+Every free cell gets the label of the component it is in, so whether there is a
+path between two cells at all is known straight away, without a search flooding
+everything reachable from the start cell first to find out there is not.
+
+Labels are kept up to date as cells change. A cell which stops being a barrier
+can only join components together, which is done straight away by merging their
+labels. A new barrier can split a component in two, but finding out whether it
+did takes a search through the component, so the component is only marked as
+possibly split. The next time it is asked about, it is searched once from the
+cells around its new barriers and each part of it is given a label of its own,
+so it is known straight away again after that.
+
+The first labelling uses numpy if it is installed, which is much faster on large
+grids, and otherwise a search from every unlabelled cell.
+"""
+
+from array import array
+from collections import deque
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from pathfind_visualiser.array_grid import BARRIER
+
+# Label of barrier cells
+NO_COMPONENT = -1
+
+
+def label_cells(grid):
+    """
+    Returns a list of the component label of each cell of the grid (NO_COMPONENT
+    for barriers), and the number of labels used.
+    """
+
+    if np is not None:
+        return label_cells_numpy(grid)
+
+    labels = [NO_COMPONENT] * grid.size
+    costs = grid.costs
+    count = 0
+
+    for cell in range(grid.size):
+        if costs[cell] == BARRIER or labels[cell] != NO_COMPONENT:
+            continue
+
+        labels[cell] = count
+        queue = deque([cell])
+        while queue:
+            for neighbour in grid.neighbours(queue.popleft()):
+                if labels[neighbour] == NO_COMPONENT:
+                    labels[neighbour] = count
+                    queue.append(neighbour)
+        count += 1
+
+    return labels, count
+
+
+def label_cells_numpy(grid):
+    """
+    Same as label_cells, with whole array operations instead of a search.
+
+    Each row is split into runs of free cells, and runs which touch the run below
+    them are joined by repeatedly pointing the larger of their two labels at the
+    smaller one, until every run in a component points at the same label.
+    """
+
+    rows, cols = grid.rows, grid.cols
+    free = np.frombuffer(grid.costs, dtype=np.uint8).reshape(rows, cols) != BARRIER
+
+    # Label of the run of free cells each cell is in, counting along the rows
+    run_starts = free.copy()
+    run_starts[:, 1:] &= ~free[:, :-1]
+    runs = np.cumsum(run_starts.ravel()) - 1
+    count = int(run_starts.sum())
+
+    # Pairs of runs with a free cell directly above a free cell
+    touching = (free[:-1] & free[1:]).ravel()
+    upper = runs[:-cols][touching]
+    lower = runs[cols:][touching]
+
+    parents = np.arange(count)
+    while True:
+        upper_roots = parents[upper]
+        lower_roots = parents[lower]
+        different = upper_roots != lower_roots
+        if not different.any():
+            break
+
+        np.minimum.at(
+            parents,
+            np.maximum(upper_roots, lower_roots)[different],
+            np.minimum(upper_roots, lower_roots)[different],
+        )
+        # Points every run straight at the smallest label it leads to
+        while True:
+            grandparents = parents[parents]
+            if (grandparents == parents).all():
+                break
+            parents = grandparents
+
+    labels = np.full(grid.size, NO_COMPONENT)
+    labels[free.ravel()] = parents[runs[free.ravel()]]
+    return labels.tolist(), count
+
+
+class ComponentIndex:
+    """
+    Component labels of the cells of an ArrayGrid.
+
+    Once attached to the grid (see get_components), it is told about every cell
+    which changes. Components which are merged keep one label between them, with
+    the merged labels pointing at it.
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+
+        labels, count = label_cells(grid)
+        self.labels = array("i", labels)
+        # Label each label was merged into (or itself if it has not been merged)
+        self.merged = list(range(count))
+        # Labels of components which a new barrier may have split in two, and the
+        # cells next to their new barriers (every part of a split component has
+        # at least one of them in it)
+        self.possibly_split = {}
+
+    def new_label(self):
+        self.merged.append(len(self.merged))
+        return len(self.merged) - 1
+
+    def find(self, label):
+        """Returns the label the given one has been merged into."""
+
+        merged = self.merged
+        while merged[label] != label:
+            # Skips every other label on the way, so the next find is shorter
+            merged[label] = merged[merged[label]]
+            label = merged[label]
+        return label
+
+    def component_label(self, index):
+        """Returns the label of the given cell's component, or NO_COMPONENT."""
+
+        label = self.labels[index]
+        return label if label == NO_COMPONENT else self.find(label)
+
+    def cell_changed(self, index):
+        """
+        Called by the grid when a cell's cost changes. Only matters if the cell
+        became a barrier or stopped being one.
+        """
+
+        neighbours = self.grid.neighbours(index)
+
+        if self.grid.costs[index] == BARRIER:
+            if self.labels[index] == NO_COMPONENT:
+                return
+            label = self.component_label(index)
+            self.labels[index] = NO_COMPONENT
+            # The component can only be split if it went through this cell, but
+            # once it may have been split, a cell at the end of one of its parts
+            # may be the last cell next to a barrier between the parts
+            if len(neighbours) > 1 or label in self.possibly_split:
+                self.possibly_split.setdefault(label, []).extend(neighbours)
+            return
+
+        if self.labels[index] != NO_COMPONENT:
+            return
+
+        labels = {self.component_label(neighbour) for neighbour in neighbours}
+        if not labels:
+            self.labels[index] = self.new_label()
+            return
+
+        # Joins all the components around the cell together
+        label = min(labels)
+        for other in labels:
+            self.merged[other] = label
+            if other != label and other in self.possibly_split:
+                self.possibly_split.setdefault(label, []).extend(
+                    self.possibly_split.pop(other)
+                )
+        self.labels[index] = label
+
+    def connected(self, start, end):
+        """Returns True if there is a path between the two cells."""
+
+        label = self.component_label(start)
+        if label == NO_COMPONENT or label != self.component_label(end):
+            return False
+        if label not in self.possibly_split:
+            return True
+
+        self.resolve_split(label)
+        return self.component_label(start) == self.component_label(end)
+
+    def resolve_split(self, label):
+        """
+        Gives each part of a possibly split component a new label of its own, by
+        searching from the cells next to its new barriers. Every cell of the
+        component is searched once, and it is no longer possibly split after.
+        """
+
+        labels = self.labels
+        for cell in self.possibly_split.pop(label):
+            # Skips cells already given a new label, or which became barriers
+            if self.component_label(cell) != label:
+                continue
+
+            new_label = self.new_label()
+            for found in self.search(cell):
+                labels[found] = new_label
+
+    def search(self, index):
+        """Returns every cell which can be reached from the given cell."""
+
+        found = {index}
+        queue = deque([index])
+
+        while queue:
+            for neighbour in self.grid.neighbours(queue.popleft()):
+                if neighbour not in found:
+                    found.add(neighbour)
+                    queue.append(neighbour)
+
+        return found
+
+    def component(self, index):
+        """Returns every cell in the given cell's component, as a set."""
+
+        label = self.component_label(index)
+        if label == NO_COMPONENT:
+            return set()
+        if label in self.possibly_split:
+            self.resolve_split(label)
+        return self.search(index)
+
+
+def get_components(grid):
+    """Returns the component index attached to the grid, labelling it if needed."""
+
+    index = grid.attached.get("components")
+    if index is None:
+        index = ComponentIndex(grid)
+        grid.attach("components", index)
+
+    return index
@@ -0,0 +1,327 @@
+"""
+Compresses a maze into a graph of its junctions.
+
+Generated mazes are mostly corridors one cell wide, and searching one cell at a
+time along a corridor with no turnings off it is wasted work. Instead, dead end
+branches are trimmed off completely (nothing can go through them, only into
+them), and each corridor left between two junctions becomes a single edge. A
+search then only has to go from junction to junction, and the corridors it uses
+are turned back into cells afterwards.
+
+The graph is cached on the grid until it changes, so it is only built once for
+each maze.
+"""
+
+from collections import deque
+
+from pathfind_visualiser.array_grid import BARRIER
+from pathfind_visualiser.frontier import make_frontier
+from pathfind_visualiser.search import CLOSE, PATH, SearchResult
+
+
+class JunctionGraph:
+    """
+    Junctions and corridors of an ArrayGrid. Only valid for the version of the
+    grid it was built from (see get_junction_graph).
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+
+        # Trimmed cell: next cell out of its dead end (None for the last cell of
+        # a part of the grid which is nothing but dead ends)
+        self.exits = {}
+        # Number of neighbours which were not trimmed, for each cell left
+        self.degrees = {}
+
+        # Cells of each corridor, from the junction at one end to the other
+        self.corridors = []
+        # Cell inside a corridor: (corridor, position in the corridor)
+        self.positions = {}
+        # Junction: (junction, cost, corridor, forwards) for each corridor from it
+        self.edges = {}
+
+        self.trim()
+        self.compress()
+
+    def trim(self):
+        """Trims off dead ends, one cell at a time from the end of each."""
+
+        grid = self.grid
+        exits = self.exits
+        degrees = self.degrees
+
+        for index in range(grid.size):
+            if grid.costs[index] != BARRIER:
+                degrees[index] = len(grid.neighbours(index))
+
+        queue = deque(index for index, degree in degrees.items() if degree <= 1)
+        while queue:
+            current = queue.popleft()
+            exits[current] = None
+            del degrees[current]
+
+            for neighbour in grid.neighbours(current):
+                if neighbour in exits:
+                    continue
+                exits[current] = neighbour
+                degrees[neighbour] -= 1
+                if degrees[neighbour] == 1:
+                    queue.append(neighbour)
+
+    def compress(self):
+        """Turns the corridors between junctions into edges."""
+
+        junctions = [index for index, degree in self.degrees.items() if degree > 2]
+        for junction in junctions:
+            self.edges[junction] = []
+        for junction in junctions:
+            self.follow_corridors(junction)
+
+        # Anything left is a loop with no junctions on it, so any cell of it is
+        # made into one
+        for index in self.degrees:
+            if index not in self.positions and index not in self.edges:
+                self.edges[index] = []
+                self.follow_corridors(index)
+
+    def follow_corridors(self, junction):
+        """Adds the corridors from a junction which have not been added yet."""
+
+        for neighbour in self.grid.neighbours(junction):
+            if neighbour in self.exits or neighbour in self.positions:
+                continue
+            # Corridors with no cells between two junctions are added from the
+            # junction with the lower index
+            if neighbour in self.edges and neighbour < junction:
+                continue
+
+            cells = [junction, neighbour]
+            while cells[-1] not in self.edges:
+                cells.append(
+                    next(
+                        index
+                        for index in self.grid.neighbours(cells[-1])
+                        if index != cells[-2] and index not in self.exits
+                    )
+                )
+
+            self.add_corridor(cells)
+
+    def add_corridor(self, cells):
+        costs = self.grid.costs
+        corridor = len(self.corridors)
+        self.corridors.append(cells)
+
+        for position in range(1, len(cells) - 1):
+            self.positions[cells[position]] = (corridor, position)
+
+        forwards = sum(costs[index] for index in cells[1:])
+        backwards = sum(costs[index] for index in cells[:-1])
+        self.edges[cells[0]].append((cells[-1], forwards, corridor, True))
+        self.edges[cells[-1]].append((cells[0], backwards, corridor, False))
+
+    def dead_end(self, index):
+        """
+        Returns the cells from the given cell out of its dead end to the first cell
+        which was not trimmed (or to the end of a part of the grid which is
+        nothing but dead ends), or just the cell if it was not trimmed.
+        """
+
+        cells = [index]
+        while self.exits.get(cells[-1]) is not None:
+            cells.append(self.exits[cells[-1]])
+        return cells
+
+    def leaving(self, index):
+        """
+        Returns (junction, cost, cells) for each junction which can be reached
+        from the given cell without going through another junction.
+        """
+
+        if index in self.edges:
+            return [(index, 0, [index])]
+
+        costs = self.grid.costs
+        corridor, position = self.positions[index]
+        cells = self.corridors[corridor]
+        return [
+            (
+                cells[0],
+                sum(costs[cell] for cell in cells[:position]),
+                cells[position::-1],
+            ),
+            (
+                cells[-1],
+                sum(costs[cell] for cell in cells[position + 1 :]),
+                cells[position:],
+            ),
+        ]
+
+    def arriving(self, index):
+        """
+        Returns {junction: (cost, cells)} for each junction the given cell can be
+        reached from without going through another junction.
+        """
+
+        if index in self.edges:
+            return {index: (0, [index])}
+
+        costs = self.grid.costs
+        corridor, position = self.positions[index]
+        cells = self.corridors[corridor]
+        arriving = {
+            cells[-1]: (
+                sum(costs[cell] for cell in cells[position:-1]),
+                cells[: position - 1 : -1],
+            )
+        }
+        cost = sum(costs[cell] for cell in cells[1 : position + 1])
+        # Both ends are the same junction for a loop, so keeps the cheaper way
+        if cells[0] not in arriving or cost < arriving[cells[0]][0]:
+            arriving[cells[0]] = (cost, cells[: position + 1])
+        return arriving
+
+    def along_corridor(self, first, second):
+        """
+        Returns (cost, cells) going straight along the corridor from the first
+        cell to the second, or None if they are not inside the same corridor.
+        """
+
+        if first not in self.positions or second not in self.positions:
+            return None
+
+        corridor, start = self.positions[first]
+        other, end = self.positions[second]
+        if corridor != other:
+            return None
+
+        costs = self.grid.costs
+        cells = self.corridors[corridor]
+        if start <= end:
+            cells = cells[start : end + 1]
+        else:
+            cells = cells[end : start + 1][::-1]
+        return sum(costs[cell] for cell in cells[1:]), cells
+
+    def search(self, start, end):
+        """
+        Dijkstra's search from the start cell to the end cell through the
+        junctions, yielding a CLOSE event for each junction searched, then the
+        usual PATH events for the cells of the path. Returns a SearchResult.
+        """
+
+        grid = self.grid
+        costs = grid.costs
+        stats = {"junctions": len(self.edges), "trimmed": len(self.exits)}
+
+        if costs[start] == BARRIER or costs[end] == BARRIER:
+            return SearchResult(False, **stats)
+
+        # Out of any dead ends the start and end cells are in
+        out_of_start = self.dead_end(start)
+        out_of_end = self.dead_end(end)
+
+        # In the same dead end (or part of the grid with no loops), there is only
+        # one way between them
+        shared = {cell: position for position, cell in enumerate(out_of_start)}
+        for position, cell in enumerate(out_of_end):
+            if cell in shared:
+                path = out_of_start[: shared[cell] + 1] + out_of_end[:position][::-1]
+                return (yield from self.found(path, 0, stats))
+
+        first = out_of_start[-1]
+        last = out_of_end[-1]
+        if first in self.exits or last in self.exits:
+            return SearchResult(False, **stats)
+
+        # Best way found so far from the first cell to the last, as (cost, cells)
+        best = self.along_corridor(first, last)
+        best_cost = best[0] if best else None
+
+        arriving = self.arriving(last)
+
+        open_set = make_frontier("heap")
+        distances = {}
+        # Junction: (previous junction, cells from it to this junction)
+        previous = {}
+        for junction, cost, cells in self.leaving(first):
+            if cost < distances.get(junction, cost + 1):
+                distances[junction] = cost
+                previous[junction] = (None, cells)
+                open_set.push(junction, cost)
+
+        closed = set()
+        expanded = 0
+
+        while open_set:
+            current = open_set.pop()
+            if current in closed:
+                continue
+            closed.add(current)
+
+            if best_cost is not None and distances[current] >= best_cost:
+                break
+
+            if current in arriving:
+                cost, cells = arriving[current]
+                if best_cost is None or distances[current] + cost < best_cost:
+                    best_cost = distances[current] + cost
+                    best = (best_cost, self.cells_to(current, previous) + cells[1:])
+
+            for junction, cost, corridor, forwards in self.edges[current]:
+                distance = distances[current] + cost
+                if distance < distances.get(junction, distance + 1):
+                    distances[junction] = distance
+                    cells = self.corridors[corridor]
+                    previous[junction] = (current, cells if forwards else cells[::-1])
+                    open_set.push(junction, distance)
+
+            expanded += 1
+            yield CLOSE, current
+
+        if best is None:
+            return SearchResult(False, expanded=expanded, **stats)
+
+        path = out_of_start[:-1] + best[1] + out_of_end[-2::-1]
+        return (yield from self.found(path, expanded, stats))
+
+    @staticmethod
+    def cells_to(junction, previous):
+        """Returns the cells from the first cell of a search to the junction."""
+
+        sections = []
+        while junction is not None:
+            junction, cells = previous[junction]
+            sections.append(cells)
+
+        path = list(sections.pop())
+        while sections:
+            path.extend(sections.pop()[1:])
+        return path
+
+    @staticmethod
+    def found(path, expanded, stats):
+        for index in reversed(path[1:-1]):
+            yield PATH, index
+
+        return SearchResult(True, path, expanded, **stats)
+
+
+def get_junction_graph(grid):
+    """
+    Returns the junction graph for the current version of the grid, building it
+    only if it has not been cached yet.
+    """
+
+    return grid.cached("junction graph", lambda: JunctionGraph(grid))
+
+
+def search(grid, start, end):
+    """
+    Finds the shortest path from the start cell to the end cell through the
+    junction graph of the grid, with the same events and result as the searches
+    in array_search.py.
+    """
+
+    return (yield from get_junction_graph(grid).search(start, end))
@@ -0,0 +1,222 @@
+"""
+Exports searches as animations, without a display.
+
+A search is recorded (see trace.py), or read from a trace file, and every so
+many steps of it are drawn onto surfaces off the screen, under SDL's dummy video
+driver, as either a numbered sequence of PNG images or one animated GIF. Drawing
+and compressing the frames is spread over a pool of processes, each one given
+the trace once and then a run of frames at a time.
+
+Run from the command line with:
+
+    pathfind-visualiser export frames/ --maze Imperfect --rows 251
+    pathfind-visualiser export search.gif --trace search.trace --every 50
+"""
+
+import argparse
+import os
+from multiprocessing import Pool
+
+import pygame
+
+from pathfind_visualiser import board, gif, palette, trace
+
+# Size of the board in the visualiser, which frames are as close to as they can
+# be without cells being left out, unless a cell size is given
+DEFAULT_SIZE = 825
+# Number of frames exported, at the most, unless the steps between them are given
+DEFAULT_FRAMES = 100
+# Frames per second of GIF animations
+DEFAULT_FPS = 25
+# Frames per second which can be given. GIF delays are in hundredths of a
+# second, and most viewers show frames with a delay of less than 2 at about 10
+# frames per second instead, so delays are never less than 2
+MAX_FPS = 100
+MIN_DELAY = 2
+
+# Set in each worker process by _load
+_trace = None
+
+
+def frame_steps(step_count, every):
+    """Returns the steps to draw a frame of: every so many, then the last."""
+
+    steps = list(range(0, step_count, every))
+    steps.append(step_count)
+    return steps
+
+
+def draw_frame(cells, rows, cols, cell_size):
+    """
+    Returns a palette surface of the board, drawn from an image of the cells with
+    a pixel for each (see replay.Viewer).
+    """
+
+    frame = pygame.transform.scale(
+        palette.as_board(cells), (rows * cell_size, cols * cell_size)
+    )
+
+    if cell_size >= board.MIN_GRIDLINE_GAP:
+        width, height = frame.get_size()
+        for row in range(rows):
+            pygame.draw.line(
+                frame, board.GRIDLINES, (row * cell_size, 0), (row * cell_size, height)
+            )
+        for col in range(cols):
+            pygame.draw.line(
+                frame, board.GRIDLINES, (0, col * cell_size), (width, col * cell_size)
+            )
+
+    return frame
+
+
+def _load(loaded):
+    """Pool initializer, keeping the trace for the frames drawn by the worker."""
+
+    global _trace
+    _trace = loaded
+
+
+def _export_frames(task):
+    """
+    Draws a run of frames in a worker process. Saves them as PNG images if given
+    a directory, otherwise returns them compressed as GIF frames.
+    """
+
+    frames, cell_size, directory, delay = task
+    playhead = trace.Playhead(_trace)
+    cells = pygame.image.frombuffer(playhead.state, (_trace.cols, _trace.rows), "P")
+    cells.set_palette(palette.PALETTE)
+
+    encoded = []
+    for number, step in frames:
+        # The frames are in order, so each one only needs the events after the
+        # frame before it
+        _trace.seek(step, playhead)
+        frame = draw_frame(cells, _trace.rows, _trace.cols, cell_size)
+
+        if directory is not None:
+            pygame.image.save(frame, os.path.join(directory, f"frame{number:05}.png"))
+        else:
+            width, height = frame.get_size()
+            encoded.append(
+                gif.encode_frame(
+                    pygame.image.tostring(frame, "P"),
+                    width,
+                    height,
+                    len(palette.PALETTE),
+                    delay,
+                )
+            )
+
+    return encoded
+
+
+def export(
+    recorded,
+    output,
+    every=None,
+    cell_size=None,
+    processes=None,
+    fps=DEFAULT_FPS,
+):
+    """
+    Exports a Trace as an animated GIF if the output ends in .gif, or otherwise
+    as PNG images in the output directory. Returns the number of frames.
+
+    GIFs are shown at the given frames per second, up to 50 (see MIN_DELAY).
+    """
+
+    if not 1 <= fps <= MAX_FPS:
+        raise ValueError(f"fps must be from 1 to {MAX_FPS}, not {fps}")
+    delay = max(MIN_DELAY, 100 // fps)
+
+    if every is None:
+        every = max(1, -(-recorded.step_count // DEFAULT_FRAMES))
+    if cell_size is None:
+        cell_size = max(1, DEFAULT_SIZE // max(recorded.rows, recorded.cols))
+
+    frames = list(enumerate(frame_steps(recorded.step_count, every)))
+
+    directory = None
+    if not output.lower().endswith(".gif"):
+        directory = output
+        os.makedirs(directory, exist_ok=True)
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    # Runs of frames in order, a few for each process so they finish together
+    run_length = max(1, -(-len(frames) // (processes * 4)))
+    tasks = [
+        (frames[position : position + run_length], cell_size, directory, delay)
+        for position in range(0, len(frames), run_length)
+    ]
+
+    with Pool(processes, initializer=_load, initargs=(recorded,)) as pool:
+        # Kept in order, as the frames of a GIF have to be written in order
+        encoded = [frame for run in pool.imap(_export_frames, tasks) for frame in run]
+
+    if directory is None:
+        with open(output, "wb") as file:
+            gif.write(
+                file,
+                recorded.rows * cell_size,
+                recorded.cols * cell_size,
+                palette.PALETTE,
+                encoded,
+            )
+
+    return len(frames)
+
+
+def frames_per_second(value):
+    """Converts the --fps argument, which has to be from 1 to MAX_FPS."""
+
+    fps = int(value)
+    if not 1 <= fps <= MAX_FPS:
+        raise argparse.ArgumentTypeError(f"must be from 1 to {MAX_FPS}")
+    return fps
+
+
+def add_parser(subparsers):
+    """Adds the export subcommand to the subparsers of the command line."""
+
+    parser = subparsers.add_parser(
+        "export",
+        help="Export a search as PNG images or an animated GIF, without a display",
+        description=__doc__,
+    )
+    parser.add_argument(
+        "output", help="GIF file to write (.gif), or directory for PNG images"
+    )
+    parser.add_argument(
+        "--trace", help="Trace file to export, instead of recording a search"
+    )
+    trace.add_search_arguments(parser)
+
+    parser.add_argument("--every", type=int, help="Steps between frames")
+    parser.add_argument("--cell-size", type=int, help="Pixels across each cell")
+    parser.add_argument(
+        "--fps",
+        type=frames_per_second,
+        default=DEFAULT_FPS,
+        help="Frames per second of a GIF",
+    )
+    parser.add_argument("--processes", type=int)
+
+
+def run_command(args):
+    """Runs the export subcommand."""
+
+    # No window is ever opened
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    if args.trace:
+        recorded = trace.Trace.load(args.trace)
+    else:
+        recorded, _ = trace.record_search(args)
+
+    count = export(
+        recorded, args.output, args.every, args.cell_size, args.processes, args.fps
+    )
+    print(f"{count} frames of {recorded.step_count} steps written to {args.output}")
@@ -0,0 +1,152 @@
+"""
+Flow fields: the distance from every cell of an ArrayGrid to one end cell.
+
+Working one out takes a single Dijkstra's search backwards from the end cell over
+the whole grid, but after that the shortest path from any start cell is found
+just by stepping to whichever neighbour is closest to the end, which only takes
+as long as the path is. Flow fields are cached on the grid until it changes, so
+moving the start cell (or finding paths from many start cells) is cheap.
+"""
+
+from pathfind_visualiser.array_grid import BARRIER, INFINITY
+from pathfind_visualiser.frontier import make_frontier
+from pathfind_visualiser.search import CLOSE, PATH, SearchResult, run
+
+
+def flood(grid, source, reverse=False):
+    """
+    Dijkstra's search from the source cell to every cell it can reach, yielding a
+    CLOSE event as each cell gets its final distance and returning the array of
+    distances (INFINITY for cells which can't be reached).
+
+    Distances are from the source cell to each cell, or with reverse=True from
+    each cell to the source cell (the cost of moving into a cell is different to
+    the cost of moving out of it, so these are not the same on weighted grids).
+    """
+
+    costs = grid.costs
+    distances = grid.new_distances()
+    # Nothing can be reached from (or reach) a barrier
+    if costs[source] == BARRIER:
+        return distances
+    distances[source] = 0
+    closed = bytearray(grid.size)
+
+    open_set = make_frontier("bucket")
+    open_set.push(source, 0)
+
+    while open_set:
+        current = open_set.pop()
+        if closed[current]:
+            continue
+        closed[current] = 1
+
+        for neighbour in grid.neighbours(current):
+            if reverse:
+                # Going backwards, so the path moves from the neighbour into the
+                # current cell
+                distance = distances[current] + costs[current]
+            else:
+                distance = distances[current] + costs[neighbour]
+
+            if distance < distances[neighbour]:
+                distances[neighbour] = distance
+                open_set.push(neighbour, distance)
+
+        yield CLOSE, current
+
+    return distances
+
+
+def distance_field(grid, source, reverse=False):
+    """Returns the distances worked out by flood(), without any events."""
+
+    return run(flood(grid, source, reverse))
+
+
+class FlowField:
+    """
+    Distances from every cell of a grid to the end cell. Only valid for the
+    version of the grid it was worked out from (see get_flow_field).
+    """
+
+    def __init__(self, grid, end, distances):
+        self.grid = grid
+        self.end = end
+        self.distances = distances
+
+    def path(self, start):
+        """
+        Returns the shortest path from the start cell to the end cell as a list of
+        cell indices, or an empty list if the end cell can't be reached.
+        """
+
+        distances = self.distances
+        costs = self.grid.costs
+
+        if distances[start] == INFINITY:
+            return []
+
+        path = [start]
+        current = start
+        while current != self.end:
+            # Any neighbour which is as far from the end as the current cell, less
+            # the cost of moving into it, is on a shortest path
+            for neighbour in self.grid.neighbours(current):
+                if distances[neighbour] + costs[neighbour] == distances[current]:
+                    current = neighbour
+                    break
+            path.append(current)
+
+        return path
+
+    def paths(self, starts):
+        """Returns the shortest path from each of the given start cells."""
+
+        return [self.path(start) for start in starts]
+
+
+def get_flow_field(grid, end):
+    """
+    Returns the flow field towards the end cell for the current version of the
+    grid, working it out only if it has not been cached yet.
+    """
+
+    return grid.cached(
+        ("flow field", end),
+        lambda: FlowField(grid, end, distance_field(grid, end, reverse=True)),
+    )
+
+
+def search(grid, start, end):
+    """
+    Finds the shortest path from the start cell to the end cell by following the
+    flow field towards the end cell, with the same events and result as the
+    searches in array_search.py.
+
+    If the flow field has to be worked out first, a CLOSE event is yielded for
+    every cell it reaches. Otherwise the only events are for the path.
+    """
+
+    field = grid.get_cached(("flow field", end))
+    cached = field is not None
+    expanded = 0
+
+    if not cached:
+        steps = flood(grid, end, reverse=True)
+        try:
+            while True:
+                yield next(steps)
+                expanded += 1
+        except StopIteration as finished:
+            field = FlowField(grid, end, finished.value)
+        grid.set_cached(("flow field", end), field)
+
+    path = field.path(start)
+    if not path:
+        return SearchResult(False, expanded=expanded, field_cached=cached)
+
+    for index in reversed(path[1:-1]):
+        yield PATH, index
+
+    return SearchResult(True, path, expanded, field_cached=cached)
@@ -0,0 +1,229 @@
+"""
+Open set ("frontier") structures used by the searches.
+
+These replace queue.Queue, queue.LifoQueue and queue.PriorityQueue, which take a
+lock on every put and get since they are built for passing items between threads.
+All frontiers share the same small interface:
+
+    frontier.push(item, priority)
+    item = frontier.pop()
+    len(frontier)
+
+Priority frontiers pop the item with the lowest priority first, and items with
+equal priorities in the order they were pushed, so swapping one for another
+never changes the result of a search.
+"""
+
+from collections import deque
+from heapq import heappop, heappush
+
+
+class HeapFrontier:
+    """Binary heap, using the heapq module."""
+
+    def __init__(self):
+        self.items = []
+        # Keeps track of when an item is pushed, so equal priorities are popped
+        # in the order they were pushed (and items themselves never get compared)
+        self.count = 0
+
+    def push(self, item, priority=0):
+        heappush(self.items, (priority, self.count, item))
+        self.count += 1
+
+    def pop(self):
+        return heappop(self.items)[2]
+
+    def __len__(self):
+        return len(self.items)
+
+
+class FifoFrontier:
+    """First in, first out queue. Priorities are ignored."""
+
+    def __init__(self):
+        self.items = deque()
+
+    def push(self, item, priority=0):
+        self.items.append(item)
+
+    def pop(self):
+        return self.items.popleft()
+
+    def __len__(self):
+        return len(self.items)
+
+
+class LifoFrontier(FifoFrontier):
+    """Last in, first out stack. Priorities are ignored."""
+
+    def pop(self):
+        return self.items.pop()
+
+
+class BucketFrontier:
+    """
+    Dial's bucket queue, for non-negative integer priorities which never go
+    below the last one popped and are never more than a little above it (as with
+    Dijkstra's and A* on the grids, where that is about the largest cost of a
+    move).
+
+    Keeps a circular array of FIFO buckets, with an item of priority p in bucket
+    p % len(buckets), and a pointer to the lowest priority which may hold items.
+    The pointer only ever moves forwards (unless the frontier was emptied), so
+    pushes and pops both take O(1) time on average and the buckets are used
+    again as it goes round. Pushing a
+    priority further ahead than there are buckets for doubles the number of
+    buckets, so there are only ever as many as the widest range of priorities
+    held at once.
+
+    Priorities below the last one popped can't be pushed (use the heap frontier
+    for searches like greedy best-first search, which has them).
+    """
+
+    def __init__(self, size=16):
+        self.buckets = [deque() for _ in range(size)]
+        # Lowest priority which may still have items, and the highest pushed
+        # since the frontier was last empty
+        self.current = 0
+        self.highest = 0
+        # Priority of the last item popped, which nothing can be pushed below
+        self.popped = 0
+        self.length = 0
+
+    def push(self, item, priority=0):
+        if not self.length or priority < self.current:
+            self.move_back(priority)
+        elif priority > self.highest:
+            self.highest = priority
+            if priority - self.current >= len(self.buckets):
+                self.grow(priority - self.current + 1)
+
+        buckets = self.buckets
+        buckets[priority % len(buckets)].append(item)
+        self.length += 1
+
+    def move_back(self, priority):
+        """
+        Moves the pointer to a priority below any held, or anywhere if nothing is
+        held. Only ever below the current priority after the frontier was empty.
+        """
+
+        if priority < self.popped:
+            raise ValueError(
+                f"Priority {priority} is below the last one popped ({self.popped})"
+                ", which the bucket frontier can't hold"
+            )
+
+        if not self.length:
+            self.highest = priority
+        elif self.highest - priority >= len(self.buckets):
+            self.grow(self.highest - priority + 1)
+        self.current = priority
+
+    def grow(self, size):
+        """Makes room for at least size priorities from the lowest one held on."""
+
+        old = self.buckets
+        new_size = len(old)
+        while new_size < size:
+            new_size *= 2
+
+        self.buckets = [deque() for _ in range(new_size)]
+        # Every bucket holds a single priority, from the current one on
+        for priority in range(self.current, self.current + len(old)):
+            self.buckets[priority % new_size] = old[priority % len(old)]
+
+    def pop(self):
+        if not self.length:
+            raise IndexError("pop from an empty frontier")
+
+        buckets = self.buckets
+        size = len(buckets)
+        current = self.current
+        while not buckets[current % size]:
+            current += 1
+        self.current = self.popped = current
+
+        self.length -= 1
+        return buckets[current % size].popleft()
+
+    def __len__(self):
+        return self.length
+
+
+class PairingHeapFrontier:
+    """
+    Pairing heap. Pushes are O(1), pops are O(log n) amortised.
+
+    Each heap node is a list of [priority, count, item, children].
+    """
+
+    def __init__(self):
+        self.root = None
+        self.count = 0
+        self.length = 0
+
+    @staticmethod
+    def merge(first, second):
+        """Merges two heaps, making the root with the higher priority a child."""
+
+        if first is None:
+            return second
+        if second is None:
+            return first
+
+        if second[0] < first[0] or (second[0] == first[0] and second[1] < first[1]):
+            first, second = second, first
+        first[3].append(second)
+        return first
+
+    def push(self, item, priority=0):
+        self.root = self.merge(self.root, [priority, self.count, item, []])
+        self.count += 1
+        self.length += 1
+
+    def pop(self):
+        if self.root is None:
+            raise IndexError("pop from an empty frontier")
+
+        item = self.root[2]
+        children = self.root[3]
+
+        # Two pass merge: merge the children in pairs from left to right, then
+        # merge the pairs together from right to left
+        pairs = [
+            self.merge(children[i], children[i + 1] if i + 1 < len(children) else None)
+            for i in range(0, len(children), 2)
+        ]
+        root = None
+        for pair in reversed(pairs):
+            root = self.merge(pair, root)
+
+        self.root = root
+        self.length -= 1
+        return item
+
+    def __len__(self):
+        return self.length
+
+
+# Names which can be passed to the searches to choose a frontier
+FRONTIERS = {
+    "heap": HeapFrontier,
+    "fifo": FifoFrontier,
+    "lifo": LifoFrontier,
+    "bucket": BucketFrontier,
+    "pairing": PairingHeapFrontier,
+}
+
+
+def make_frontier(name):
+    """Returns a new, empty frontier of the given type."""
+
+    try:
+        return FRONTIERS[name]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown frontier {name!r}, choose from: {', '.join(FRONTIERS)}"
+        ) from None
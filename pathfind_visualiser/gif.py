@@ -0,0 +1,135 @@
+"""
+Writes animated GIFs, with nothing beyond the standard library.
+
+Every frame is a palette image (a byte for each pixel, indexing one palette
+shared by the whole animation), which suits the board as it is only ever drawn
+in the colours of palette.PALETTE. Frames are compressed separately with
+encode_frame(), so they can be compressed in parallel, and then written out in
+order with write().
+"""
+
+import struct
+
+# Largest code a GIF can use, in bits
+MAX_CODE_SIZE = 12
+
+
+def palette_bits(colours):
+    """Returns the bits needed to index a palette with the given number of colours."""
+
+    return max(2, (colours - 1).bit_length())
+
+
+def compress(pixels, min_code_size):
+    """Returns the pixels (bytes of palette indices) compressed with GIF's LZW."""
+
+    clear = 1 << min_code_size
+    end = clear + 1
+
+    output = bytearray()
+    # Bits waiting to be written out, least significant first
+    buffer = 0
+    bits = 0
+
+    code_size = min_code_size + 1
+    next_code = end + 1
+    # (code of a string of pixels, next pixel): code of the longer string
+    table = {}
+
+    buffer |= clear << bits
+    bits += code_size
+
+    prefix = pixels[0]
+    for pixel in pixels[1:]:
+        key = prefix << 8 | pixel
+        code = table.get(key)
+        if code is not None:
+            prefix = code
+            continue
+
+        buffer |= prefix << bits
+        bits += code_size
+        while bits >= 8:
+            output.append(buffer & 0xFF)
+            buffer >>= 8
+            bits -= 8
+
+        if next_code < 1 << MAX_CODE_SIZE:
+            table[key] = next_code
+            if next_code == 1 << code_size and code_size < MAX_CODE_SIZE:
+                code_size += 1
+            next_code += 1
+        else:
+            # The table is full, so it is cleared and built up again
+            buffer |= clear << bits
+            bits += code_size
+            table = {}
+            code_size = min_code_size + 1
+            next_code = end + 1
+
+        prefix = pixel
+
+    for code in (prefix, end):
+        buffer |= code << bits
+        bits += code_size
+    while bits > 0:
+        output.append(buffer & 0xFF)
+        buffer >>= 8
+        bits -= 8
+
+    return bytes(output)
+
+
+def sub_blocks(data):
+    """Splits data into the blocks of up to 255 bytes GIF needs, with an end."""
+
+    blocks = bytearray()
+    for position in range(0, len(data), 255):
+        chunk = data[position : position + 255]
+        blocks.append(len(chunk))
+        blocks += chunk
+    blocks.append(0)
+    return bytes(blocks)
+
+
+def encode_frame(pixels, width, height, colours, delay):
+    """
+    Returns a whole frame of an animation, ready to be written out: the pixels
+    (a byte for each, row by row) compressed, and shown for the delay (in
+    hundredths of a second).
+    """
+
+    min_code_size = palette_bits(colours)
+    return b"".join(
+        (
+            # Graphic control extension, with the delay
+            struct.pack("<3sBHBB", b"\x21\xf9\x04", 0, delay, 0, 0),
+            # Image descriptor, covering the whole animation
+            struct.pack("<BHHHHB", 0x2C, 0, 0, width, height, 0),
+            bytes([min_code_size]),
+            sub_blocks(compress(pixels, min_code_size)),
+        )
+    )
+
+
+def write(file, width, height, palette, frames, loops=0):
+    """
+    Writes an animation to a file opened in binary mode, from the frames returned
+    by encode_frame, with the palette given as a list of (r, g, b) colours. Loops
+    forever by default.
+    """
+
+    bits = palette_bits(len(palette))
+    colours = list(palette) + [(0, 0, 0)] * ((1 << bits) - len(palette))
+
+    file.write(b"GIF89a")
+    # Logical screen descriptor, with a global palette of 2 ** bits colours
+    file.write(struct.pack("<HHBBB", width, height, 0xF0 | (bits - 1), 0, 0))
+    file.write(bytes(value for colour in colours for value in colour))
+    # Application extension which makes the animation loop
+    file.write(b"\x21\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H", loops) + b"\x00")
+
+    for frame in frames:
+        file.write(frame)
+
+    file.write(b"\x3b")
@@ -0,0 +1,383 @@
+"""
+Hierarchical pathfinding (HPA*) for very large ArrayGrids.
+
+The grid is split into square clusters of cells. Where two neighbouring clusters
+can be crossed between, one or two cells on each side of their border are made
+entrances, and the distances between the entrances of each cluster (staying
+inside it) are worked out once and cached. A search then only has to go through
+this much smaller graph of entrances, and the path it finds is turned back into
+cells one cluster at a time.
+
+Clusters are only built when a search first reaches them, and when a cell
+changes only the cluster it is in (and any cluster sharing a border it is on) is
+built again, so the rest of the work is kept between searches.
+
+Paths found this way are close to the shortest, but not always the shortest, as
+they have to go through the entrances.
+"""
+
+from pathfind_visualiser.array_grid import BARRIER
+from pathfind_visualiser.frontier import make_frontier
+from pathfind_visualiser.search import CLOSE, OPEN, PATH, SearchResult
+
+# Borders with at least this many cells in a row which can be crossed get an
+# entrance at each end of them instead of a single one in the middle
+LONG_ENTRANCE = 6
+
+
+def cluster_search(grid, source, bounds, reverse=False, target=None):
+    """
+    Dijkstra's search from the source cell which stays inside the given bounds
+    (top, left, bottom, right, with bottom and right not included). Stops early
+    once the target cell is reached, if one is given.
+
+    Returns dictionaries of the distance to and the previous cell in the path to
+    each cell reached. As in flow_field.flood(), reverse=True gives distances
+    from each cell to the source cell instead.
+    """
+
+    top, left, bottom, right = bounds
+    cols = grid.cols
+    costs = grid.costs
+
+    distances = {source: 0}
+    parents = {}
+    closed = set()
+
+    open_set = make_frontier("heap")
+    open_set.push(source, 0)
+
+    while open_set:
+        current = open_set.pop()
+        if current in closed:
+            continue
+        closed.add(current)
+
+        if current == target:
+            break
+
+        for neighbour in grid.neighbours(current):
+            row, col = divmod(neighbour, cols)
+            if not (top <= row < bottom and left <= col < right):
+                continue
+
+            if reverse:
+                distance = distances[current] + costs[current]
+            else:
+                distance = distances[current] + costs[neighbour]
+
+            if distance < distances.get(neighbour, distance + 1):
+                distances[neighbour] = distance
+                parents[neighbour] = current
+                open_set.push(neighbour, distance)
+
+    return distances, parents
+
+
+class Cluster:
+    """The entrances of one cluster, and the distances between them."""
+
+    def __init__(self):
+        # Entrance cell: {other entrance cell: distance from one to the other}
+        self.edges = {}
+        # Entrance cell: cells it leads to in the neighbouring clusters
+        self.partners = {}
+
+
+class Hierarchy:
+    """
+    Clusters of an ArrayGrid, built when they are first needed.
+
+    Once attached to the grid (see get_hierarchy), it is told about every cell
+    which changes, and throws away only the clusters that change affected.
+    """
+
+    def __init__(self, grid, cluster_size=10):
+        self.grid = grid
+        self.cluster_size = cluster_size
+        self.cluster_rows = -(-grid.rows // cluster_size)
+        self.cluster_cols = -(-grid.cols // cluster_size)
+
+        # Clusters which have been built, by their index
+        self.clusters = {}
+        # Number of clusters built so far, including ones built again
+        self.built = 0
+
+    def cluster_of(self, index):
+        """Returns the index of the cluster the given cell is in."""
+
+        row, col = self.grid.position(index)
+        size = self.cluster_size
+        return (row // size) * self.cluster_cols + col // size
+
+    def bounds(self, cluster):
+        """Returns (top, left, bottom, right) of a cluster, as in cluster_search."""
+
+        cluster_row, cluster_col = divmod(cluster, self.cluster_cols)
+        size = self.cluster_size
+        top = cluster_row * size
+        left = cluster_col * size
+        return (
+            top,
+            left,
+            min(top + size, self.grid.rows),
+            min(left + size, self.grid.cols),
+        )
+
+    def border(self, first, second):
+        """
+        Returns the entrances on the border between two neighbouring clusters, as
+        (cell in the first cluster, cell in the second cluster) pairs. The first
+        cluster must be above or to the left of the second.
+        """
+
+        grid = self.grid
+        costs = grid.costs
+        top, left, bottom, right = self.bounds(first)
+
+        # Pairs of cells facing each other across the border. The clusters are
+        # side by side if they are in the same row of clusters (with only one
+        # column of clusters, the cluster below is also first + 1)
+        if first // self.cluster_cols == second // self.cluster_cols:
+            facing = [
+                (grid.index(row, right - 1), grid.index(row, right))
+                for row in range(top, bottom)
+            ]
+        else:
+            facing = [
+                (grid.index(bottom - 1, col), grid.index(bottom, col))
+                for col in range(left, right)
+            ]
+
+        entrances = []
+        run = []
+        # A barrier on the end stops the last run of crossable cells
+        for pair in facing + [None]:
+            if pair and costs[pair[0]] != BARRIER and costs[pair[1]] != BARRIER:
+                run.append(pair)
+                continue
+
+            if len(run) >= LONG_ENTRANCE:
+                entrances.extend((run[0], run[-1]))
+            elif run:
+                entrances.append(run[len(run) // 2])
+            run = []
+
+        return entrances
+
+    def build_cluster(self, cluster):
+        """Finds the entrances of a cluster and the distances between them."""
+
+        built = Cluster()
+        cluster_row, cluster_col = divmod(cluster, self.cluster_cols)
+
+        # Clusters above, to the left, to the right and below, if there are any
+        neighbours = []
+        if cluster_row > 0:
+            neighbours.append((cluster - self.cluster_cols, cluster))
+        if cluster_col > 0:
+            neighbours.append((cluster - 1, cluster))
+        if cluster_col < self.cluster_cols - 1:
+            neighbours.append((cluster, cluster + 1))
+        if cluster_row < self.cluster_rows - 1:
+            neighbours.append((cluster, cluster + self.cluster_cols))
+
+        for first, second in neighbours:
+            for pair in self.border(first, second):
+                # Keeps the cell on this cluster's side of the border
+                cell, partner = pair if first == cluster else reversed(pair)
+                built.partners.setdefault(cell, []).append(partner)
+
+        bounds = self.bounds(cluster)
+        for cell in built.partners:
+            distances = cluster_search(self.grid, cell, bounds)[0]
+            built.edges[cell] = {
+                other: distances[other]
+                for other in built.partners
+                if other != cell and other in distances
+            }
+
+        self.clusters[cluster] = built
+        self.built += 1
+        return built
+
+    def get_cluster(self, cluster):
+        """Returns a cluster, building it first if it has not been built yet."""
+
+        built = self.clusters.get(cluster)
+        if built is None:
+            built = self.build_cluster(cluster)
+        return built
+
+    def cell_changed(self, index):
+        """
+        Called by the grid when a cell's cost changes. Throws away the cluster it
+        is in, and any cluster on the other side of a border the cell is on, as
+        the entrances on that border may have changed.
+        """
+
+        row, col = self.grid.position(index)
+        size = self.cluster_size
+        cluster = self.cluster_of(index)
+        affected = [cluster]
+
+        if row % size == 0 and row > 0:
+            affected.append(cluster - self.cluster_cols)
+        if row % size == size - 1 and row < self.grid.rows - 1:
+            affected.append(cluster + self.cluster_cols)
+        if col % size == 0 and col > 0:
+            affected.append(cluster - 1)
+        if col % size == size - 1 and col < self.grid.cols - 1:
+            affected.append(cluster + 1)
+
+        for cluster in affected:
+            self.clusters.pop(cluster, None)
+
+    def search(self, start, end):
+        """
+        A* search through the entrances from the start cell to the end cell,
+        yielding the same events as the searches in array_search.py (for the
+        entrances searched, then the cells of the final path) and returning a
+        SearchResult.
+        """
+
+        grid = self.grid
+        costs = grid.costs
+        built_before = self.built
+
+        if costs[start] == BARRIER or costs[end] == BARRIER:
+            return SearchResult(False, clusters_built=0)
+
+        # The start and end cells are joined to the entrances of their clusters
+        start_cluster = self.cluster_of(start)
+        end_cluster = self.cluster_of(end)
+        start_entrances = self.get_cluster(start_cluster).partners
+        end_entrances = self.get_cluster(end_cluster).partners
+
+        distances = cluster_search(grid, start, self.bounds(start_cluster))[0]
+        start_edges = {
+            cell: distances[cell]
+            for cell in start_entrances
+            if cell in distances and cell != start
+        }
+        to_end = cluster_search(grid, end, self.bounds(end_cluster), reverse=True)[0]
+        end_edges = {cell: to_end[cell] for cell in end_entrances if cell in to_end}
+        if start_cluster == end_cluster and start in to_end:
+            start_edges[end] = to_end[start]
+
+        end_row, end_col = grid.position(end)
+
+        def heur(index):
+            row, col = grid.position(index)
+            return abs(row - end_row) + abs(col - end_col)
+
+        open_set = make_frontier("heap")
+        open_set.push(start, (heur(start), 0))
+        path = {}
+        g_score = {start: 0}
+        closed = set()
+        expanded = 0
+
+        while open_set:
+            current = open_set.pop()
+            if current in closed:
+                continue
+            closed.add(current)
+
+            if current == end:
+                break
+
+            for neighbour, cost in self.abstract_edges(
+                current, start, start_edges, end, end_edges
+            ):
+                temp_g_score = g_score[current] + cost
+
+                if temp_g_score < g_score.get(neighbour, temp_g_score + 1):
+                    path[neighbour] = current
+                    g_score[neighbour] = temp_g_score
+                    # Ties are broken towards the entrance furthest along, or
+                    # whole regions with the same f score would be searched
+                    f_score = temp_g_score + heur(neighbour)
+                    open_set.push(neighbour, (f_score, -temp_g_score))
+                    yield OPEN, neighbour
+
+            expanded += 1
+            yield CLOSE, current
+
+        stats = {"clusters_built": self.built - built_before}
+        if end not in closed:
+            return SearchResult(False, expanded=expanded, **stats)
+
+        # Entrances the path goes through, from the end cell back to the start
+        abstract_path = [end]
+        while abstract_path[-1] != start:
+            abstract_path.append(path[abstract_path[-1]])
+        abstract_path.reverse()
+
+        cells = self.refine(abstract_path)
+        for index in reversed(cells[1:-1]):
+            yield PATH, index
+
+        return SearchResult(True, cells, expanded, **stats)
+
+    def abstract_edges(self, current, start, start_edges, end, end_edges):
+        """
+        Returns (cell, cost) pairs for every cell which can be reached from the
+        current cell in the graph of entrances.
+        """
+
+        edges = []
+        if current == start:
+            edges.extend(start_edges.items())
+
+        cluster = self.get_cluster(self.cluster_of(current))
+        if current in cluster.edges:
+            edges.extend(cluster.edges[current].items())
+            costs = self.grid.costs
+            edges.extend(
+                (partner, costs[partner]) for partner in cluster.partners[current]
+            )
+
+        if current in end_edges:
+            edges.append((end, end_edges[current]))
+
+        return edges
+
+    def refine(self, abstract_path):
+        """
+        Turns a path through the graph of entrances into the full list of cells,
+        searching inside each cluster between entrances of the same cluster.
+        """
+
+        cells = [abstract_path[0]]
+
+        for current, following in zip(abstract_path, abstract_path[1:]):
+            cluster = self.cluster_of(current)
+            if cluster != self.cluster_of(following):
+                # Across a border, so the cells are next to each other
+                cells.append(following)
+                continue
+
+            parents = cluster_search(
+                self.grid, current, self.bounds(cluster), target=following
+            )[1]
+            section = [following]
+            while section[-1] != current:
+                section.append(parents[section[-1]])
+            cells.extend(reversed(section[:-1]))
+
+        return cells
+
+
+def get_hierarchy(grid, cluster_size=10):
+    """
+    Returns the hierarchy attached to the grid, replacing it if it uses a
+    different cluster size.
+    """
+
+    hierarchy = grid.attached.get("hierarchy")
+    if hierarchy is None or hierarchy.cluster_size != cluster_size:
+        hierarchy = Hierarchy(grid, cluster_size)
+        grid.attach("hierarchy", hierarchy)
+
+    return hierarchy
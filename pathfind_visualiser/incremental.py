@@ -0,0 +1,176 @@
+"""
+Incremental replanning with Lifelong Planning A* (LPA*).
+
+A normal search throws away everything it worked out as soon as it finishes, so
+after changing a single barrier the next search starts again from nothing. LPA*
+keeps its distance estimates between searches, and when cells change it only
+searches again the part of the grid whose shortest distances were affected.
+
+Each cell has two distance estimates from the start cell: g, the distance found
+by the last search, and rhs, the best distance one step on from its neighbours'
+g values. Cells where the two differ are "inconsistent" and go into the open set,
+and a search repairs them in order of priority until the end cell is consistent.
+"""
+
+from heapq import heappop, heappush
+
+from pathfind_visualiser.array_grid import BARRIER, INFINITY
+from pathfind_visualiser.search import CLOSE, OPEN, PATH, SearchResult
+
+
+class LifelongPlanner:
+    """
+    LPA* planner between two cells of an ArrayGrid.
+
+    Once attached to the grid (see get_planner), it is told about every cell
+    which changes, and search() only repairs what those changes affected.
+    """
+
+    def __init__(self, grid, start, end):
+        self.grid = grid
+        self.start = start
+        self.end = end
+        self.end_row, self.end_col = grid.position(end)
+
+        self.g = grid.new_distances()
+        self.rhs = grid.new_distances()
+        self.rhs[start] = 0
+
+        # Heap of (key, cell) for the inconsistent cells. A cell gets pushed again
+        # whenever its key changes, so entries with an out of date key are skipped
+        self.open_set = []
+        self.push(start)
+
+    def heur(self, index):
+        """Manhattan distance from the given cell to the end cell."""
+
+        row, col = divmod(index, self.grid.cols)
+        return abs(row - self.end_row) + abs(col - self.end_col)
+
+    def key(self, index):
+        """
+        Priority of a cell in the open set: like the f score of a* (with g score
+        as a tie breaker), using the lower of its two distance estimates.
+        """
+
+        distance = min(self.g[index], self.rhs[index])
+        return distance + self.heur(index), distance
+
+    def push(self, index):
+        heappush(self.open_set, (self.key(index), index))
+
+    def update_cell(self, index):
+        """
+        Works out the rhs of a cell again from its neighbours, and adds it to the
+        open set if it is now inconsistent.
+        """
+
+        if index != self.start:
+            cost = self.grid.costs[index]
+            g = self.g
+            best = INFINITY
+
+            if cost != BARRIER:
+                for neighbour in self.grid.neighbours(index):
+                    if g[neighbour] != INFINITY and g[neighbour] + cost < best:
+                        best = g[neighbour] + cost
+
+            self.rhs[index] = best
+
+        if self.g[index] != self.rhs[index]:
+            self.push(index)
+            return True
+        return False
+
+    def cell_changed(self, index):
+        """
+        Called by the grid when a cell's cost changes. Only that cell and the cells
+        next to it can have a different rhs because of it.
+        """
+
+        self.update_cell(index)
+        for neighbour in self.grid.neighbours(index):
+            self.update_cell(neighbour)
+
+    def search(self):
+        """
+        Repairs the distance estimates until the end cell's shortest path is known,
+        yielding the same events as the searches in array_search.py and returning
+        a SearchResult. Its expanded count is only the cells searched this time.
+        """
+
+        g = self.g
+        rhs = self.rhs
+        end = self.end
+        open_set = self.open_set
+        expanded = 0
+
+        while open_set:
+            key, current = open_set[0]
+            if key >= self.key(end) and g[end] == rhs[end]:
+                break
+
+            heappop(open_set)
+            # Skip cells which are already consistent, or have been pushed again
+            # with a different key
+            if g[current] == rhs[current] or key != self.key(current):
+                continue
+
+            if g[current] > rhs[current]:
+                # A shorter path to this cell was found
+                g[current] = rhs[current]
+            else:
+                # The path to this cell got longer (or blocked), so its distance is
+                # worked out again from scratch
+                g[current] = INFINITY
+                self.update_cell(current)
+
+            for neighbour in self.grid.neighbours(current):
+                if self.update_cell(neighbour):
+                    yield OPEN, neighbour
+
+            expanded += 1
+            yield CLOSE, current
+
+        path = self.path()
+        if not path:
+            return SearchResult(False, expanded=expanded)
+
+        for index in reversed(path[1:-1]):
+            yield PATH, index
+
+        return SearchResult(True, path, expanded)
+
+    def path(self):
+        """
+        Returns the shortest path found by the last search, by going backwards from
+        the end cell to whichever neighbour it is cheapest to arrive from.
+        """
+
+        g = self.g
+
+        if g[self.end] == INFINITY:
+            return []
+
+        path = [self.end]
+        current = self.end
+        while current != self.start:
+            current = min(self.grid.neighbours(current), key=g.__getitem__)
+            path.append(current)
+
+        path.reverse()
+        return path
+
+
+def get_planner(grid, start, end):
+    """
+    Returns the planner attached to the grid for the given start and end cells,
+    replacing any planner for other cells.
+    """
+
+    planner = grid.attached.get("lifelong planner")
+    if planner is None or (planner.start, planner.end) != (start, end):
+        planner = LifelongPlanner(grid, start, end)
+        grid.attach("lifelong planner", planner)
+
+    return planner
@@ -0,0 +1,137 @@
+"""
+Landmark (ALT) heuristics for A* on an ArrayGrid.
+
+Manhattan distance knows nothing about walls, so in mazes where the path has to
+wind a long way round, A* ends up searching almost as much as Dijkstra's. A
+landmark is a cell whose distance to and from every other cell is worked out in
+advance. By the triangle inequality, the cost from a cell to the end cell is at
+least the difference between their distances from (or to) any landmark, which
+takes the walls into account and is usually a much closer estimate.
+
+Landmarks are cached on the grid until it changes, so they are only worked out
+once for each maze.
+"""
+
+from collections import Counter
+
+from pathfind_visualiser import array_search
+from pathfind_visualiser.array_grid import INFINITY
+from pathfind_visualiser.components import NO_COMPONENT, label_cells
+from pathfind_visualiser.flow_field import distance_field
+
+# Number of landmarks used if not given
+DEFAULT_COUNT = 8
+
+
+class Landmarks:
+    """
+    Landmark cells of a grid, and the distances from and to each of them. Only
+    valid for the version of the grid they were worked out from (see
+    get_landmarks).
+    """
+
+    def __init__(self, grid, count=DEFAULT_COUNT):
+        self.grid = grid
+        self.cells = []
+        # Distances from each landmark to every cell, and from every cell to it
+        self.distances_from = []
+        self.distances_to = []
+
+        self.choose(count)
+
+    def choose(self, count):
+        """
+        Picks landmarks spread out as far as possible: each one is the cell
+        furthest from all of the landmarks picked before it (the first is the cell
+        furthest from a cell of the largest component). Landmarks are only picked
+        in the largest component, as they can't help searches anywhere else.
+        """
+
+        grid = self.grid
+        labels, _ = label_cells(grid)
+        sizes = Counter(label for label in labels if label != NO_COMPONENT)
+        if not sizes:
+            return
+
+        largest = sizes.most_common(1)[0][0]
+        free = [index for index, label in enumerate(labels) if label == largest]
+
+        # Distance from each cell to its closest landmark so far
+        closest = distance_field(grid, free[0])
+
+        for _ in range(count):
+            furthest = max(
+                free,
+                key=lambda index: -1 if closest[index] == INFINITY else closest[index],
+            )
+            if closest[furthest] in (0, INFINITY):
+                # Every reachable cell is already a landmark
+                break
+
+            self.cells.append(furthest)
+            distances = distance_field(grid, furthest)
+            self.distances_from.append(distances)
+            self.distances_to.append(distance_field(grid, furthest, reverse=True))
+
+            if len(self.cells) == 1:
+                closest = distances
+            else:
+                closest = [min(pair) for pair in zip(closest, distances)]
+
+    def heuristic(self, end):
+        """
+        Returns a heuristic function for A* towards the end cell: the largest
+        lower bound given by any landmark, or Manhattan distance if that is
+        larger.
+        """
+
+        grid = self.grid
+        end_row, end_col = grid.position(end)
+
+        # Only landmarks which can reach (and be reached from) the end cell help
+        bounds = [
+            (distances_from, distances_from[end], distances_to, distances_to[end])
+            for distances_from, distances_to in zip(
+                self.distances_from, self.distances_to
+            )
+            if distances_from[end] != INFINITY and distances_to[end] != INFINITY
+        ]
+
+        def heuristic(index):
+            best = array_search.heur(grid, index, end_row, end_col)
+
+            for distances_from, from_end, distances_to, to_end in bounds:
+                # Landmark to the end cell can't be shorter than going through
+                # this cell, and this cell to the landmark can't be shorter than
+                # going through the end cell
+                if distances_from[index] != INFINITY:
+                    best = max(best, from_end - distances_from[index])
+                if distances_to[index] != INFINITY:
+                    best = max(best, distances_to[index] - to_end)
+
+            return best
+
+        return heuristic
+
+
+def get_landmarks(grid, count=DEFAULT_COUNT):
+    """
+    Returns the landmarks for the current version of the grid, working them out
+    only if they have not been cached yet.
+    """
+
+    return grid.cached(("landmarks", count), lambda: Landmarks(grid, count))
+
+
+def a_star(grid, start, end, count=DEFAULT_COUNT, frontier="bucket"):
+    """
+    A* search on an ArrayGrid using landmark heuristics, with the same events
+    and result as array_search.a_star, plus the number of landmarks used.
+    """
+
+    landmarks = get_landmarks(grid, count)
+    heuristic = landmarks.heuristic(end)
+
+    result = yield from array_search.a_star(grid, start, end, frontier, heuristic)
+    result.stats["landmarks"] = len(landmarks.cells)
+    return result
@@ -1,7 +1,21 @@
+import argparse
+
 import pygame
 
 # Custom module imports
-from pathfind_visualiser import algorithms, board, maze
+from pathfind_visualiser import (
+    algorithms,
+    animation,
+    batch,
+    board,
+    components,
+    export,
+    maze,
+    palette,
+    replay,
+    trace,
+)
+from pathfind_visualiser.array_grid import ArrayGrid
 from pathfind_visualiser.buttons import Button
 from pathfind_visualiser.dropdown import Dropdown
 
@@ -11,6 +25,8 @@ SIZE = 825
 # Default number of rows, will be changed in game
 ROWS = 25
 
+CAPTION = "Pathfinding Algorithms Visualiser"
+
 # COLOURS
 BUTTON1 = (0, 0, 0)
 BUTTON2 = (255, 255, 255)
@@ -29,6 +45,63 @@ small_font = pygame.font.SysFont("arial", 20, bold=True)
 tiny_font = pygame.font.SysFont("arial", 15)
 tiny_bold_font = pygame.font.SysFont("arial", 15, bold=True)
 
+# ALGORITHMS
+# Names used by the buttons mapped to the functions which visualise them
+ALGORITHMS = {
+    "a*": algorithms.a_star_algorithm,
+    "breadth first": algorithms.breadth_first_search,
+    "depth first": algorithms.depth_first_search,
+    "dijkstra's": algorithms.dijkstras,
+    "best-first": algorithms.best_first,
+    "jump point": algorithms.jump_point_search,
+    "bidirectional breadth first": algorithms.bidirectional_breadth_first_search,
+    "bidirectional a*": algorithms.bidirectional_a_star,
+    "bitboard breadth first": algorithms.bitboard_breadth_first_search,
+}
+
+# Ways of drawing the board, switched between with the r key: node by node, or as
+# one image scaled up to the window (much faster for large numbers of rows)
+RENDERERS = [board.NodeRenderer, palette.PaletteRenderer]
+
+# Arrow keys, which move the view, mapped to the (row, col) direction they move it.
+# Rows go across the window, and columns down it
+VIEW_KEYS = {
+    pygame.K_LEFT: (-1, 0),
+    pygame.K_RIGHT: (1, 0),
+    pygame.K_UP: (0, -1),
+    pygame.K_DOWN: (0, 1),
+}
+
+# Algorithms which are also given the model of the board (an ArrayGrid which is
+# kept up to date as the board is changed), so they can reuse work between runs
+MODEL_ALGORITHMS = {
+    "flow field": algorithms.flow_field_search,
+    "lpa*": algorithms.lifelong_planning_a_star,
+    "hpa*": algorithms.hierarchical_a_star,
+    "wavefront": algorithms.wavefront_breadth_first_search,
+    "alt": algorithms.landmark_a_star,
+    "junction graph": algorithms.junction_graph_search,
+}
+
+# Buttons in the algorithms section of the main menu, as (text, algorithm name)
+ALGORITHM_BUTTONS = [
+    ("A* Search Algorithm", "a*"),
+    ("Breadth-First Search", "breadth first"),
+    ("Depth-First Search", "depth first"),
+    ("Dijkstra's Algorithm", "dijkstra's"),
+    ("Greedy Best-First Search", "best-first"),
+    ("Jump Point Search", "jump point"),
+    ("Bidirectional Breadth-First", "bidirectional breadth first"),
+    ("Bidirectional A*", "bidirectional a*"),
+    ("Flow Field", "flow field"),
+    ("Lifelong Planning A*", "lpa*"),
+    ("Hierarchical A*", "hpa*"),
+    ("Wavefront Breadth-First", "wavefront"),
+    ("Bitboard Breadth-First", "bitboard breadth first"),
+    ("Landmark A* (ALT)", "alt"),
+    ("Junction Graph", "junction graph"),
+]
+
 
 # Extra Draw UI Functions #####################################################
 def outline_rect(window, size, x, y, width, height):
@@ -236,9 +309,9 @@ def draw_controls(window, size):
     # BACKGROUND
     # Measurements, all label placements will be based off these as well
     x = size * 37 // 60
-    y = size * 21 // 60
+    y = size * 20 // 60
     width = size * 7 // 20
-    height = size * 7 // 40
+    height = size * 11 // 40
 
     draw_background(window, size, x, y, width, height)
 
@@ -260,6 +333,18 @@ def draw_controls(window, size):
     escape1_label = tiny_bold_font.render("Escape:", 1, TEXT_COLOUR)
     escape2_label = tiny_font.render("Return to menu", 1, TEXT_COLOUR)
 
+    weight1_label = tiny_bold_font.render("1-9:", 1, TEXT_COLOUR)
+    weight2_label = tiny_font.render("Terrain weight to paint", 1, TEXT_COLOUR)
+
+    r1_label = tiny_bold_font.render("R:", 1, TEXT_COLOUR)
+    r2_label = tiny_font.render("Switch how the board is drawn", 1, TEXT_COLOUR)
+
+    speed1_label = tiny_bold_font.render("S, +, -:", 1, TEXT_COLOUR)
+    speed2_label = tiny_font.render("Animation mode, speed", 1, TEXT_COLOUR)
+
+    view1_label = tiny_bold_font.render("Wheel, arrows:", 1, TEXT_COLOUR)
+    view2_label = tiny_font.render("Zoom, move the view", 1, TEXT_COLOUR)
+
     # LABEL PLACEMENT
     # title
     window.blit(controls_label, (x + size // 80, y + size // 80))
@@ -278,6 +363,18 @@ def draw_controls(window, size):
     # escape
     window.blit(escape1_label, (x + size // 80, y + size * 12 // 80))
     window.blit(escape2_label, (x + size * 10 // 80, y + size * 12 // 80))
+    # number keys
+    window.blit(weight1_label, (x + size // 80, y + size * 14 // 80))
+    window.blit(weight2_label, (x + size * 10 // 80, y + size * 14 // 80))
+    # r
+    window.blit(r1_label, (x + size // 80, y + size * 16 // 80))
+    window.blit(r2_label, (x + size * 10 // 80, y + size * 16 // 80))
+    # animation
+    window.blit(speed1_label, (x + size // 80, y + size * 18 // 80))
+    window.blit(speed2_label, (x + size * 10 // 80, y + size * 18 // 80))
+    # zoom and move
+    window.blit(view1_label, (x + size // 80, y + size * 20 // 80))
+    window.blit(view2_label, (x + size * 10 // 80, y + size * 20 // 80))
 
 
 def draw_buttons(window, size, rows, xpos, ypos, clicked, maze_type):
@@ -286,84 +383,51 @@ def draw_buttons(window, size, rows, xpos, ypos, clicked, maze_type):
     """
 
     # BACKGROUND
-    draw_background(
-        window,
-        size,
-        size // 20,  # x
-        size * 25 // 40,  # y
-        size // 2,  # width
-        size * 29 // 80,  # height
-    )
+    # Measurements, all buttons will be placed based off these as well
+    x = size // 20
+    y = size * 25 // 40
+    width = size // 2
+    height = size * 29 // 80
+
+    draw_background(window, size, x, y, width, height)
+
+    # Buttons are split into 2 columns (with smaller text) if there are too many
+    # to fit in a single column
+    columns = 1 if len(ALGORITHM_BUTTONS) <= 6 else 2
+    per_column = -(-len(ALGORITHM_BUTTONS) // columns)
+    font = button_font if columns == 1 else small_font
+
+    # Gap between the top of each button
+    step = min(size * 3 // 40, height // per_column)
+    button_width = width * 7 // 8 // columns
+    button_height = step * 9 // 10
 
     # DEFINE BUTTONS
     # Will contain all the buttons, so they can be looped through in a for loop
     buttons = []
 
-    # A* pathfinding algorithm
-    a_star_button = Button(
-        BUTTON1,
-        BUTTON2,
-        size // 20,
-        size * 25 // 40,
-        size * 7 // 16,
-        size // 15,
-        lambda: run_algorithms(window, size, rows, "a*", maze_type),
-        text="A* Search Algorithm",
-    )
-    buttons.append(a_star_button)
-    # Breadth first search algorithm
-    breadth_first_button = Button(
-        BUTTON1,
-        BUTTON2,
-        size // 20,
-        size * 28 // 40,
-        size * 7 // 16,
-        size // 15,
-        lambda: run_algorithms(window, size, rows, "breadth first", maze_type),
-        text="Breadth-First Search",
-    )
-    buttons.append(breadth_first_button)
-    # Depth first search algorithm
-    depth_first_button = Button(
-        BUTTON1,
-        BUTTON2,
-        size // 20,
-        size * 31 // 40,
-        size * 7 // 16,
-        size // 15,
-        lambda: run_algorithms(window, size, rows, "depth first", maze_type),
-        text="Depth-First Search",
-    )
-    buttons.append(depth_first_button)
-    # Dijkstra's shortest path algorithm
-    dijkstra_button = Button(
-        BUTTON1,
-        BUTTON2,
-        size // 20,
-        size * 34 // 40,
-        size * 7 // 16,
-        size // 15,
-        lambda: run_algorithms(window, size, rows, "dijkstra's", maze_type),
-        text="Dijkstra's Algorithm",
-    )
-    buttons.append(dijkstra_button)
-    # Greedy best-first search algorithm
-    best_first_button = Button(
-        BUTTON1,
-        BUTTON2,
-        size // 20,
-        size * 37 // 40,
-        size * 7 // 16,
-        size // 15,
-        lambda: run_algorithms(window, size, rows, "best-first", maze_type),
-        text="Greedy Best-First Search",
-    )
-    buttons.append(best_first_button)
+    for i, (text, algorithm) in enumerate(ALGORITHM_BUTTONS):
+        column, row = divmod(i, per_column)
+        buttons.append(
+            Button(
+                BUTTON1,
+                BUTTON2,
+                x + column * width // columns,
+                y + row * step,
+                button_width,
+                button_height,
+                # Default argument so each button keeps its own algorithm
+                lambda algorithm=algorithm: run_algorithms(
+                    window, size, rows, algorithm, maze_type
+                ),
+                text=text,
+            )
+        )
 
     # Loop through the buttons and execute their function if they are selected and
     # the mouse has been clicked
     for button in buttons:
-        button.draw(window, button_font, xpos, ypos)
+        button.draw(window, font, xpos, ypos)
 
         if button.is_selected(xpos, ypos):
             if clicked:
@@ -398,20 +462,37 @@ def draw_options(window, size):
     window.blit(maze_type_label, (x + size // 80, y + size * 10 // 80))
 
 
+def show_result(result):
+    """
+    Shows how many nodes the last search expanded (and any other counts it kept)
+    in the window caption.
+    """
+
+    caption = f"{CAPTION} - {result.expanded} nodes expanded"
+    for name, value in result.stats.items():
+        caption += f", {name.replace('_', ' ')}: {value}"
+
+    pygame.display.set_caption(caption)
+
+
 # Main Functions #####################################################
-def run_algorithms(window, size, rows, algorithm, maze_type):
-    """Runs the maze window, where the chosen algorithm can be executed."""
+def run_algorithms(window, size, rows, algorithm, maze_type, cols=None):
+    """
+    Runs the maze window, where the chosen algorithm can be executed. The grid
+    has as many columns as rows unless given.
+    """
 
-    grid = board.make_grid(rows, size)
+    cols = cols or rows
+    grid = board.make_grid(rows, cols)
 
-    if maze_type == "Random":
-        grid = maze.completely_random(grid)
-    if maze_type == "Swirl":
-        grid = maze.basic_swirl(grid)
-    if maze_type == "Imperfect":
-        grid = maze.imperfect(grid)
-    if maze_type == "Simple":
-        grid = maze.simple_maze(grid)
+    if maze_type in maze.MAZES:
+        grid = maze.MAZES[maze_type](grid)
+
+    # Compact copy of the board, updated whenever a node is changed
+    model = ArrayGrid.from_nodes(grid)
+    # Labels which nodes can reach each other, so searches between nodes which
+    # can't are never started
+    components.get_components(model)
 
     start = None
     end = None
@@ -421,23 +502,63 @@ def run_algorithms(window, size, rows, algorithm, maze_type):
     # disabled for its duration
     started = False
 
+    # Weight given to nodes by left clicks, chosen with the number keys. The
+    # lowest weight paints barriers instead
+    brush_weight = board.MIN_WEIGHT
+
+    # Part of the grid shown in the window, zoomed with the mouse wheel and moved
+    # with the arrow keys or by dragging with the middle mouse button
+    view = board.Viewport(rows, cols, size)
+
+    renderer_index = 0
+    renderer = RENDERERS[renderer_index](grid, view)
+    renderer.draw_board(window)
+
+    def draw():
+        renderer.draw_changes(window)
+
+    # Decides which steps of a search are drawn, chosen with the s, + and - keys.
+    # Bigger boards take more steps per frame to begin with, so they take about
+    # as long to watch
+    steps = animation.Animation(draw, steps_per_frame=max(1, rows // ROWS))
+
     while run:
-        board.draw_board(window, grid, rows, size)
+        # Only the nodes which have changed since the last frame are drawn
+        renderer.draw_changes(window)
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 quit()
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
+                    pygame.display.set_caption(CAPTION)
                     run = False
 
             # If algorithm has started, does not allow the user to give commands
             if started:
                 continue
 
+            # Zooming and moving the view, which draws everything in it again
+            if event.type == pygame.MOUSEWHEEL:
+                if view.zoom(event.y, pygame.mouse.get_pos()):
+                    renderer.draw_board(window)
+            if event.type == pygame.MOUSEMOTION and event.buttons[1]:
+                if view.drag(*event.rel):
+                    renderer.draw_board(window)
+            if event.type == pygame.KEYDOWN and event.key in VIEW_KEYS:
+                # A quarter of the window at a time
+                distance = max(1, size // view.gap // 4)
+                row_direction, col_direction = VIEW_KEYS[event.key]
+                if view.move(row_direction * distance, col_direction * distance):
+                    renderer.draw_board(window)
+
+            # Nothing happens when clicking past the edge of the grid
+            position = board.get_clicked_position(pygame.mouse.get_pos(), view)
+
             # Changing nodes
-            if pygame.mouse.get_pressed()[0]:  # left click
-                pos = pygame.mouse.get_pos()
-                row, col = board.get_clicked_position(pos, rows, size)
+            if position is None:
+                pass
+            elif pygame.mouse.get_pressed()[0]:  # left click
+                row, col = position
                 node = grid[row][col]
                 if not start and node != end and not node.is_hard_barrier:
                     start = node
@@ -446,13 +567,18 @@ def run_algorithms(window, size, rows, algorithm, maze_type):
                     end = node
                     end.make_end()
                 elif node != end and node != start and not node.is_hard_barrier:
-                    node.make_barrier()
+                    if brush_weight == board.MIN_WEIGHT:
+                        node.make_barrier()
+                    else:
+                        node.reset()
+                        node.set_weight(brush_weight)
+                model.update_node(node)
             elif pygame.mouse.get_pressed()[2]:  # right click
-                pos = pygame.mouse.get_pos()
-                row, col = board.get_clicked_position(pos, rows, size)
+                row, col = position
                 node = grid[row][col]
                 if not node.is_hard_barrier:
                     node.reset()
+                    model.update_node(node)
 
                     # Reset start and end if they are deleted
                     if node == start:
@@ -461,6 +587,27 @@ def run_algorithms(window, size, rows, algorithm, maze_type):
                         end = None
 
             if event.type == pygame.KEYDOWN:
+                # Number keys choose the weight painted by left clicks
+                if pygame.K_1 <= event.key <= pygame.K_9:
+                    brush_weight = event.key - pygame.K_0
+
+                # Pressing r switches to the next way of drawing the board
+                if event.key == pygame.K_r:
+                    renderer_index = (renderer_index + 1) % len(RENDERERS)
+                    renderer = RENDERERS[renderer_index](grid, view)
+                    renderer.draw_board(window)
+
+                # Pressing s switches to the next animation mode, and + and -
+                # change its speed
+                if event.key in (pygame.K_s, pygame.K_EQUALS, pygame.K_MINUS):
+                    if event.key == pygame.K_s:
+                        steps.next_mode()
+                    elif event.key == pygame.K_EQUALS:
+                        steps.faster()
+                    else:
+                        steps.slower()
+                    pygame.display.set_caption(f"{CAPTION} - {steps.describe()}")
+
                 # Pressing c resets all nodes
                 if event.key == pygame.K_c:
                     start = None
@@ -469,55 +616,27 @@ def run_algorithms(window, size, rows, algorithm, maze_type):
                         for node in row:
                             if not node.is_hard_barrier:
                                 node.reset()
+                                model.update_node(node)
 
             # Starts the chosen algorithm
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE and start and end and not started:
                     started = True
-                    # Update possible neighbours for every node
-                    for row in grid:
-                        for node in row:
-                            node.update_neighbours(grid)
-                    # Which algorithm to use:
-                    if algorithm == "a*":
-                        algorithms.a_star_algorithm(
-                            lambda: board.draw_board(window, grid, rows, size),
-                            grid,
-                            start,
-                            end,
-                        )
-
-                    if algorithm == "breadth first":
-                        algorithms.breadth_first_search(
-                            lambda: board.draw_board(window, grid, rows, size),
-                            grid,
-                            start,
-                            end,
-                        )
-
-                    if algorithm == "depth first":
-                        algorithms.depth_first_search(
-                            lambda: board.draw_board(window, grid, rows, size),
-                            grid,
-                            start,
-                            end,
-                        )
+                    # Nodes keep track of their neighbours as barriers change, so
+                    # the search can start straight away
+                    # No search is needed if the end node can't be reached
+                    result = algorithms.reject_unreachable(
+                        draw, grid, model, start, end
+                    )
 
-                    if algorithm == "dijkstra's":
-                        algorithms.dijkstras(
-                            lambda: board.draw_board(window, grid, rows, size),
-                            grid,
-                            start,
-                            end,
-                        )
-
-                    if algorithm == "best-first":
-                        algorithms.best_first(
-                            lambda: board.draw_board(window, grid, rows, size),
-                            grid,
-                            start,
-                            end,
+                    # Which algorithm to use:
+                    if result is None and algorithm in MODEL_ALGORITHMS:
+                        result = MODEL_ALGORITHMS[algorithm](
+                            steps, grid, model, start, end
                         )
+                    elif result is None:
+                        result = ALGORITHMS[algorithm](steps, grid, start, end)
+                    show_result(result)
 
                     started = False
 
@@ -555,7 +674,10 @@ def run_main_menu(window, size, rows):
     )
 
     # No function needed for each option as it only changes a variable so None used
-    rows_drop.add_options(("25", None), ("55", None), ("75", None))
+    # Grids with more rows than fit in the window are zoomed in and moved around
+    rows_drop.add_options(
+        ("25", None), ("55", None), ("75", None), ("251", None), ("1001", None)
+    )
     # Local variable to manage whether options list for rows_drop is displayed
     display_rows_options = False
 
@@ -655,9 +777,32 @@ def run_main_menu(window, size, rows):
         pygame.display.update()
 
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="pathfind-visualiser", description=CAPTION)
+    subparsers = parser.add_subparsers(dest="command")
+    batch.add_parser(subparsers)
+    trace.add_parser(subparsers)
+    replay.add_parser(subparsers)
+    export.add_parser(subparsers)
+    args = parser.parse_args(argv)
+
+    if args.command == "batch":
+        batch.run_command(args)
+        return
+    if args.command == "record":
+        trace.run_command(args)
+        return
+    if args.command == "export":
+        export.run_command(args)
+        return
+
     WIN = pygame.display.set_mode((SIZE, SIZE))
-    pygame.display.set_caption("Pathfinding Algorithms Visualiser")
+
+    if args.command == "replay":
+        replay.run_replay(WIN, SIZE, trace.Trace.load(args.trace), CAPTION)
+        return
+
+    pygame.display.set_caption(CAPTION)
 
     run_main_menu(WIN, SIZE, ROWS)
 
@@ -1,5 +1,16 @@
 import random
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from pathfind_visualiser import board
+from pathfind_visualiser.board import ALL_DIRECTIONS
+
+# Chance of each node becoming a barrier in the "Random" maze
+RANDOM_BARRIER_CHANCE = 0.25
+
 
 # Helper functions #####################################################
 def make_node_barrier(node):
@@ -33,15 +44,12 @@ def make_wall(grid, start, direction, path):
     node = start
     # Loop ends as soon as the next node in line is a barrier
     while node:
-        # Must keep updating neighbours because barriers are getting added
-        node.update_neighbours(grid)
         # Saving the current to a different variable
         prev_node = node
         # Checks next node in given direction
         node = direction(grid, prev_node)
 
         # Make previous node barrier and add to walls list
-        prev_node.update_neighbours(grid)
         make_node_barrier(prev_node)
         wall.append(prev_node)
 
@@ -62,6 +70,69 @@ def make_opening(wall):
     node_reset(random.choice(wall))
 
 
+def numpy_generator():
+    """
+    Returns a numpy random generator seeded from the random module, so seeding
+    that makes the numpy mazes the same every time too.
+    """
+
+    return np.random.default_rng(random.getrandbits(64))
+
+
+def apply_barriers(grid, barriers):
+    """
+    Makes the nodes of a new grid hard barriers where barriers (a rows x cols
+    numpy array of bools) is set, and resets any of the hard barriers around the
+    edge of the grid where it isn't.
+
+    For board.Node, the masks of which nodes around each node are barriers are
+    worked out from the array in one pass, rather than updated around one
+    barrier at a time, and nodes aren't noted as changed as the whole board is
+    drawn once the maze has been made. Any other kind of node (such as the ones
+    in benchmark.py) is made a barrier through its own methods.
+    """
+
+    rows, cols = np.nonzero(barriers)
+    positions = list(zip(rows.tolist(), cols.tolist()))
+    edge = np.zeros(barriers.shape, dtype=bool)
+    edge[[0, -1], :] = True
+    edge[:, [0, -1]] = True
+    rows, cols = np.nonzero(edge & ~barriers)
+    openings = list(zip(rows.tolist(), cols.tolist()))
+
+    if not isinstance(grid[0][0], board.Node):
+        for row, col in openings:
+            node_reset(grid[row][col])
+        for row, col in positions:
+            make_node_barrier(grid[row][col])
+        return grid
+
+    passable = ~barriers
+    masks = np.zeros(barriers.shape, dtype=np.uint8)
+    masks[:, 1:] |= passable[:, :-1] * np.uint8(board.LEFT)
+    masks[:-1, :] |= passable[1:, :] * np.uint8(board.BELOW)
+    masks[:, :-1] |= passable[:, 1:] * np.uint8(board.RIGHT)
+    masks[1:, :] |= passable[:-1, :] * np.uint8(board.ABOVE)
+
+    for row, row_masks in zip(grid, masks.tolist()):
+        for node, mask in zip(row, row_masks):
+            node.mask = mask
+
+    # Nodes of a new grid start empty apart from the hard barriers around the
+    # edge, so only openings in the edge and the new barriers need changing
+    for row, col in openings:
+        node = grid[row][col]
+        node.state = board.DEFAULT_STATE
+        node.is_hard_barrier = False
+
+    for row, col in positions:
+        node = grid[row][col]
+        node.state = board.BARRIER_STATE
+        node.is_hard_barrier = True
+
+    return grid
+
+
 # MOVEMENT
 # Functions to select next node in a certain direction, if that node is valid
 def l_node(grid, node):
@@ -75,10 +146,7 @@ def l_node(grid, node):
 def r_node(grid, node):
     """Selects node to the right if available."""
 
-    if (
-        node.row + 2 <= len(grid[node.row])
-        and not grid[node.row + 1][node.col].is_hard_barrier
-    ):
+    if node.row + 2 <= len(grid) and not grid[node.row + 1][node.col].is_hard_barrier:
         return grid[node.row + 1][node.col]
     return False
 
@@ -94,7 +162,10 @@ def u_node(grid, node):
 def d_node(grid, node):
     """Selects node below given node if available."""
 
-    if node.col + 2 <= len(grid) and not grid[node.row][node.col + 1].is_hard_barrier:
+    if (
+        node.col + 2 <= len(grid[node.row])
+        and not grid[node.row][node.col + 1].is_hard_barrier
+    ):
         return grid[node.row][node.col + 1]
     return False
 
@@ -110,13 +181,31 @@ def completely_random(grid):
     becoming a barrier.
     """
 
+    if np is not None:
+        return completely_random_numpy(grid)
+
     for row in grid:
         for node in row:
-            if random.random() <= 0.25:
+            if random.random() <= RANDOM_BARRIER_CHANCE:
                 make_node_barrier(node)
     return grid
 
 
+def completely_random_numpy(grid):
+    """
+    The same as completely_random, with the chance of every node becoming a
+    barrier drawn at once with numpy. Needs a new grid.
+    """
+
+    barriers = numpy_generator().random((len(grid), len(grid[0])))
+    barriers = barriers <= RANDOM_BARRIER_CHANCE
+    # The hard barriers around the edge of the grid stay
+    barriers[[0, -1], :] = True
+    barriers[:, [0, -1]] = True
+
+    return apply_barriers(grid, barriers)
+
+
 def basic_swirl(grid):
     """
     Generates a simple swirl type maze.
@@ -141,8 +230,6 @@ def basic_swirl(grid):
 
         # Loop ends as soon as the next node in line is a barrier
         while node:
-            # Must keep updating neighbours because barriers are getting added
-            node.update_neighbours(grid)
             # Saving the current to a different variable
             prev_node = node
             # Checks next node in given direction
@@ -202,14 +289,13 @@ def imperfect(grid):
 
         while available_nodes:
             node = available_nodes.pop()
-            node.update_neighbours(grid)
             if (
                 not path[node]
                 and not node.row % 2
                 and not node.col % 2
                 and not node.is_hard_barrier
-                and len(node.neighbours) > 3
-                and not node.is_hard_barrier
+                # None of the nodes around it are barriers
+                and node.mask == ALL_DIRECTIONS
             ):
                 return node
         return None
@@ -242,6 +328,9 @@ def simple_maze(grid):
     unaffected nodes and resets 2 adjacent barrier nodes at random.
     """
 
+    if np is not None:
+        return simple_maze_numpy(grid)
+
     # Goes through odd rows and columns and makes all of those nodes barriers
     for i, row in enumerate(grid):
         if not i % 2:
@@ -272,3 +361,45 @@ def simple_maze(grid):
                         )
                         node_reset(node)
     return grid
+
+
+def simple_maze_numpy(grid):
+    """
+    The same as simple_maze, with the barriers made by slicing a numpy array and
+    the 2 adjacent nodes reset around every unaffected node chosen all at once.
+    Needs a new grid.
+    """
+
+    rows = len(grid)
+    cols = len(grid[0])
+    generator = numpy_generator()
+
+    barriers = np.zeros((rows, cols), dtype=bool)
+    barriers[::2, :] = True
+    barriers[1::2, ::2] = True
+    # With an even number of rows or columns, the last ones are not covered by
+    # the slices above, but the hard barriers around the edge stay (apart from
+    # the openings made below, as in simple_maze)
+    barriers[[0, -1], :] = True
+    barriers[:, [0, -1]] = True
+
+    # The unaffected nodes, which have nodes on every side of them
+    centre_rows = np.arange(1, rows - 1, 2)[:, None]
+    centre_cols = np.arange(1, cols - 1, 2)[None, :]
+    shape = (len(centre_rows), centre_cols.shape[1])
+    # Row and column offsets to the adjacent nodes (left, right, below, above)
+    offsets = np.array([[0, -1], [0, 1], [1, 0], [-1, 0]])
+    for _ in range(2):
+        chosen = offsets[generator.integers(len(offsets), size=shape)]
+        barriers[centre_rows + chosen[..., 0], centre_cols + chosen[..., 1]] = False
+
+    return apply_barriers(grid, barriers)
+
+
+# Maze types by the names used in the menu
+MAZES = {
+    "Random": completely_random,
+    "Swirl": basic_swirl,
+    "Imperfect": imperfect,
+    "Simple": simple_maze,
+}
@@ -0,0 +1,123 @@
+"""
+Draws the board as one image, with a single pixel for each node.
+
+Each pixel holds a code for the colour of its node, looked up in a palette, and
+the image is scaled up to the size of the window and drawn in one go, with the
+gridlines put on top. Only the pixels of nodes which change are written, so a
+frame is a handful of calls into pygame however many nodes there are, rather
+than one pygame.draw.rect call for every node.
+"""
+
+import pygame
+
+from pathfind_visualiser import board
+
+# Colours of the nodes, in the order of their codes (the same as their states)
+STATE_COLOURS = board.STATE_COLOURS
+# Empty nodes with a weight above the minimum come after, one for each weight
+PALETTE = STATE_COLOURS + [
+    board.terrain_colour(weight)
+    for weight in range(board.MIN_WEIGHT + 1, board.MAX_WEIGHT + 1)
+]
+
+COLOUR_CODES = {colour: code for code, colour in enumerate(STATE_COLOURS)}
+
+
+def terrain_code(weight):
+    """Returns the code of the colour of an empty node with the given weight."""
+
+    if weight > board.MIN_WEIGHT:
+        return len(STATE_COLOURS) + weight - board.MIN_WEIGHT - 1
+    return COLOUR_CODES[board.DEFAULT]
+
+
+def node_code(node):
+    """Returns the code of the colour the node is drawn in."""
+
+    if node.state == board.DEFAULT_STATE:
+        return terrain_code(node.weight)
+    return node.state
+
+
+def as_board(cells):
+    """
+    Returns an image of the cells (with a pixel for each, row by row of the grid)
+    laid out the way the board is drawn, with each row of the grid going across
+    the window rather than down it.
+    """
+
+    return pygame.transform.flip(pygame.transform.rotate(cells, 90), False, True)
+
+
+class PaletteRenderer:
+    """
+    Draws the nodes of a grid in view onto the window as a scaled up image. Has
+    the same draw_board and draw_changes methods as board.NodeRenderer.
+    """
+
+    def __init__(self, grid, view):
+        self.grid = grid
+        self.view = view
+
+        # A byte for each node, row by row of the image. Node x positions come
+        # from their row in the grid, so this is column by column of the grid
+        self.codes = bytearray(view.rows * view.cols)
+        # Shares its pixels with the codes, so writing a code changes the image
+        self.cells = pygame.image.frombuffer(self.codes, (view.rows, view.cols), "P")
+        self.cells.set_palette(PALETTE)
+        # Made whenever the part of the image in view is a new size
+        self.scaled = None
+        # Nodes of the grid which have changed since their codes were written
+        self.changed = grid.track_changes()
+
+        # Every code is written once, then only those of nodes which change
+        for row in grid:
+            for node in row:
+                self.update_node(node)
+        self.changed.clear()
+
+    def update_node(self, node):
+        self.codes[node.col * self.view.rows + node.row] = node_code(node)
+
+    def show(self, window):
+        """
+        Scales the part of the image in view up onto the window, with the
+        gridlines on top.
+        """
+
+        view = self.view
+        rows, cols = view.visible()
+        size = (len(rows) * view.gap, len(cols) * view.gap)
+        if self.scaled is None or self.scaled.get_size() != size:
+            self.scaled = pygame.Surface(size, depth=8)
+            self.scaled.set_palette(PALETTE)
+
+        in_view = self.cells.subsurface((rows.start, cols.start, len(rows), len(cols)))
+        pygame.transform.scale(in_view, size, self.scaled)
+        window.blit(self.scaled, (0, 0))
+        view.draw_gridlines(window)
+
+        pygame.display.update()
+
+    def draw_board(self, window):
+        window.fill(board.OUTSIDE)
+
+        for node in self.changed:
+            self.update_node(node)
+        self.changed.clear()
+
+        self.show(window)
+
+    def draw_changes(self, window):
+        if not self.changed:
+            return
+
+        in_view = False
+        for node in self.changed:
+            self.update_node(node)
+            in_view = in_view or self.view.shows(node)
+        self.changed.clear()
+
+        # Nodes out of view are drawn whenever the view is moved onto them
+        if in_view:
+            self.show(window)
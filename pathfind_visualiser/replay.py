@@ -0,0 +1,147 @@
+"""
+Plays back searches recorded with trace.py, without running them again.
+
+The whole board is drawn as one image with a pixel per cell (as in palette.py),
+straight from the state of the cells at the current step. Playback can be paused
+and scrubbed through to any step, which only needs the events since the last
+keyframe before it.
+
+Controls:
+    Space: play or pause
+    Left and right: go back or forwards a jump of steps
+    + and -: make the jump bigger or smaller
+    Home and end: go to the first or last step
+    Left click (and drag): go to the step at that point across the window
+    Escape: quit
+"""
+
+import argparse
+
+import pygame
+
+from pathfind_visualiser import animation, board, palette
+from pathfind_visualiser.trace import Playhead
+
+
+class Viewer:
+    """Draws a trace at its current step, scaled up to fill the window."""
+
+    def __init__(self, window, size, trace):
+        self.window = window
+        self.size = size
+        self.trace = trace
+        self.playhead = Playhead(trace)
+
+        # Shares its pixels with the state of the cells, so it changes as the
+        # playhead moves
+        self.cells = pygame.image.frombuffer(
+            self.playhead.state, (trace.cols, trace.rows), "P"
+        )
+        self.cells.set_palette(palette.PALETTE)
+
+        self.gap = min(size // trace.rows, size // trace.cols)
+        if self.gap:
+            self.width = trace.rows * self.gap
+            self.height = trace.cols * self.gap
+        else:
+            # More cells than pixels, so some cells are left out
+            self.width = self.height = size
+        self.gridlines = self.gap >= board.MIN_GRIDLINE_GAP
+
+    def seek(self, step):
+        self.trace.seek(step, self.playhead)
+
+    def draw(self):
+        self.window.fill(board.DEFAULT)
+        self.window.blit(
+            pygame.transform.scale(
+                palette.as_board(self.cells), (self.width, self.height)
+            ),
+            (0, 0),
+        )
+        if self.gridlines:
+            board.draw_gridlines(
+                self.window,
+                max(self.trace.rows, self.trace.cols),
+                self.size,
+                (0, 0, self.width, self.height),
+            )
+
+        pygame.display.update()
+
+
+def run_replay(window, size, trace, caption):
+    """Runs the replay window until it is closed or escape is pressed."""
+
+    viewer = Viewer(window, size, trace)
+    clock = pygame.time.Clock()
+    frame_rate = animation.refresh_rate()
+
+    playing = True
+    # Steps moved by each frame of playback, and by the arrow keys
+    jump = max(1, trace.step_count // (frame_rate * 10))
+    changed = True
+
+    while True:
+        clock.tick(frame_rate)
+        step = viewer.playhead.step
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                quit()
+            if event.type != pygame.KEYDOWN:
+                continue
+
+            if event.key == pygame.K_ESCAPE:
+                return
+            if event.key == pygame.K_SPACE:
+                playing = not playing
+                # Starts again from the beginning if it had finished
+                if playing and step == trace.step_count:
+                    step = 0
+            elif event.key == pygame.K_RIGHT:
+                step += jump
+            elif event.key == pygame.K_LEFT:
+                step -= jump
+            elif event.key == pygame.K_EQUALS:
+                jump *= 2
+            elif event.key == pygame.K_MINUS:
+                jump = max(1, jump // 2)
+            elif event.key == pygame.K_HOME:
+                step = 0
+            elif event.key == pygame.K_END:
+                step = trace.step_count
+            changed = True
+
+        if pygame.mouse.get_pressed()[0]:
+            x = pygame.mouse.get_pos()[0]
+            step = min(x, size - 1) * (trace.step_count + 1) // size
+            playing = False
+        elif playing:
+            step += jump
+            if step >= trace.step_count:
+                playing = False
+
+        if step != viewer.playhead.step:
+            viewer.seek(step)
+            changed = True
+
+        if changed:
+            viewer.draw()
+            pygame.display.set_caption(
+                f"{caption} - step {viewer.playhead.step} of {trace.step_count}, "
+                f"{jump} per jump{'' if playing else ' (paused)'}"
+            )
+            changed = False
+
+
+def add_parser(subparsers):
+    """Adds the replay subcommand to the subparsers of the command line."""
+
+    parser = subparsers.add_parser(
+        "replay",
+        help="Play back a search recorded with the record subcommand",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("trace", help="Trace file to play back")
@@ -0,0 +1,781 @@
+"""
+Headless versions of the pathfinding algorithms.
+
+Each algorithm is a generator which yields small (event, node) tuples as it
+searches, and returns a SearchResult once it has finished. Nothing in here touches
+pygame, so searches can be run without a display (see run()) or consumed by the
+visualiser at whatever rate it likes (see algorithms.py).
+
+Every algorithm also takes the name of the frontier to use for its open set (see
+frontier.py).
+"""
+
+from collections import deque
+
+from pathfind_visualiser.frontier import make_frontier
+
+# EVENTS
+# A node has been added to the open set
+OPEN = "open"
+# A node has been taken from the open set and had its neighbours searched
+CLOSE = "close"
+# A node is part of the final path (start and end nodes are not included)
+PATH = "path"
+# A whole ring of nodes (a list of them) the same distance from the start node
+# has been closed at once, by searches which work a ring at a time
+RING = "ring"
+
+
+class SearchResult:
+    """
+    Returned by every search once it has finished.
+
+    Evaluates to True if a path was found, so it can be used in place of the
+    True/False the visualised algorithms used to return.
+    """
+
+    def __init__(self, found, path=None, expanded=0, **stats):
+        self.found = found
+        # Nodes from the start node to the end node, empty if no path was found
+        self.path = path or []
+        # Number of nodes which were taken from the open set and searched
+        self.expanded = expanded
+        # Any extra counters specific to an algorithm
+        self.stats = stats
+
+    def __bool__(self):
+        return self.found
+
+    def __repr__(self):
+        return (
+            f"SearchResult(found={self.found}, length={len(self.path)}, "
+            f"expanded={self.expanded})"
+        )
+
+
+# Helper Functions #####################################################
+def run(steps):
+    """
+    Runs a search generator to completion without doing anything with its events,
+    and returns the SearchResult.
+    """
+
+    try:
+        while True:
+            next(steps)
+    except StopIteration as finished:
+        return finished.value
+
+
+def reconstruct_path(path, current, start):
+    """
+    Follows the path dictionary calculated by an algorithm backwards from the
+    given node to the start node, and returns the nodes in order from start to
+    the given node.
+    """
+
+    nodes = [current]
+
+    # Path contains nodes as current node: previous node, so this goes through
+    # the nodes backwards from the given node to the start node
+    while current != start:
+        current = path[current]
+        nodes.append(current)
+
+    nodes.reverse()
+    return nodes
+
+
+def found_path(path, end, start, expanded, **stats):
+    """
+    Yields the path events for the path to the end node (from the end node
+    backwards, as the visualiser draws it), then returns the SearchResult.
+    """
+
+    nodes = reconstruct_path(path, end, start)
+
+    for node in reversed(nodes[1:-1]):
+        yield PATH, node
+
+    return SearchResult(True, nodes, expanded, **stats)
+
+
+def heur(p1, p2):
+    """
+    Heuristic function, gets a prediction for the distance from the
+    given node to the end node, which is used to guide the a*
+    algorithm on which node to search next.
+
+    Uses Manhattan distance, which simply draws an L to the end node.
+    """
+
+    x1, y1 = p1
+    x2, y2 = p2
+
+    return abs(x1 - x2) + abs(y1 - y2)
+
+
+def is_weighted(grid):
+    """
+    Returns whether any node costs more than 1 to move into, in which case the
+    searches which count every move as the same cost may not find the cheapest
+    path.
+    """
+
+    return any(node.weight > 1 for row in grid for node in row)
+
+
+# Algorithms #####################################################
+def a_star(grid, start, end, frontier="bucket"):
+    """
+    Headless A* search. See algorithms.a_star_algorithm.
+
+    Moving into a node costs its weight. As f scores are small whole numbers
+    which only go up a little from one node to the next, the bucket queue is
+    used by default. Its buckets go round in a circle, so it only needs about as
+    many as the largest weight, and it is about as fast as the heap with or
+    without weights (see benchmark.py).
+    """
+
+    # Will be used to get the minimum element from the queue,
+    # based on the f_score
+    open_set = make_frontier(frontier)
+    # add start node to open set
+    open_set.push(start, 0)
+    # keeps track of node prior in the path to a certain
+    # node, updated if a new node with lower g_score is found
+    path = {}
+
+    # Current shortest distance to get from the start node to
+    # this node. Initialised at infinity and updated as the
+    # node is reached, so any number is lower than it
+    g_score = {node: float("inf") for row in grid for node in row}
+    g_score[start] = 0
+
+    # Nodes which have already been searched. As the heuristic
+    # never overestimates the cost of a single move, a node can
+    # not be reached more cheaply once it has been searched
+    closed = set()
+
+    expanded = 0
+
+    while open_set:
+        # Node with the lowest f score gets chosen first
+        # thanks to the priority queue
+        current = open_set.pop()
+        # A node is added to the open set again whenever a
+        # shorter path to it is found, so any later copies of
+        # it are skipped
+        if current in closed:
+            continue
+        closed.add(current)
+
+        # As soon as the end node is reached, the path is built
+        # and the loop ends
+        if current == end:
+            return (yield from found_path(path, end, start, expanded))
+
+        for neighbour in current.neighbours:
+            # g_score for the node is g_score for previous node +
+            # the cost of moving into the node (its weight)
+            temp_g_score = g_score[current] + neighbour.weight
+
+            # Update g_score and add the neighbour to the open set
+            # (with its f score as the priority) if a new shorter
+            # path is found
+            if temp_g_score < g_score[neighbour]:
+                path[neighbour] = current
+                g_score[neighbour] = temp_g_score
+                f_score = temp_g_score + heur(
+                    neighbour.get_position(), end.get_position()
+                )
+                open_set.push(neighbour, f_score)
+                yield OPEN, neighbour
+
+        # Closes the node after it has been looped through
+        expanded += 1
+        yield CLOSE, current
+
+    return SearchResult(False, expanded=expanded)
+
+
+def breadth_first(grid, start, end, frontier="fifo"):
+    """Headless breadth first search. See algorithms.breadth_first_search."""
+
+    # Queue allows nodes to be searched in a certain order
+    # Operates on a FIFO basis
+    open_set = make_frontier(frontier)
+    open_set.push(start)
+
+    # Keeps track of node prior in the path to a certain node
+    # (also tracks if node has been visited). All nodes are
+    # added to path so they can be used in if statements without
+    # throwing a key error
+    path = {node: None for row in grid for node in row}
+
+    expanded = 0
+
+    while open_set:
+        # Gets first item in the queue which will always be
+        # the item added before all the others
+        current = open_set.pop()
+
+        if current == end:
+            return (yield from found_path(path, end, start, expanded))
+
+        for neighbour in current.neighbours:
+            # Neighbour is only added to queue if it has not
+            # yet been visited
+            if path[neighbour]:
+                continue
+            # If statement so the start node does not get
+            # added back into the queue
+            if not neighbour == start:
+                open_set.push(neighbour)
+                path[neighbour] = current
+                yield OPEN, neighbour
+
+        expanded += 1
+        yield CLOSE, current
+
+    return SearchResult(False, expanded=expanded)
+
+
+def depth_first(grid, start, end, frontier="lifo"):
+    """Headless depth first search. See algorithms.depth_first_search."""
+
+    # Stack allows nodes to be searched in a certain order
+    # Operates on a LIFO basis
+    open_set = make_frontier(frontier)
+    open_set.push(start)
+
+    # Keeps track of node prior in the path to a certain
+    # node (also tracks if node has been visited). All nodes
+    # are added to path so they can be used in if statements
+    # without throwing a key error
+    path = {node: None for row in grid for node in row}
+
+    expanded = 0
+
+    # While loop runs until the end point is found or
+    # there are no nodes left to search
+    while open_set:
+        # Gets first item in the queue which will always
+        # be the last node added
+        current = open_set.pop()
+
+        if current == end:
+            return (yield from found_path(path, end, start, expanded))
+
+        for neighbour in current.neighbours:
+            # Neighbour is only added to queue if it has
+            # not yet been visited
+            if path[neighbour]:
+                continue
+            # If statement so the start node does not get
+            # added back into the queue
+            if not neighbour == start:
+                open_set.push(neighbour)
+                path[neighbour] = current
+                yield OPEN, neighbour
+
+        expanded += 1
+        yield CLOSE, current
+
+    return SearchResult(False, expanded=expanded)
+
+
+def dijkstras(grid, start, end, frontier="bucket"):
+    """
+    Headless Dijkstra's algorithm. See algorithms.dijkstras.
+
+    Moving into a node costs its weight. As distance scores are small whole
+    numbers which only go up by a weight at a time, the bucket queue is used by
+    default (see a_star).
+    """
+
+    # Will allow the algorithm to prioritise nodes with
+    # lower distance scores
+    open_set = make_frontier(frontier)
+
+    # Minimum distance to get to each node
+    # Give all nodes an infinite distance score so that
+    # any path that reaches them is shorter
+    distance_score = {node: float("inf") for row in grid for node in row}
+
+    # Keeps track of node prior in the path to a certain
+    # node
+    path = {}
+
+    # Nodes which have already been searched, and so already
+    # have their shortest distance score
+    closed = set()
+
+    # Set distance score of start node to 0 and add it
+    # to the open set
+    distance_score[start] = 0
+    open_set.push(start, distance_score[start])
+
+    expanded = 0
+
+    # Loop will end when the end node is reached or when
+    # there are no nodes left to search
+    while open_set:
+        # Gets node with lowest distance score
+        current = open_set.pop()
+        # A node is added to the open set again whenever a
+        # shorter path to it is found, so any later copies of
+        # it are skipped
+        if current in closed:
+            continue
+        closed.add(current)
+
+        # Path is constructed as soon as the end node
+        # is reached. If the distance score was to be
+        # used, the distance to the end node would also
+        # have to be added
+        if current == end:
+            return (yield from found_path(path, end, start, expanded))
+
+        # Loops through neighbours of the current node,
+        # which will always be valid neighbours (because
+        # nodes keep a mask of which nodes around them
+        # aren't barriers)
+        for neighbour in current.neighbours:
+            # The weight of a node is the cost of moving into
+            # it, so this is the distance to the neighbour when
+            # going through the current node
+            distance = distance_score[current] + neighbour.weight
+
+            if distance < distance_score[neighbour]:
+                # Update shortest path to that node
+                distance_score[neighbour] = distance
+                # Add neighbour to queue
+                open_set.push(neighbour, distance_score[neighbour])
+                # Update path for neighbour
+                path[neighbour] = current
+                yield OPEN, neighbour
+
+        expanded += 1
+        yield CLOSE, current
+
+    return SearchResult(False, expanded=expanded)
+
+
+def best_first(grid, start, end, frontier="heap"):
+    """Headless greedy best-first search. See algorithms.best_first."""
+
+    # Will allow the algorithm to prioritise nodes
+    # with lower distance scores
+    open_set = make_frontier(frontier)
+
+    # All nodes are given a distance score calculated
+    # with the heuristic function
+    distance_score = {
+        node: heur(node.get_position(), end.get_position())
+        for row in grid
+        for node in row
+    }
+
+    # Keeps track of node prior in the path to a certain
+    # node (also tracks if node has been visited). All
+    # nodes are added to path so they can be used in if
+    # statements without throwing a key error
+    path = {node: None for row in grid for node in row}
+
+    # Add start node to the open set
+    open_set.push(start, distance_score[start])
+
+    expanded = 0
+
+    # Loop will end when the end node is reached
+    # or when there are no nodes left to search
+    while open_set:
+        # Gets node with lowest distance score
+        current = open_set.pop()
+
+        # Path is constructed as soon as the end node
+        # is reached
+        if current == end:
+            return (yield from found_path(path, end, start, expanded))
+
+        # Loops through neighbours of the current node,
+        # which will always be valid neighbours (because
+        # nodes keep a mask of which nodes around them
+        # aren't barriers)
+        for neighbour in current.neighbours:
+            # If neighbour has been visited, skip
+            if path[neighbour]:
+                continue
+
+            # If statement so the start node does not get
+            # added to the open set
+            if not neighbour == start:
+                # Update path to neighbour
+                path[neighbour] = current
+                # Add neighbour to queue
+                open_set.push(neighbour, distance_score[neighbour])
+                yield OPEN, neighbour
+
+        expanded += 1
+        yield CLOSE, current
+
+    return SearchResult(False, expanded=expanded)
+
+
+def jump_point(grid, start, end, frontier="heap"):
+    """
+    Headless jump point search. See algorithms.jump_point_search.
+
+    This is the version for 4-connected grids: moving along a column is a plain
+    straight jump, while every step of a jump along a row also looks for jump
+    points to either side of it. Only the jump points found are added to the open
+    set, and the cost between two of them is the Manhattan distance as they are
+    always in a straight line.
+
+    Jumps only work when every move costs the same, so on a grid with weights
+    A* is run instead (noted in the result as fell_back_to).
+    """
+
+    if is_weighted(grid):
+        result = yield from a_star(grid, start, end)
+        result.stats["fell_back_to"] = "a*"
+        return result
+
+    total_rows = len(grid)
+    total_cols = len(grid[0])
+    end_row, end_col = end.get_position()
+
+    def walkable(row, col):
+        return (
+            0 <= row < total_rows
+            and 0 <= col < total_cols
+            and not grid[row][col].is_barrier()
+        )
+
+    def jump_along_column(row, col, d_col):
+        """
+        Moves along a column from the given position until reaching the end node,
+        a barrier or a node with a forced neighbour (one above or below it which
+        could not have been reached more easily from the previous node).
+        """
+
+        while walkable(row, col):
+            if row == end_row and col == end_col:
+                return row, col
+            if (walkable(row - 1, col) and not walkable(row - 1, col - d_col)) or (
+                walkable(row + 1, col) and not walkable(row + 1, col - d_col)
+            ):
+                return row, col
+            col += d_col
+        return None
+
+    def jump_along_row(row, col, d_row):
+        """
+        Moves along a row in the same way as jump_along_column, but also stops
+        at any node where a jump along the column to either side finds something.
+        """
+
+        while walkable(row, col):
+            if row == end_row and col == end_col:
+                return row, col
+            if (walkable(row, col - 1) and not walkable(row - d_row, col - 1)) or (
+                walkable(row, col + 1) and not walkable(row - d_row, col + 1)
+            ):
+                return row, col
+            if jump_along_column(row, col + 1, 1) or jump_along_column(
+                row, col - 1, -1
+            ):
+                return row, col
+            row += d_row
+        return None
+
+    def directions(node):
+        """
+        Directions to jump in from a jump point. The start node jumps in every
+        direction, others only keep going forwards or turn to either side.
+        """
+
+        if node == start:
+            return (0, -1), (1, 0), (0, 1), (-1, 0)
+
+        row, col = node.get_position()
+        parent_row, parent_col = path[node].get_position()
+        # Jump points are always in a straight line from their parent
+        d_row = (row > parent_row) - (row < parent_row)
+        d_col = (col > parent_col) - (col < parent_col)
+
+        if d_row:
+            return (d_row, 0), (0, -1), (0, 1)
+        return (0, d_col), (-1, 0), (1, 0)
+
+    open_set = make_frontier(frontier)
+    open_set.push(start, heur(start.get_position(), (end_row, end_col)))
+    # Previous jump point in the path to a jump point
+    path = {}
+    g_score = {start: 0}
+    closed = set()
+
+    expanded = 0
+
+    while open_set:
+        current = open_set.pop()
+        # Nodes can be in the open set more than once if a shorter path to them
+        # was found, so only the first copy is searched
+        if current in closed:
+            continue
+        closed.add(current)
+
+        if current == end:
+            # Fill in the nodes between each jump point for the final path
+            jump_points = reconstruct_path(path, end, start)
+            nodes = [start]
+            for node in jump_points[1:]:
+                row, col = nodes[-1].get_position()
+                target_row, target_col = node.get_position()
+                d_row = (target_row > row) - (target_row < row)
+                d_col = (target_col > col) - (target_col < col)
+                while (row, col) != (target_row, target_col):
+                    row += d_row
+                    col += d_col
+                    nodes.append(grid[row][col])
+
+            for node in reversed(nodes[1:-1]):
+                yield PATH, node
+
+            return SearchResult(True, nodes, expanded)
+
+        row, col = current.get_position()
+        for d_row, d_col in directions(current):
+            if d_row:
+                jumped = jump_along_row(row + d_row, col, d_row)
+            else:
+                jumped = jump_along_column(row, col + d_col, d_col)
+            if not jumped:
+                continue
+
+            neighbour = grid[jumped[0]][jumped[1]]
+            if neighbour in closed:
+                continue
+
+            temp_g_score = g_score[current] + heur((row, col), jumped)
+            if temp_g_score < g_score.get(neighbour, float("inf")):
+                path[neighbour] = current
+                g_score[neighbour] = temp_g_score
+                open_set.push(
+                    neighbour, temp_g_score + heur(jumped, (end_row, end_col))
+                )
+                yield OPEN, neighbour
+
+        expanded += 1
+        yield CLOSE, current
+
+    return SearchResult(False, expanded=expanded)
+
+
+def join_paths(path_forward, path_backward, meeting, start, end):
+    """
+    Joins the paths of a bidirectional search where they meet, returning the
+    nodes from the start node to the end node.
+    """
+
+    forward = reconstruct_path(path_forward, meeting, start)
+    # Backward path goes from the end node to the meeting node
+    backward = reconstruct_path(path_backward, meeting, end)
+
+    return forward + backward[-2::-1]
+
+
+def bidirectional_breadth_first(grid, start, end):
+    """
+    Headless bidirectional breadth first search. See
+    algorithms.bidirectional_breadth_first_search.
+
+    Layers are only the same distance from the start or end node when every move
+    costs the same, so on a grid with weights bidirectional A* is run instead
+    (noted in the result as fell_back_to).
+    """
+
+    if is_weighted(grid):
+        result = yield from bidirectional_a_star(grid, start, end)
+        result.stats["fell_back_to"] = "bidirectional a*"
+        return result
+
+    # Keeps track of node prior in the path to a certain node, from each
+    # direction (also tracks if node has been visited from that direction)
+    path_forward = {start: None}
+    path_backward = {end: None}
+
+    # Number of steps to get to each node from the start or end node
+    distance_forward = {start: 0}
+    distance_backward = {end: 0}
+
+    open_forward = deque([start])
+    open_backward = deque([end])
+
+    expanded_forward = 0
+    expanded_backward = 0
+
+    while open_forward and open_backward:
+        # A whole layer is expanded at a time, from whichever side has the
+        # smaller layer
+        forward = len(open_forward) <= len(open_backward)
+        if forward:
+            open_set, path, distance = open_forward, path_forward, distance_forward
+            other_path, other_distance = path_backward, distance_backward
+            expanded_forward += len(open_set)
+        else:
+            open_set, path, distance = open_backward, path_backward, distance_backward
+            other_path, other_distance = path_forward, distance_forward
+            expanded_backward += len(open_set)
+
+        # Shortest path found through this layer, as (length, meeting node)
+        best = None
+
+        for _ in range(len(open_set)):
+            current = open_set.popleft()
+
+            for neighbour in current.neighbours:
+                if neighbour in path:
+                    continue
+
+                path[neighbour] = current
+                distance[neighbour] = distance[current] + 1
+                open_set.append(neighbour)
+                yield OPEN, neighbour
+
+                # The two searches have met
+                if neighbour in other_path:
+                    length = distance[neighbour] + other_distance[neighbour]
+                    if best is None or length < best[0]:
+                        best = length, neighbour
+
+            yield CLOSE, current
+
+        # The rest of the layer is finished first, as a node further along it
+        # may meet the other search with a shorter path
+        if best:
+            nodes = join_paths(path_forward, path_backward, best[1], start, end)
+            for node in reversed(nodes[1:-1]):
+                yield PATH, node
+
+            return SearchResult(
+                True,
+                nodes,
+                expanded_forward + expanded_backward,
+                expanded_forward=expanded_forward,
+                expanded_backward=expanded_backward,
+            )
+
+    return SearchResult(
+        False,
+        expanded=expanded_forward + expanded_backward,
+        expanded_forward=expanded_forward,
+        expanded_backward=expanded_backward,
+    )
+
+
+def bidirectional_a_star(grid, start, end, frontier="heap"):
+    """
+    Headless bidirectional A* search. See algorithms.bidirectional_a_star.
+
+    One A* search runs forwards from the start node (guided towards the end node)
+    and one runs backwards from the end node (guided towards the start node),
+    taking turns to expand a node. The shortest path found where they meet is
+    kept, and the search stops once either side could only find longer paths.
+
+    Moving into a node costs its weight. The backward search follows moves the
+    other way round, so each of its steps costs the weight of the node it comes
+    from, and the g scores of both sides add up to the cost of a whole path.
+    """
+
+    start_position = start.get_position()
+    end_position = end.get_position()
+
+    # Each direction keeps its own open set, path and g scores, as well as the
+    # position its heuristic function guides it towards
+    forward = {
+        "open_set": make_frontier(frontier),
+        "path": {},
+        "g_score": {start: 0},
+        "closed": set(),
+        "target": end_position,
+        "expanded": 0,
+        # Cost of the move between the current node and a neighbour
+        "cost": lambda current, neighbour: neighbour.weight,
+    }
+    backward = {
+        "open_set": make_frontier(frontier),
+        "path": {},
+        "g_score": {end: 0},
+        "closed": set(),
+        "target": start_position,
+        "expanded": 0,
+        "cost": lambda current, neighbour: current.weight,
+    }
+    forward["open_set"].push(start, heur(start_position, end_position))
+    backward["open_set"].push(end, heur(end_position, start_position))
+
+    # Cost of the cheapest path found so far, and where the searches met on it
+    shortest = float("inf")
+    meeting = None
+
+    # Forward search goes first
+    side, other = forward, backward
+
+    while side["open_set"] and other["open_set"]:
+        current = side["open_set"].pop()
+        # Nodes can be in the open set more than once if a shorter path to them
+        # was found, so only the first copy is searched
+        if current in side["closed"]:
+            side, other = other, side
+            continue
+
+        # Every path still to be found through this side's open set would be at
+        # least this long
+        f_score = side["g_score"][current] + heur(
+            current.get_position(), side["target"]
+        )
+        if f_score >= shortest:
+            break
+
+        side["closed"].add(current)
+
+        for neighbour in current.neighbours:
+            temp_g_score = side["g_score"][current] + side["cost"](current, neighbour)
+
+            if temp_g_score < side["g_score"].get(neighbour, float("inf")):
+                side["path"][neighbour] = current
+                side["g_score"][neighbour] = temp_g_score
+                side["open_set"].push(
+                    neighbour,
+                    temp_g_score + heur(neighbour.get_position(), side["target"]),
+                )
+                yield OPEN, neighbour
+
+                # The two searches have met
+                if neighbour in other["g_score"]:
+                    length = temp_g_score + other["g_score"][neighbour]
+                    if length < shortest:
+                        shortest = length
+                        meeting = neighbour
+
+        side["expanded"] += 1
+        yield CLOSE, current
+
+        side, other = other, side
+
+    stats = {
+        "expanded_forward": forward["expanded"],
+        "expanded_backward": backward["expanded"],
+    }
+    expanded = forward["expanded"] + backward["expanded"]
+
+    if meeting is None:
+        return SearchResult(False, expanded=expanded, **stats)
+
+    nodes = join_paths(forward["path"], backward["path"], meeting, start, end)
+    for node in reversed(nodes[1:-1]):
+        yield PATH, node
+
+    return SearchResult(True, nodes, expanded, **stats)
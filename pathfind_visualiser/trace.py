@@ -0,0 +1,323 @@
+"""
+Records searches as traces which can be replayed (and scrubbed through) later,
+without running the search again. See replay.py for the viewer.
+
+A trace is the state of every cell (the code of its colour in palette.PALETTE)
+before the search, then a stream of events, each one a cell changing state
+during a given step of the search. A step is what the visualiser would draw as
+one frame: a node closed, a ring of nodes closed or a node added to the path.
+
+Getting to a step by applying every event from the start gets slower the longer
+the search, so every so often a keyframe of the state of every cell is kept too.
+Any step is then reached by starting from the last keyframe before it, so only
+the events since then have to be applied.
+
+Trace files are little endian: a header, the events as three arrays of unsigned
+32 bit ints (the step, cell and new state of each event), then the keyframes,
+each one the step and event it was taken at followed by a byte for every cell.
+"""
+
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+
+from pathfind_visualiser import batch, board, maze, palette, search
+from pathfind_visualiser.array_grid import BARRIER, DEFAULT_COST
+
+# Start of every trace file, then its format version
+MAGIC = b"PFTR"
+VERSION = 1
+# Version, rows, cols, steps, events and keyframes
+HEADER = struct.Struct("<6I")
+# Step and event of a keyframe
+KEYFRAME = struct.Struct("<2I")
+
+# Events between keyframes at the least. Grids with more cells than this get
+# fewer keyframes, so they take up no more than a third of the file
+KEYFRAME_INTERVAL = 1024
+
+START = palette.COLOUR_CODES[board.START]
+END = palette.COLOUR_CODES[board.END]
+OPEN = palette.COLOUR_CODES[board.OPEN]
+CLOSED = palette.COLOUR_CODES[board.CLOSED]
+PATH = palette.COLOUR_CODES[board.PATH]
+
+
+def little_endian(values):
+    """Returns an array of unsigned 32 bit ints in little endian byte order."""
+
+    values = array("I", values)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+class Trace:
+    """
+    The events of a search on a grid of rows x cols cells, with keyframes. Built
+    up with add() and end_step() while recording.
+    """
+
+    def __init__(self, rows, cols, initial, keyframe_interval=None):
+        self.rows = rows
+        self.cols = cols
+        self.keyframe_interval = keyframe_interval or max(
+            KEYFRAME_INTERVAL, rows * cols // 4
+        )
+
+        # Step, cell and new state of each event
+        self.steps = array("I")
+        self.cells = array("I")
+        self.states = array("I")
+        self.step_count = 0
+
+        # (step, event) of each keyframe, and the state of every cell at it
+        self.keyframes = [(0, 0)]
+        self.snapshots = [bytes(initial)]
+        # State of every cell after the last event, while recording
+        self.state = bytearray(initial)
+
+    def add(self, cell, state):
+        """Records a cell changing state during the current step."""
+
+        if self.state[cell] != state:
+            self.steps.append(self.step_count + 1)
+            self.cells.append(cell)
+            self.states.append(state)
+            self.state[cell] = state
+
+    def end_step(self):
+        """Finishes the current step, taking a keyframe if one is due."""
+
+        self.step_count += 1
+        if len(self.steps) - self.keyframes[-1][1] >= self.keyframe_interval:
+            self.keyframes.append((self.step_count, len(self.steps)))
+            self.snapshots.append(bytes(self.state))
+
+    def finish(self):
+        """Finishes recording, counting any events after the last step as one."""
+
+        if self.steps and self.steps[-1] > self.step_count:
+            self.step_count += 1
+        self.state = None
+
+    def seek(self, step, current=None):
+        """
+        Returns the state of every cell after the given step. If a Playhead is
+        given, works forwards from its step where that is quicker than starting
+        from a keyframe, and updates it.
+        """
+
+        step = max(0, min(step, self.step_count))
+        keyframe = bisect_right(self.keyframes, (step, len(self.steps))) - 1
+        keyframe_step, position = self.keyframes[keyframe]
+
+        if current is None:
+            current = Playhead(self)
+        if step < current.step or keyframe_step > current.step:
+            current.state[:] = self.snapshots[keyframe]
+        else:
+            position = current.position
+
+        end = bisect_right(self.steps, step, position)
+        state = current.state
+        cells = self.cells
+        states = self.states
+        for event in range(position, end):
+            state[cells[event]] = states[event]
+
+        current.step = step
+        current.position = end
+        return state
+
+    def save(self, path):
+        with open(path, "wb") as file:
+            file.write(MAGIC)
+            file.write(
+                HEADER.pack(
+                    VERSION,
+                    self.rows,
+                    self.cols,
+                    self.step_count,
+                    len(self.steps),
+                    len(self.keyframes),
+                )
+            )
+            for values in (self.steps, self.cells, self.states):
+                little_endian(values).tofile(file)
+            for (step, event), snapshot in zip(self.keyframes, self.snapshots):
+                file.write(KEYFRAME.pack(step, event))
+                file.write(snapshot)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a trace file")
+            version, rows, cols, step_count, events, keyframes = HEADER.unpack(
+                file.read(HEADER.size)
+            )
+            if version != VERSION:
+                raise ValueError(f"Unsupported trace version: {version}")
+
+            arrays = []
+            for _ in range(3):
+                values = array("I")
+                values.fromfile(file, events)
+                arrays.append(little_endian(values))
+
+            size = rows * cols
+            keyframe_list = []
+            snapshots = []
+            for _ in range(keyframes):
+                keyframe_list.append(KEYFRAME.unpack(file.read(KEYFRAME.size)))
+                snapshots.append(file.read(size))
+
+        trace = cls(rows, cols, snapshots[0])
+        trace.steps, trace.cells, trace.states = arrays
+        trace.step_count = step_count
+        trace.keyframes = keyframe_list
+        trace.snapshots = snapshots
+        trace.state = None
+        return trace
+
+
+class Playhead:
+    """A step of a trace, and the state of every cell after it."""
+
+    def __init__(self, trace):
+        self.step = 0
+        self.position = 0
+        self.state = bytearray(trace.snapshots[0])
+
+
+def initial_state(grid, start, end):
+    """Returns the state of every cell of an ArrayGrid before a search."""
+
+    state = bytearray(
+        (
+            palette.COLOUR_CODES[board.BARRIER]
+            if cost == BARRIER
+            else palette.terrain_code(cost)
+        )
+        for cost in grid.costs
+    )
+    state[start] = START
+    state[end] = END
+    return state
+
+
+def record(grid, steps, start, end, keyframe_interval=None):
+    """
+    Runs a search on an ArrayGrid (any search with the same events as those in
+    array_search.py), recording the states the visualiser would colour its
+    cells in. Returns the Trace and the SearchResult.
+    """
+
+    trace = Trace(
+        grid.rows, grid.cols, initial_state(grid, start, end), keyframe_interval
+    )
+
+    try:
+        while True:
+            event, cell = next(steps)
+
+            # The start and end cells keep their colours, as in visualise()
+            if event == search.OPEN:
+                if cell != end:
+                    trace.add(cell, OPEN)
+                continue
+
+            if event == search.CLOSE:
+                if cell != start:
+                    trace.add(cell, CLOSED)
+            elif event == search.RING:
+                for ring_cell in cell:
+                    if ring_cell != start:
+                        trace.add(ring_cell, CLOSED)
+            else:
+                trace.add(cell, PATH)
+            trace.end_step()
+    except StopIteration as finished:
+        result = finished.value
+
+    trace.add(start, START)
+    trace.add(end, END)
+    trace.finish()
+    return trace, result
+
+
+def add_search_arguments(parser):
+    """Adds the arguments choosing a grid and a search to record on it."""
+
+    grid_group = parser.add_mutually_exclusive_group()
+    grid_group.add_argument("--map", help="Text file with the grid to search")
+    grid_group.add_argument(
+        "--maze",
+        choices=["None", *maze.MAZES],
+        default="Random",
+        help="Type of maze to generate, if no map is given",
+    )
+    parser.add_argument("--rows", type=int, default=75)
+    parser.add_argument("--cols", type=int, help="Defaults to the number of rows")
+    parser.add_argument("--seed", type=int, default=0)
+
+    parser.add_argument("--algorithm", choices=batch.SOLVERS, default="a*")
+    parser.add_argument(
+        "--start", type=int, nargs=2, metavar=("ROW", "COL"), default=(1, 1)
+    )
+    parser.add_argument(
+        "--end",
+        type=int,
+        nargs=2,
+        metavar=("ROW", "COL"),
+        help="Defaults to the opposite corner to the start",
+    )
+    parser.add_argument("--keyframe-interval", type=int)
+
+
+def record_search(args):
+    """
+    Records the search chosen by the arguments added by add_search_arguments.
+    Returns the Trace and the SearchResult.
+    """
+
+    if args.map:
+        grid = batch.load_map(args.map)
+    else:
+        grid = batch.generate_map(args.maze, args.rows, args.seed, args.cols)
+
+    start = grid.index(*args.start)
+    end = grid.index(*(args.end or (grid.rows - 2, grid.cols - 2)))
+    # The start and end cells can't be barriers
+    for cell in (start, end):
+        if grid.is_barrier(cell):
+            grid.set_cost(cell, DEFAULT_COST)
+
+    steps = batch.SOLVERS[args.algorithm](grid, start, end)
+    return record(grid, steps, start, end, args.keyframe_interval)
+
+
+def add_parser(subparsers):
+    """Adds the record subcommand to the subparsers of the command line."""
+
+    parser = subparsers.add_parser(
+        "record",
+        help="Record a search to a trace file, to be replayed later",
+        description=__doc__,
+    )
+    parser.add_argument("output", help="Trace file to write")
+    add_search_arguments(parser)
+
+
+def run_command(args):
+    """Runs the record subcommand."""
+
+    trace, result = record_search(args)
+    trace.save(args.output)
+
+    print(
+        f"{result}: {trace.step_count} steps, {len(trace.steps)} events and "
+        f"{len(trace.keyframes)} keyframes written to {args.output}"
+    )
@@ -0,0 +1,143 @@
+"""
+Breadth first search with numpy, working a whole ring of cells at a time.
+
+Instead of taking cells from a queue one at a time, every cell the same distance
+from the start cell (a ring, or wavefront) is searched in a handful of numpy
+operations: the cell indices of the ring are shifted one cell in each direction,
+and the shifted indices which are not barriers or already reached make up the
+next ring. This needs numpy, which is optional (np is None without it).
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from pathfind_visualiser.array_grid import BARRIER
+from pathfind_visualiser.search import PATH, RING, SearchResult
+
+# Distance of cells which have not been reached
+UNREACHED = -1
+
+
+def rings(grid, source, target=None):
+    """
+    Breadth first search outwards from the source cell of an ArrayGrid, yielding
+    each ring of cells as an array of cell indices (the first ring is just the
+    source cell). Stops after the ring with the target cell in it, if one is
+    given.
+
+    Returns an array of the distance from the source cell to each cell, or
+    UNREACHED for cells which were not reached.
+    """
+
+    cols = grid.cols
+    size = grid.size
+    # Reads the costs of the grid in place, without copying them
+    free = np.frombuffer(grid.costs, dtype=np.uint8) != BARRIER
+
+    distances = np.full(size, UNREACHED, dtype=np.int32)
+    if not free[source]:
+        return distances
+    distances[source] = 0
+
+    ring = np.array([source])
+    distance = 0
+
+    while ring.size:
+        yield ring
+        if target is not None and distances[target] != UNREACHED:
+            break
+
+        # Shifts the ring left, down, right and up, without wrapping around the
+        # sides of the grid
+        columns = ring % cols
+        shifted = np.concatenate(
+            (
+                ring[columns > 0] - 1,
+                ring + cols,
+                ring[columns < cols - 1] + 1,
+                ring - cols,
+            )
+        )
+        shifted = shifted[(shifted >= 0) & (shifted < size)]
+        shifted = shifted[free[shifted] & (distances[shifted] == UNREACHED)]
+
+        distance += 1
+        distances[shifted] = distance
+        # A cell can be next to more than one cell of the ring
+        ring = np.unique(shifted)
+
+    return distances
+
+
+def distance_transform(grid, source):
+    """
+    Returns the distance from the source cell to every cell, as a rows x cols
+    array (UNREACHED for cells which can't be reached).
+    """
+
+    steps = rings(grid, source)
+    try:
+        while True:
+            next(steps)
+    except StopIteration as finished:
+        return finished.value.reshape(grid.rows, grid.cols)
+
+
+def path_to(grid, distances, end):
+    """
+    Returns the shortest path from the source cell of the distances (as worked
+    out by rings()) to the end cell, going backwards from the end cell through
+    cells one closer to the source each time. Empty if the end was not reached.
+    """
+
+    distances = distances.ravel()
+    if distances[end] == UNREACHED:
+        return []
+
+    path = [end]
+    current = end
+    while distances[current]:
+        closer = distances[current] - 1
+        current = next(
+            neighbour
+            for neighbour in grid.neighbours(current)
+            if distances[neighbour] == closer
+        )
+        path.append(current)
+
+    path.reverse()
+    return path
+
+
+def breadth_first(grid, start, end):
+    """
+    Breadth first search on an ArrayGrid from the start cell to the end cell,
+    yielding a RING event (with a list of the cells) for each ring, then the
+    usual PATH events. Returns a SearchResult, with the number of rings searched.
+    """
+
+    steps = rings(grid, start, end)
+    reached = 0
+    count = 0
+    ring = ()
+
+    try:
+        while True:
+            ring = next(steps)
+            yield RING, ring.tolist()
+            reached += len(ring)
+            count += 1
+    except StopIteration as finished:
+        distances = finished.value
+
+    path = path_to(grid, distances, end)
+    if not path:
+        return SearchResult(False, expanded=reached, rings=count)
+
+    for index in reversed(path[1:-1]):
+        yield PATH, index
+
+    # The ring with the end cell in it is not searched
+    return SearchResult(True, path, reached - len(ring), rings=count)